@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Nightly closing-line and results job for both sports.
+
+1. Pending games are those that started at least FINAL_AFTER ago (within
+   --days) and are not yet recorded as final or cancelled. That anti-join
+   on the game_results primary key is the done-set: a finished game is
+   never fetched again. Postponed games are left pending; the schedule
+   scraper moves their start to the makeup date.
+2. Results for the pending games' dates are fetched concurrently (one
+   request per date: the MLB Stats API schedule, ESPN's NFL scoreboard)
+   and matched to the pending games only, by source id or by teams and
+   start. Results for any other game are dropped without a trace.
+3. For the games finalized in this run, two INSERT ... SELECT statements
+   fill `closing_lines` (each book's last line before the start, and
+   whether the home side won, covered and the game went over) and
+   `line_clv` (every earlier snapshot against its book's close).
+
+Only the games finalized tonight are read, so the run stays fast however
+many seasons are stored.
+
+Usage: python analysis/closingLines.py [--sport nfl|mlb|all] [--days 3]
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scrapers.httpClient import fetch_many, get_json
+from scrapers.gameIdentity import MATCH_WINDOW, GameResolver, to_utc
+from scrapers.oddsArchive import DATABASES
+from scrapers.storage import Storage, utc_now
+
+# Config
+FINAL_AFTER = 4 * 3600          # seconds after the start before we look for a result
+LOOKBACK_DAYS = 3
+# Schedules are listed by US date; Pacific time gives the listed date for
+# every US start time
+SCHEDULE_TZ = ZoneInfo("America/Los_Angeles")
+
+MLB_SCHEDULE_URL = "https://statsapi.mlb.com/api/v1/schedule"
+ESPN_SCOREBOARD_URL = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
+SOURCES = {"mlb": "mlb-api", "nfl": "espn"}
+DONE_STATUSES = ("final", "cancelled")      # postponed games get played later
+
+PENDING_SQL = f"""
+    SELECT g.game_id, g.start_utc, g.away_code, g.home_code FROM games g
+    WHERE g.start_utc >= ? AND g.start_utc <= ?
+      AND NOT EXISTS (
+          SELECT 1 FROM game_results r WHERE r.game_id = g.game_id AND r.status IN {DONE_STATUSES}
+      )
+"""
+
+
+def implied_sql(col):
+    """SQL for the implied probability of an American-odds column."""
+    return (f"(CASE WHEN {col} >= 100 THEN 100.0 / ({col} + 100) "
+            f"WHEN {col} <= -100 THEN -{col} * 1.0 / (100 - {col}) END)")
+
+
+# Last line before the start per (game, provider), settled against the score
+CLOSING_SQL = f"""
+INSERT OR REPLACE INTO closing_lines (
+    game_id, provider, odds_id, updated_at, spread_details, home_spread, home_spread_price,
+    total_points, home_ml, away_ml, home_fair, home_won, home_covered, went_over
+)
+SELECT
+    c.game_id, c.provider, c.id, c.updated_at, c.spread_details, c.home_spread, c.home_spread_price,
+    c.total_points, c.home_ml, c.away_ml,
+    {implied_sql('c.home_ml')} / ({implied_sql('c.home_ml')} + {implied_sql('c.away_ml')}),
+    CASE WHEN r.home_score > r.away_score THEN 1 WHEN r.home_score < r.away_score THEN 0 END,
+    CASE WHEN r.home_score + c.home_spread > r.away_score THEN 1
+         WHEN r.home_score + c.home_spread < r.away_score THEN 0 END,
+    CASE WHEN r.home_score + r.away_score > c.total_points THEN 1
+         WHEN r.home_score + r.away_score < c.total_points THEN 0 END
+FROM (
+    SELECT o.*, ROW_NUMBER() OVER (
+        PARTITION BY o.game_id, o.provider ORDER BY o.updated_at DESC, o.id DESC
+    ) AS rn
+    FROM finalized f CROSS JOIN odds o ON o.game_id = f.game_id
+    WHERE o.updated_at <= f.start_iso
+) c
+JOIN game_results r ON r.game_id = c.game_id
+WHERE c.rn = 1 AND r.status = 'final'
+"""
+
+# CROSS JOIN keeps finalized as the outer loop, so odds and closing_lines
+# are read through their indexes for tonight's games only.
+
+# Every pre-game snapshot against the same book's closing line. Positive
+# values beat the close: a higher fair probability than the price implied,
+# more points on the home spread, a lower total for the over.
+CLV_SQL = f"""
+INSERT OR REPLACE INTO line_clv (
+    odds_id, game_id, provider, updated_at, home_ml_clv, away_ml_clv, home_spread_clv, over_clv
+)
+SELECT
+    o.id, o.game_id, o.provider, o.updated_at,
+    cl.home_fair - {implied_sql('o.home_ml')},
+    (1 - cl.home_fair) - {implied_sql('o.away_ml')},
+    o.home_spread - cl.home_spread,
+    cl.total_points - o.total_points
+FROM finalized f
+CROSS JOIN closing_lines cl ON cl.game_id = f.game_id
+CROSS JOIN odds o ON o.game_id = cl.game_id AND o.provider = cl.provider AND o.updated_at <= f.start_iso
+"""
+
+
+def _status(text):
+    text = (text or "").lower()
+    if "postpon" in text:
+        return "postponed"
+    if "cancel" in text:
+        return "cancelled"
+    if "final" in text or "completed" in text or "game over" in text:
+        return "final"
+    return None
+
+
+def mlb_requests(dates):
+    return [(MLB_SCHEDULE_URL, {"sportId": 1, "date": d.isoformat()}) for d in dates]
+
+
+def parse_mlb(payload):
+    results = []
+    for day in payload.get("dates", []):
+        for game in day.get("games", []):
+            status = _status(game.get("status", {}).get("detailedState"))
+            if status is None:
+                continue
+            home, away = game["teams"]["home"], game["teams"]["away"]
+            results.append({
+                "source_key": game["gamePk"],
+                "home_team": home["team"]["name"],
+                "away_team": away["team"]["name"],
+                "start_utc": game["gameDate"],
+                "status": status,
+                "home_score": home.get("score"),
+                "away_score": away.get("score"),
+            })
+    return results
+
+
+def espn_requests(dates):
+    return [(ESPN_SCOREBOARD_URL, {"dates": d.strftime("%Y%m%d")}) for d in dates]
+
+
+def parse_espn(payload):
+    results = []
+    for event in payload.get("events", []):
+        comp = event.get("competitions", [{}])[0]
+        status = _status(comp.get("status", event.get("status", {})).get("type", {}).get("name"))
+        if status is None:
+            continue
+        teams = {t["homeAway"]: t for t in comp.get("competitors", [])}
+        if set(teams) != {"home", "away"}:
+            continue
+        score = lambda t: int(t["score"]) if t.get("score") not in (None, "") else None
+        results.append({
+            "source_key": event["id"],
+            "home_team": teams["home"]["team"]["name"],
+            "away_team": teams["away"]["team"]["name"],
+            "start_utc": event["date"],
+            "status": status,
+            "home_score": score(teams["home"]),
+            "away_score": score(teams["away"]),
+        })
+    return results
+
+
+FEEDS = {"mlb": (mlb_requests, parse_mlb), "nfl": (espn_requests, parse_espn)}
+
+
+def pending_games(conn, days=LOOKBACK_DAYS, now=None):
+    """{game_id: (start_utc, away_code, home_code)} for started games without a final result."""
+    now = int(now if now is not None else datetime.now(timezone.utc).timestamp())
+    return {row[0]: row[1:] for row in conn.execute(PENDING_SQL, (now - days * 86400, now - FINAL_AFTER))}
+
+
+def fetch_results(sport, starts):
+    """Result dicts for every date with a pending game, fetched concurrently."""
+    make_requests, parse = FEEDS[sport]
+    dates = sorted({datetime.fromtimestamp(s, SCHEDULE_TZ).date() for s in starts})
+    calls = make_requests(dates)
+    results = []
+    for (url, params), payload in zip(calls, fetch_many(get_json, calls)):
+        if isinstance(payload, Exception):
+            print(f"{sport}: results for {params} failed: {payload}")
+            continue
+        results += parse(payload)
+    return results
+
+
+def match_results(conn, sport, results, pending):
+    """
+    Set game_id on the results that belong to a pending game and return
+    them. A result matches by its source id, or else by team codes and a
+    start within MATCH_WINDOW of a pending game not yet keyed to another
+    record from the source. Source ids are stored for matched results
+    only, and no games are created.
+    """
+    source = SOURCES[sport]
+    resolver = GameResolver(conn, sport)
+    by_teams = {}
+    for game_id, (start, away, home) in pending.items():
+        by_teams.setdefault((away, home), []).append((start, game_id))
+
+    matched, new_keys = {}, []
+    for r in results:
+        key = str(r["source_key"])
+        game_id = resolver.keys.get((source, key))
+        start = to_utc(r["start_utc"])
+        if game_id is None and start is not None:
+            teams = (resolver.team(r["away_team"]), resolver.team(r["home_team"]))
+            nearby = [
+                (abs(known - start.timestamp()), gid) for known, gid in by_teams.get(teams, [])
+                if abs(known - start.timestamp()) <= MATCH_WINDOW.total_seconds()
+                and resolver.sources.get(gid, {}).get(source, key) == key
+            ]
+            if nearby:
+                game_id = min(nearby)[1]
+                new_keys.append((source, key, game_id))
+        if game_id in pending and game_id not in matched:
+            r["game_id"] = game_id
+            matched[game_id] = r
+
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO game_keys (source, source_key, game_id) VALUES (?, ?, ?)",
+            [k for k in new_keys if k[2] in matched],
+        )
+    return list(matched.values())
+
+
+def settle(db, game_ids, starts):
+    """Fill closing_lines and line_clv for newly finalized games in one transaction."""
+    conn = db.conn
+    with conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS finalized (game_id TEXT PRIMARY KEY, start_iso TEXT)")
+        conn.execute("DELETE FROM finalized")
+        conn.executemany("INSERT INTO finalized VALUES (?, ?)", [
+            (g, datetime.fromtimestamp(starts[g][0], timezone.utc).isoformat()) for g in game_ids
+        ])
+        before = conn.total_changes
+        conn.execute(CLOSING_SQL)
+        closing = conn.total_changes - before
+        before = conn.total_changes
+        conn.execute(CLV_SQL)
+        clv = conn.total_changes - before
+    return closing, clv
+
+
+def run(sport, days=LOOKBACK_DAYS):
+    """Record results, closing lines and CLV for one sport. Returns games finalized."""
+    with Storage(DATABASES[sport]) as db:
+        pending = pending_games(db.conn, days)
+        if not pending:
+            print(f"{sport}: no games waiting for a result")
+            return 0
+
+        results = fetch_results(sport, [start for start, _, _ in pending.values()])
+        matched = match_results(db.conn, sport, results, pending)
+        recorded_at = utc_now()
+        done = [
+            {"game_id": r["game_id"], "status": r["status"],
+             "home_score": r["home_score"] if r["status"] == "final" else None,
+             "away_score": r["away_score"] if r["status"] == "final" else None,
+             "recorded_at": recorded_at}
+            for r in matched if r["status"] in DONE_STATUSES
+        ]
+        db.upsert_results(done)
+
+        final = [r["game_id"] for r in done if r["status"] == "final"]
+        closing, clv = settle(db, final, pending)
+        print(f"{sport}: {len(pending)} pending, {len(final)} final, {len(done) - len(final)} cancelled, "
+              f"{len(matched) - len(done)} postponed; {closing} closing lines, {clv} CLV rows")
+        return len(final)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record final scores, closing lines and CLV")
+    parser.add_argument("--sport", choices=["all"] + list(DATABASES), default="all")
+    parser.add_argument("--days", type=int, default=LOOKBACK_DAYS, help="how far back to look for unsettled games")
+    args = parser.parse_args()
+
+    sports = list(DATABASES) if args.sport == "all" else [args.sport]
+    return sum(run(sport, args.days) for sport in sports if os.path.exists(DATABASES[sport]))
+
+
+if __name__ == "__main__":
+    main()
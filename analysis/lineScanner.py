@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Cross-book best lines, arbitrage and middles for live games.
+
+LineBook holds the latest line of every provider for every live game in
+memory. refresh() asks odds_latest (indexed on odds_id) which games got a
+new line since the last refresh, reloads all providers' lines for just
+those games and re-evaluates them; the rest of the slate keeps its
+evaluation. A refresh after a scrape costs the games that scrape touched.
+
+For each game the evaluation has:
+
+    best_home / best_away    best moneyline on each side and its provider
+    arb                      margin when the best prices on both sides
+                             together imply less than 100%
+    spread_middle            best home spread at one book and best away
+                             spread at another leave MIN_MIDDLE+ points
+                             between them
+    total_middle             same for over the lowest total and under the
+                             highest
+
+Usage: python analysis/lineScanner.py [--sport nfl|mlb|all]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scrapers.oddsArchive import DATABASES
+from scrapers.oddsNormalize import american_to_decimal
+from scrapers.storage import connect
+
+# Config
+LIVE_AFTER_START = 4 * 3600     # seconds a game stays on the slate after it starts
+MIN_MIDDLE = 1.0                # points between the two sides of a middle
+IN_CHUNK = 500                  # game_ids per IN (...) lookup
+
+LINE_COLUMNS = "l.game_id, g.start_utc, l.provider, l.home_spread, l.total_points, l.home_ml, l.away_ml"
+
+LIVE_LINES_SQL = f"""
+    SELECT {LINE_COLUMNS}
+    FROM games g JOIN odds_latest l ON l.game_id = g.game_id
+    WHERE g.start_utc >= ?
+"""
+
+CHANGED_GAMES_SQL = """
+    SELECT DISTINCT game_id FROM odds_latest WHERE odds_id > ? AND odds_id <= ?
+"""
+
+GAME_LINES_SQL = """
+    SELECT {columns}
+    FROM odds_latest l JOIN games g ON g.game_id = l.game_id
+    WHERE l.game_id IN ({marks}) AND g.start_utc >= ?
+"""
+
+
+def _best(lines, side):
+    """(american, provider) with the highest payout on one side, or None."""
+    priced = [(american_to_decimal(line[side]), line[side], provider)
+              for provider, line in lines.items() if line[side] is not None]
+    if not priced:
+        return None
+    _, price, provider = max(priced)
+    return price, provider
+
+
+def _middle(lines, field):
+    """(low, low provider, high, high provider) if the lines span MIN_MIDDLE or more."""
+    points = sorted((line[field], provider) for provider, line in lines.items() if line[field] is not None)
+    if len(points) < 2 or points[-1][0] - points[0][0] < MIN_MIDDLE:
+        return None
+    return points[0][0], points[0][1], points[-1][0], points[-1][1]
+
+
+def evaluate(lines):
+    """
+    Best prices and opportunities for one game from {provider: line},
+    where a line is a dict of home_spread, total_points, home_ml, away_ml.
+    """
+    best_home, best_away = _best(lines, "home_ml"), _best(lines, "away_ml")
+    arb = None
+    if best_home and best_away and best_home[1] != best_away[1]:
+        implied = 1 / american_to_decimal(best_home[0]) + 1 / american_to_decimal(best_away[0])
+        if implied < 1:
+            arb = round(1 - implied, 4)
+    return {
+        "books": len(lines),
+        "best_home": best_home,
+        "best_away": best_away,
+        "arb": arb,
+        # Home +high at one book, away -low at the other
+        "spread_middle": _middle(lines, "home_spread"),
+        # Over the low total, under the high one
+        "total_middle": _middle(lines, "total_points"),
+    }
+
+
+class LineBook:
+    """Latest line per (game, provider) for live games, updated incrementally."""
+
+    def __init__(self, live_after_start=LIVE_AFTER_START):
+        self.live_after_start = live_after_start
+        self.lines = {}         # game_id -> {provider: line}
+        self.results = {}       # game_id -> evaluate() result
+        self.starts = {}        # game_id -> start_utc
+        self.last_odds_id = 0
+        self.last_refresh = {}
+
+    def _load(self, rows):
+        games = {}
+        for game_id, start, provider, home_spread, total, home_ml, away_ml in rows:
+            self.starts[game_id] = start
+            games.setdefault(game_id, {})[provider] = {
+                "home_spread": home_spread, "total_points": total,
+                "home_ml": home_ml, "away_ml": away_ml,
+            }
+        return games
+
+    def refresh(self, conn, now=None):
+        """
+        Pull lines changed since the last refresh and re-evaluate their
+        games. Returns the game_ids that were re-evaluated.
+        """
+        started = time.perf_counter()
+        live_from = int(now if now is not None else time.time()) - self.live_after_start
+        until = conn.execute("SELECT COALESCE(MAX(odds_id), 0) FROM odds_latest").fetchone()[0]
+
+        if not self.last_odds_id:
+            touched = self._load(conn.execute(LIVE_LINES_SQL, (live_from,)))
+        else:
+            changed = [row[0] for row in conn.execute(CHANGED_GAMES_SQL, (self.last_odds_id, until))]
+            touched = {}
+            for i in range(0, len(changed), IN_CHUNK):
+                chunk = changed[i:i + IN_CHUNK]
+                sql = GAME_LINES_SQL.format(columns=LINE_COLUMNS, marks=", ".join(["?"] * len(chunk)))
+                touched.update(self._load(conn.execute(sql, chunk + [live_from])))
+        self.last_odds_id = until
+
+        for game_id, lines in touched.items():
+            self.lines[game_id] = lines
+            self.results[game_id] = evaluate(lines)
+
+        # Games that started long enough ago fall off the slate
+        for game_id in [g for g, start in self.starts.items() if start < live_from]:
+            self.lines.pop(game_id, None)
+            self.results.pop(game_id, None)
+            del self.starts[game_id]
+
+        self.last_refresh = {"games": len(touched), "ms": (time.perf_counter() - started) * 1000}
+        return list(touched)
+
+    def opportunities(self):
+        """(game_id, result) for games with an arbitrage or a middle."""
+        return [
+            (game_id, result) for game_id, result in self.results.items()
+            if result["arb"] or result["spread_middle"] or result["total_middle"]
+        ]
+
+
+def describe(game_id, result):
+    parts = []
+    if result["arb"]:
+        (home, home_book), (away, away_book) = result["best_home"], result["best_away"]
+        parts.append(f"arb {result['arb']:.2%}: home {home:+d} @ {home_book}, away {away:+d} @ {away_book}")
+    if result["spread_middle"]:
+        low, low_book, high, high_book = result["spread_middle"]
+        parts.append(f"spread middle: home {high:+g} @ {high_book}, away {-low:+g} @ {low_book}")
+    if result["total_middle"]:
+        low, low_book, high, high_book = result["total_middle"]
+        parts.append(f"total middle: over {low:g} @ {low_book}, under {high:g} @ {high_book}")
+    return f"{game_id}: " + "; ".join(parts)
+
+
+def print_scan(sport, book):
+    print(f"{sport}: {len(book.results)} live games, re-evaluated {book.last_refresh['games']} "
+          f"in {book.last_refresh['ms']:.1f} ms")
+    for game_id, result in book.opportunities():
+        print("  " + describe(game_id, result))
+
+
+def scan(books, verbose=False):
+    """
+    Refresh {sport: LineBook} from the odds databases and print what they
+    found. Books passed in again keep their state, so later scans only
+    re-evaluate the games the scrapers touched in between.
+    """
+    found = 0
+    for sport, book in books.items():
+        if not os.path.exists(DATABASES[sport]):
+            print(f"{sport}: {DATABASES[sport]} not found")
+            continue
+        conn = connect(DATABASES[sport])
+        try:
+            book.refresh(conn)
+        finally:
+            conn.close()
+        if verbose:
+            for game_id, result in sorted(book.results.items()):
+                home, away = result["best_home"], result["best_away"]
+                if home and away:
+                    print(f"{game_id}: best home {home[0]:+d} @ {home[1]}, best away {away[0]:+d} @ {away[1]}")
+        print_scan(sport, book)
+        found += len(book.opportunities())
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan live games for best lines, arbitrage and middles")
+    parser.add_argument("--sport", choices=["all"] + list(DATABASES), default="all")
+    args = parser.parse_args()
+
+    sports = list(DATABASES) if args.sport == "all" else [args.sport]
+    return scan({sport: LineBook() for sport in sports}, verbose=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,194 @@
-#
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+Reverse and steam line-movement detection across books.
+
+Odds history (SQLite tail plus the Parquet archive) is loaded into NumPy
+arrays sorted by game, provider and time. Each snapshot's moneylines become
+a no-vig home win probability, and everything after that is vectorized:
+
+    move        change in probability since the provider's previous line
+    velocity    that change per hour
+    consensus   mean probability of the other books for the game at that time
+                (their latest line, ignoring quotes older than STALE_AFTER)
+    divergence  the book's probability minus the consensus
+
+Flags:
+
+    reverse   the book moved one way while the other books moved the other
+    outlier   the book moved away from the consensus and now sits more than
+              MAX_DIVERGENCE from it
+    steam     at least STEAM_BOOKS books moved the same way within
+              STEAM_WINDOW
+
+The only Python loops are over books (a handful), never over snapshots.
+
+Usage: python analysis/reverseLineAnalysis.py [--sport nfl|mlb|all] [--days 7]
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scrapers.oddsArchive import DATABASES, read_odds
+from scrapers.oddsPricing import price_moneylines
+
+# Config
+MIN_MOVE = 0.01             # probability change that counts as a move (1 point)
+MAX_DIVERGENCE = 0.03       # distance from consensus that makes a book an outlier
+STEAM_WINDOW = 10 * 60      # seconds
+STEAM_BOOKS = 3
+STALE_AFTER = 6 * 3600      # other books' quotes older than this are ignored
+
+
+def _as_of(src_key, src_val, key, max_age):
+    """
+    For every query key, the value of the latest source row at or before it,
+    or NaN if there is none within max_age. Keys are game * span + seconds
+    with span wider than any max_age, so a row from another game is always
+    too old to match.
+    """
+    if len(src_key) == 0:
+        return np.full(len(key), np.nan)
+    idx = np.searchsorted(src_key, key, side="right") - 1
+    found = idx >= 0
+    idx = np.maximum(idx, 0)
+    return np.where(found & (key - src_key[idx] <= max_age), src_val[idx], np.nan)
+
+
+def _mean(values, axis=0):
+    count = np.sum(~np.isnan(values), axis=axis)
+    total = np.nansum(values, axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def detect(game, provider, t, prob, min_move=MIN_MOVE, max_divergence=MAX_DIVERGENCE,
+           steam_window=STEAM_WINDOW, steam_books=STEAM_BOOKS, stale_after=STALE_AFTER):
+    """
+    Signals for snapshots given as parallel arrays: integer game and provider
+    codes, epoch seconds and no-vig home probability. Returns a dict of
+    arrays in (game, provider, t) order; "order" maps them back to the input.
+    """
+    game = np.asarray(game, dtype=np.int64)
+    provider = np.asarray(provider, dtype=np.int64)
+    t = np.asarray(t, dtype=np.int64)
+    if len(t):
+        t = t - t.min()
+    span = int(t.max(initial=0)) + max(stale_after, steam_window) + 1
+    n_books = int(provider.max(initial=0)) + 1
+
+    # One int64 key sorts by (game, provider, t)
+    order = np.argsort((game * n_books + provider) * span + t)
+    game, provider, t = game[order], provider[order], t[order]
+    prob = np.asarray(prob, dtype=float)[order]
+    key = game * span + t
+
+    # Change since the same book's previous line
+    same = np.zeros(len(t), dtype=bool)
+    same[1:] = (game[1:] == game[:-1]) & (provider[1:] == provider[:-1])
+    prev_key = np.concatenate([key[:1], key[:-1]])
+    prev_prob = np.concatenate([prob[:1], prob[:-1]])
+    move = np.where(same, prob - prev_prob, np.nan)
+    velocity = move / (np.maximum(key - prev_key, 60) / 3600)
+
+    # Other books' lines now and at this book's previous line. One book's
+    # rows are a run of keys in (game, t) order, as _as_of needs.
+    books = np.unique(provider)
+    now = np.full((len(books), len(t)), np.nan)
+    then = np.full((len(books), len(t)), np.nan)
+    for k, book in enumerate(books):
+        sel = provider == book
+        now[k] = _as_of(key[sel], prob[sel], key, stale_after)
+        then[k] = _as_of(key[sel], prob[sel], prev_key, stale_after)
+        now[k, sel] = np.nan
+        then[k, sel] = np.nan
+    consensus = _mean(now)
+    both = ~np.isnan(now) & ~np.isnan(then)
+    consensus_move = np.where(same, _mean(np.where(both, now - then, np.nan)), np.nan)
+    divergence = prob - consensus
+
+    moved = same & (np.abs(move) >= min_move)
+    reverse = moved & (np.abs(consensus_move) >= min_move) & (np.sign(move) != np.sign(consensus_move))
+    outlier = moved & (np.sign(move) == np.sign(divergence)) & (np.abs(divergence) >= max_divergence)
+
+    # Steam: distinct books with a same-direction move in the window. Only
+    # moves can be steam, so only they are looked up.
+    idx = np.flatnonzero(moved)
+    direction = np.sign(move[idx])
+    steam_count = np.zeros(len(t), dtype=np.int64)
+    for book in books:
+        for sign in (1, -1):
+            src = idx[(provider[idx] == book) & (direction == sign)]
+            hit = ~np.isnan(_as_of(key[src], key[src].astype(float), key[idx], steam_window))
+            steam_count[idx] += hit & (direction == sign)
+    steam = moved & (steam_count >= steam_books)
+
+    return {
+        "order": order, "move": move, "velocity": velocity, "consensus": consensus,
+        "consensus_move": consensus_move, "divergence": divergence,
+        "reverse": reverse, "outlier": outlier, "steam": steam, "steam_books": steam_count,
+    }
+
+
+def find_signals(history, **thresholds):
+    """
+    Flagged snapshots from an odds history DataFrame (game_id, provider,
+    updated_at, home_ml, away_ml), one row per flagged snapshot.
+    """
+    prob = price_moneylines(history["home_ml"].to_numpy(dtype=float, na_value=np.nan),
+                            history["away_ml"].to_numpy(dtype=float, na_value=np.nan))["home_fair"]
+    history = history.loc[~np.isnan(prob)].reset_index(drop=True)
+    prob = prob[~np.isnan(prob)]
+    if history.empty:
+        return pd.DataFrame()
+
+    game_codes, games = pd.factorize(history["game_id"])
+    provider_codes, providers = pd.factorize(history["provider"])
+    t = pd.to_datetime(history["updated_at"], utc=True).astype("int64").to_numpy() // 10**9
+
+    out = detect(game_codes, provider_codes, t, prob, **thresholds)
+    order = out.pop("order")
+    flagged = out["reverse"] | out["outlier"] | out["steam"]
+    rows = order[flagged]
+    signals = pd.DataFrame({
+        "game_id": games[game_codes[rows]],
+        "provider": providers[provider_codes[rows]],
+        "updated_at": history["updated_at"].to_numpy()[rows],
+        "prob": prob[rows],
+        **{name: values[flagged] for name, values in out.items()},
+    })
+    return signals.sort_values("updated_at", ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag reverse and steam line moves")
+    parser.add_argument("--sport", choices=["all"] + list(DATABASES), default="all")
+    parser.add_argument("--days", type=int, default=7, help="history to scan (0 = everything)")
+    args = parser.parse_args()
+
+    start = datetime.now(timezone.utc) - timedelta(days=args.days) if args.days else None
+    sports = list(DATABASES) if args.sport == "all" else [args.sport]
+    for sport in sports:
+        if not os.path.exists(DATABASES[sport]):
+            print(f"{sport}: {DATABASES[sport]} not found")
+            continue
+        history = read_odds(sport, start=start)
+        signals = find_signals(history)
+        if signals.empty:
+            print(f"{sport}: no signals in {len(history)} snapshots")
+            continue
+        print(f"{sport}: {len(history)} snapshots, {int(signals['reverse'].sum())} reverse, "
+              f"{int(signals['outlier'].sum())} outlier, {int(signals['steam'].sum())} steam")
+        for s in signals.tail(20).itertuples():
+            kinds = ", ".join(k for k in ("reverse", "outlier", "steam") if getattr(s, k))
+            print(f"  {s.updated_at:%Y-%m-%d %H:%M} {s.game_id} {s.provider}: "
+                  f"{s.move:+.3f} to {s.prob:.3f} (consensus {s.consensus:.3f}) [{kinds}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,158 @@
-import sqlite3
-
-def changed(new, old):
-    return new != old and new is not None and old is not None
-
-file = sqlite3.connect("nfl_odds.db")
-c = file.cursor()
-
-# Get game IDs with multiple odds entries
-c.execute("""
-    SELECT game_id FROM odds
-    GROUP BY game_id
-    HAVING COUNT(*) >= 2
-""")
-
-gameIDs = [row[0] for row in c.fetchall()]
-
-for game_id in gameIDs:
-    c.execute("SELECT home_team, away_team FROM games WHERE game_id = ?", (game_id,))
-    result = c.fetchone()
-    if not result:
-        continue
-    home_team, away_team = result
-
-    c.execute("""
-        SELECT spread_details, over_under, moneyline_home, moneyline_away, updated_at
-        FROM odds
-        WHERE game_id = ?
-        ORDER BY updated_at DESC
-        LIMIT 2
-    """, (game_id,))
-    rows = c.fetchall()
-
-    if len(rows) < 2:
-        continue
-
-    latest, previous = rows[0], rows[1]
-
-    if any([
-        changed(latest[0], previous[0]),  # spread
-        changed(latest[1], previous[1]),  # total
-        changed(latest[2], previous[2]),  # ML home
-        changed(latest[3], previous[3])   # ML away
-    ]):
-        print(f"\nLine Movement Detected for {away_team} @ {home_team}")
-        fields = [
-            ("Spread", latest[0], previous[0]),
-            ("Total (O/U)", latest[1], previous[1]),
-            ("Moneyline Home", latest[2], previous[2]),
-            ("Moneyline Away", latest[3], previous[3])
-        ]
-        for label, new_val, old_val in fields:
-            if changed(new_val, old_val):
+#!/usr/bin/env python3
+"""
+Line movement for both sports, computed set-based and incrementally.
+
+Each run finds the odds snapshots added since the last run (odds.id above
+the high-water mark in `analysis_checkpoints`) and compares each one with
+the previous snapshot for the same game and provider using one LAG()
+window query. Moves are written to `line_moves`, so a run costs the new
+snapshots plus one index seek per touched (game, provider), whatever the
+size of the history.
+
+The previous snapshot of a touched line is always still in SQLite, even
+after old rows are archived to Parquet: compaction only archives rows at
+or below the high-water mark, and keeps the last of those for each line,
+which is the previous snapshot of the line's next new one.
+
+Usage: python analysis/trackLines.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scrapers.storage import connect, utc_now
+
+# Config
+DATABASES = {"NFL": "data/nfl_odds.db", "MLB": "data/mlb_odds.db"}
+JOB = "line_moves"
+
+# New snapshots in (:since, :until], plus the snapshot before them for every
+# touched line, ordered per (game, provider) so LAG() sees the previous one
+MOVES_SQL = """
+WITH touched AS (
+    SELECT DISTINCT game_id, provider FROM odds WHERE id > :since AND id <= :until
+),
+anchors AS (
+    SELECT (
+        SELECT p.id FROM odds p
+        WHERE p.game_id = t.game_id AND p.provider = t.provider AND p.id <= :since
+        ORDER BY p.updated_at DESC, p.id DESC
+        LIMIT 1
+    ) AS id
+    FROM touched t
+),
+snapshots AS (
+    SELECT * FROM odds WHERE id > :since AND id <= :until
+    UNION ALL
+    SELECT o.* FROM odds o JOIN anchors a ON o.id = a.id
+),
+paired AS (
+    SELECT
+        id, game_id, provider, updated_at,
+        spread_details, over_under, moneyline_home, moneyline_away,
+        home_spread, total_points, home_ml, away_ml,
+        LAG(id)             OVER w AS prev_id,
+        LAG(spread_details) OVER w AS prev_spread,
+        LAG(over_under)     OVER w AS prev_total,
+        LAG(moneyline_home) OVER w AS prev_ml_home,
+        LAG(moneyline_away) OVER w AS prev_ml_away,
+        LAG(home_spread)    OVER w AS prev_home_spread,
+        LAG(total_points)   OVER w AS prev_total_points,
+        LAG(home_ml)        OVER w AS prev_home_ml,
+        LAG(away_ml)        OVER w AS prev_away_ml
+    FROM snapshots
+    WINDOW w AS (PARTITION BY game_id, provider ORDER BY updated_at, id)
+)
+INSERT OR IGNORE INTO line_moves (
+    odds_id, prev_odds_id, game_id, provider, updated_at,
+    spread_from, spread_to, total_from, total_to,
+    ml_home_from, ml_home_to, ml_away_from, ml_away_to,
+    home_spread_move, total_move, home_ml_move, away_ml_move
+)
+SELECT
+    id, prev_id, game_id, provider, updated_at,
+    prev_spread, spread_details, prev_total, over_under,
+    prev_ml_home, moneyline_home, prev_ml_away, moneyline_away,
+    home_spread - prev_home_spread, total_points - prev_total_points,
+    home_ml - prev_home_ml, away_ml - prev_away_ml
+FROM paired
+WHERE id > :since
+  AND prev_id IS NOT NULL
+  AND (spread_details <> prev_spread
+       OR over_under <> prev_total
+       OR moneyline_home <> prev_ml_home
+       OR moneyline_away <> prev_ml_away)
+"""
+
+NEW_MOVES_SQL = """
+SELECT g.away_team, g.home_team, m.provider,
+       m.spread_from, m.spread_to, m.total_from, m.total_to,
+       m.ml_home_from, m.ml_home_to, m.ml_away_from, m.ml_away_to
+FROM line_moves m
+LEFT JOIN games g ON g.game_id = m.game_id
+WHERE m.odds_id > ? AND m.odds_id <= ?
+ORDER BY m.game_id, m.updated_at
+"""
+
+
+def track_moves(conn):
+    """
+    Record moves for snapshots added since the last run and advance the
+    high-water mark in the same transaction. Returns (since, until, moves).
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT last_odds_id FROM analysis_checkpoints WHERE job = ?", (JOB,)).fetchone()
+        since = row[0] if row else 0
+        until = conn.execute("SELECT COALESCE(MAX(id), 0) FROM odds").fetchone()[0]
+        if until <= since:
+            return since, until, 0
+        # rowcount is not set for a WITH ... INSERT, so count the changes
+        before = conn.total_changes
+        conn.execute(MOVES_SQL, {"since": since, "until": until})
+        moves = conn.total_changes - before
+        conn.execute(
+            """
+            INSERT INTO analysis_checkpoints (job, last_odds_id, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(job) DO UPDATE SET
+                last_odds_id = excluded.last_odds_id,
+                updated_at   = excluded.updated_at
+            """,
+            (JOB, until, utc_now()),
+        )
+    return since, until, moves
+
+
+def print_moves(conn, since, until):
+    fields = ("Spread", "Total (O/U)", "Moneyline Home", "Moneyline Away")
+    for away, home, provider, *values in conn.execute(NEW_MOVES_SQL, (since, until)):
+        print(f"\nLine Movement Detected for {away} @ {home} ({provider})")
+        for label, old_val, new_val in zip(fields, values[0::2], values[1::2]):
+            if old_val is not None and new_val is not None and old_val != new_val:
                 print(f" Switch: {label}: {old_val} → {new_val}")
 
-file.close()
+
+def main():
+    total = 0
+    for sport, db_name in DATABASES.items():
+        if not os.path.exists(db_name):
+            print(f"{sport}: {db_name} not found, run scripts/migrations.py first")
+            continue
+        conn = connect(db_name)
+        try:
+            since, until, moves = track_moves(conn)
+            if until <= since:
+                print(f"{sport}: no new odds snapshots")
+                continue
+            print_moves(conn, since, until)
+            print(f"{sport}: {moves} line moves in snapshots {since + 1}-{until}")
+            total += moves
+        finally:
+            conn.close()
+    return total
+
+
+if __name__ == "__main__":
+    main()
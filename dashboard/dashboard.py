@@ -1,56 +1,122 @@
+import os
+import sys
 import sqlite3
+import threading
 import pandas as pd
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scrapers.oddsPricing import PriceCache
+from scrapers.storage import connect
 
 st.set_page_config(page_title="LineShift Dashboard", layout="wide")
 st.title("LineShift - Odds Dashboard")
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def load_data(sport, team_filter=None, date_filter=None, date_option="All Games"):
-    """Load and process data with error handling"""
+# Books in display order; a game shows the first of these that has a line,
+# else the alphabetically first book
+PREFERRED_BOOKS = ("DraftKings-Web", "DraftKings-MLB-Web", "ESPN BET", "ESPN")
+BOOK_RANK = "CASE p.provider {} ELSE {} END".format(
+    " ".join(f"WHEN '{book}' THEN {i}" for i, book in enumerate(PREFERRED_BOOKS)), len(PREFERRED_BOOKS)
+)
+
+# One line per game from the materialized odds_latest table, looked up
+# per game through its (game_id, provider) key; CROSS JOIN keeps games as
+# the outer loop
+LATEST_LINE_JOIN = f"""
+    CROSS JOIN odds_latest l ON l.game_id = g.game_id AND l.provider = (
+        SELECT p.provider FROM odds_latest p WHERE p.game_id = g.game_id
+        ORDER BY {BOOK_RANK}, p.provider LIMIT 1
+    )
+"""
+
+ODDS_DATABASES = {"NFL": "data/nfl_odds.db", "MLB": "data/mlb_odds.db"}
+STATS_DATABASE = "data/mlb_stats.db"
+
+@st.cache_resource
+def price_cache():
+    """
+    Fair prices per (game, provider, odds row). Streamlit reruns this
+    script on every interaction, so the cache lives in cache_resource to
+    be shared across reruns and sessions.
+    """
+    return PriceCache()
+
+@st.cache_resource
+def _version_probe(db_file):
+    """
+    A connection kept open for the life of the app. PRAGMA data_version on
+    it changes whenever any other connection commits to db_file.
+    """
+    return connect(db_file, check_same_thread=False), threading.Lock(), datetime.now().timestamp()
+
+def data_version(db_file):
+    """
+    Cache key for everything read from db_file: one PRAGMA on a kept-open
+    connection, no table reads. None while the database does not exist.
+    """
+    if not os.path.exists(db_file):
+        return None
+    conn, lock, opened = _version_probe(db_file)
+    with lock:
+        # data_version is only comparable on one connection; opened tells
+        # a reopened probe's counter apart from the old one
+        return opened, conn.execute("PRAGMA data_version").fetchone()[0]
+
+@st.cache_data(max_entries=4)
+def load_data(sport, version=None):
+    """
+    Load every game's line from its preferred book, priced and formatted for
+    display. Cached per data_version, so new odds show up on the next
+    rerun after they are written. Team and date filters are applied to
+    this frame by filter_games, so changing them never goes back to the
+    database.
+    """
     try:
+        db_file = ODDS_DATABASES[sport]
         if sport == "NFL":
-            db_file = "data/nfl_odds.db"
-            query = """
+            query = f"""
                 SELECT
-                    g.game_date,
+                    g.start_utc,
                     g.start_time,
                     g.home_team,
                     g.away_team,
-                    o.spread_details AS spread,
-                    o.over_under AS total,
-                    CASE 
-                        WHEN CAST(REPLACE(o.moneyline_home, '-', '-') AS INTEGER) > 0 THEN '+' || o.moneyline_home 
-                        ELSE o.moneyline_home 
-                    END AS moneyline_home,
-                    CASE 
-                        WHEN CAST(REPLACE(o.moneyline_away, '-', '-') AS INTEGER) > 0 THEN '+' || o.moneyline_away 
-                        ELSE o.moneyline_away 
-                    END AS moneyline_away,
-                    MAX(o.updated_at) AS last_updated
+                    l.spread_details AS spread,
+                    l.total_points AS total,
+                    l.home_ml,
+                    l.away_ml,
+                    l.game_id,
+                    l.provider,
+                    l.odds_id,
+                    l.updated_at,
+                    COALESCE(h.last_seen, l.updated_at) AS last_updated
                 FROM games g
-                JOIN odds o ON g.game_id = o.game_id
-                GROUP BY g.game_id
+                {LATEST_LINE_JOIN}
+                LEFT JOIN odds_heartbeat h
+                    ON h.game_id = l.game_id AND h.provider = l.provider
                 ORDER BY last_updated DESC
             """
         else:  # MLB
-            db_file = "data/mlb_odds.db"
-            query = """
+            query = f"""
                 SELECT
-                    g.game_date,
+                    g.start_utc,
                     g.start_time,
                     g.home_team,
                     g.away_team,
                     g.home_pitcher,
                     g.away_pitcher,
-                    o.over_under     AS total,
-                    o.moneyline_home,
-                    o.moneyline_away,
-                    MAX(o.updated_at) AS last_updated
+                    l.total_points   AS total,
+                    l.home_ml,
+                    l.away_ml,
+                    l.game_id,
+                    l.provider,
+                    l.odds_id,
+                    l.updated_at,
+                    COALESCE(h.last_seen, l.updated_at) AS last_updated
                 FROM games g
-                JOIN odds o ON g.game_id = o.game_id
-                GROUP BY g.game_id
+                {LATEST_LINE_JOIN}
+                LEFT JOIN odds_heartbeat h
+                    ON h.game_id = l.game_id AND h.provider = l.provider
                 ORDER BY last_updated DESC
             """
         
@@ -62,7 +128,8 @@ def load_data(sport, team_filter=None, date_filter=None, date_option="All Games"
             return pd.DataFrame()
         
         # Process data
-        df = process_dataframe(df, sport, team_filter, date_filter, date_option)
+        df = price_cache().price(df)
+        df = process_dataframe(df, sport)
         return df
         
     except sqlite3.Error as e:
@@ -72,86 +139,78 @@ def load_data(sport, team_filter=None, date_filter=None, date_option="All Games"
         st.error(f"Error loading data: {e}")
         return pd.DataFrame()
 
+def filter_games(df, team_filter=None, window=None):
+    """Rows of a load_data frame matching a team substring and a (start, end) epoch window"""
+    if df.empty:
+        return df
+    mask = pd.Series(True, index=df.index)
+    if window:
+        mask &= df["start_utc"].between(window[0], window[1] - 1)
+    if team_filter:
+        mask &= df["teams"].str.contains(team_filter.strip().lower(), regex=False)
+    return df[mask]
+
+def date_window(date_option, date_filter=None):
+    """(start, end) epoch seconds for a date option, in local days; None for all games"""
+    today = datetime.now().date()
+    if date_option == "Today":
+        first, days = today, 1
+    elif date_option == "Tomorrow":
+        first, days = today + timedelta(days=1), 1
+    elif date_option == "This Week":
+        first, days = today, 8
+    elif date_option == "Specific Date" and date_filter:
+        first, days = date_filter, 1
+    else:
+        return None
+    start = datetime.combine(first, time.min)
+    end = datetime.combine(first + timedelta(days=days), time.min)
+    return int(start.timestamp()), int(end.timestamp())
+
 def nickname(full_name: str) -> str:
     """Extract team nickname from full name"""
     if pd.isna(full_name) or not full_name:
         return ""
     return full_name.strip().split()[-1]
 
-def process_dataframe(df, sport, team_filter=None, date_filter=None, date_option="All Games"):
-    """Process and filter dataframe"""
-    # Convert dates // handle the DraftKings format like "THU SEP 4TH"
-    def parse_game_date(date_str):
-        if pd.isna(date_str) or not date_str:
-            return pd.NaT
-        
-        try:
-            parts = str(date_str).split()
-            if len(parts) >= 3:
-                month = parts[1]
-                day = parts[2]
-                month_map = {
-                    'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
-                    'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
-                }
-                if month in month_map:
-                    month_num = month_map[month]
-                    # Handle both "4TH" and "05"
-                    day_num = int(''.join(filter(str.isdigit, day)))
-                    # Use current year for MLB, or your NFL logic for NFL
-                    year = datetime.now().year
-                    return pd.Timestamp(year, month_num, day_num)
-            
-            # Fallback to regular datetime parsing
-            return pd.to_datetime(date_str, errors="coerce")
-        except:
-            return pd.NaT
-    
-    df["game_date"] = df["game_date"].apply(parse_game_date).dt.date
+def process_dataframe(df, sport):
+    """Add display columns to a freshly loaded frame"""
+    # Local game day from the UTC start
+    local_tz = datetime.now().astimezone().tzinfo
+    starts = pd.to_datetime(df["start_utc"], unit="s", utc=True).dt.tz_convert(local_tz)
+    df["game_date"] = starts.dt.strftime("%b %d").fillna("TBD")
     
-    # Format dates for display
-    df["game_date"] = df["game_date"].apply(lambda x: x.strftime("%b %d") if pd.notna(x) else "TBD")
-    
-    # Filter by date based on option
-    if date_option == "Today":
-        df = df[df["game_date"] == datetime.now().date()]
-    elif date_option == "Tomorrow":
-        df = df[df["game_date"] == (datetime.now() + timedelta(days=1)).date()]
-    elif date_option == "This Week":
-        today = datetime.now().date()
-        week_end = today + timedelta(days=7)
-        df = df[(df["game_date"] >= today) & (df["game_date"] <= week_end)]
-    elif date_option == "Specific Date" and date_filter:
-        df = df[df["game_date"] == date_filter]
-    # "All Games" shows everything, so no filtering needed
-    
-    # Filter by team
-    if team_filter:
-        mask = (
-            df["home_team"].str.contains(team_filter, case=False, na=False) |
-            df["away_team"].str.contains(team_filter, case=False, na=False)
-        )
-        df = df[mask]
+    # Lowercased once so the team filter is a plain substring test
+    df["teams"] = (df["home_team"].fillna("") + " | " + df["away_team"].fillna("")).str.lower()
     
     # Create team nicknames
     df["away_nick"] = df["away_team"].apply(nickname)
     df["home_nick"] = df["home_team"].apply(nickname)
     
-    # use the date for filtering purposes
-    
     df["last_updated"] = (
         pd.to_datetime(df["last_updated"], errors="coerce")
           .dt.strftime("%Y-%m-%d %H:%M")
     )
     
-    # Ensure numeric columns are strings for display
-    numeric_cols = ["total", "moneyline_home", "moneyline_away"]
-    if sport == "NFL":
-        numeric_cols.append("spread")
+    # Typed odds columns -> display strings (+120 / -110, 47.5, 4.5%)
+    american = lambda v: f"{int(v):+d}" if pd.notna(v) else "N/A"
+    df["moneyline_home"] = df["home_ml"].map(american)
+    df["moneyline_away"] = df["away_ml"].map(american)
+    df["fair_home"] = df["home_fair_ml"].map(american)
+    df["fair_away"] = df["away_fair_ml"].map(american)
+    df["hold"] = df["hold"].map(lambda v: f"{v:.1%}" if pd.notna(v) else "N/A")
+    df["total"] = df["total"].map(lambda v: f"{v:g}" if pd.notna(v) else "N/A")
     
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = df[col].fillna("N/A").astype(str)
+    if sport == "MLB":
+        pitcher = lambda col: df[col].fillna("").replace("", "TBD")
+        df["Matchup"] = (
+            df["away_team"] + " (" + pitcher("away_pitcher") + ") @ "
+            + df["home_team"] + " (" + pitcher("home_pitcher") + ") - "
+            + df["start_time"].fillna("TBD")
+        )
+    else:  # NFL
+        df["spread"] = df["spread"].fillna("N/A").astype(str)
+        df["Matchup"] = df["away_nick"] + " @ " + df["home_nick"]
     
     return df
 
@@ -161,41 +220,44 @@ def format_display_data(df, sport):
         return df
     
     if sport == "MLB":
-        df["Matchup"] = df.apply(
-            lambda r: f"{r['away_team']} ({r.get('away_pitcher', 'TBD') or 'TBD'}) "
-                      f"@ {r['home_team']} ({r.get('home_pitcher', 'TBD') or 'TBD'}) - {r.get('start_time', 'TBD')}",
-            axis=1
-        )
         display_df = df[
-            ["game_date", "Matchup", "total", "moneyline_home", "moneyline_away", "last_updated"]
+            ["game_date", "Matchup", "provider", "total", "moneyline_home", "moneyline_away",
+             "fair_home", "fair_away", "hold", "last_updated"]
         ]
     else:  # NFL
-        df["Matchup"] = df.apply(
-            lambda r: f"{r['away_nick']} @ {r['home_nick']}",
-            axis=1
-        )
         display_df = df[
-            ["game_date", "Matchup", "spread", "total", "moneyline_home", "moneyline_away", "last_updated"]
+            ["game_date", "Matchup", "provider", "spread", "total", "moneyline_home", "moneyline_away",
+             "fair_home", "fair_away", "hold", "last_updated"]
         ]
     
     # Rename columns
-    display_df.columns = [c.replace("_", " ").title() for c in display_df.columns]
-    return display_df
+    return display_df.rename(columns=lambda c: c.replace("_", " ").title())
+
+@st.cache_data(max_entries=2)
+def load_stat_seasons(version=None):
+    """Seasons with stored player stats, newest first (cached per data_version)"""
+    try:
+        with sqlite3.connect(STATS_DATABASE) as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT year FROM player_stats ORDER BY year DESC")]
+    except sqlite3.Error as e:
+        st.error(f"Stats database error: {e}")
+        return []
 
-@st.cache_data(ttl=600)  # Cache for 10 minutes
-def load_mlb_stats(player_filter=None):
-    """Load MLB player stats with error handling"""
+@st.cache_data(max_entries=4)
+def load_mlb_stats(year, player_type="batter", version=None):
+    """Load one season's batter or pitcher stats (cached per data_version); filter_players narrows them"""
     try:
-        with sqlite3.connect("data/mlb_stats.db") as conn:
+        with sqlite3.connect(STATS_DATABASE) as conn:
             stats_df = pd.read_sql_query("""
-                SELECT player_name, year, at_bats, plate_appearances, hits, singles, doubles,
+                SELECT player_name, year, player_type, at_bats, plate_appearances, hits, singles, doubles,
                        home_runs, strikeouts, walks, strikeout_rate, walk_rate, batting_avg,
                        slg, obp, iso, rbi, stolen_bases, games_played, woba, xwoba,
                        la_sweet_spot_pct, barrel_pct, hard_hit_pct, ev50, adjusted_ev, 
                        whiff_pct, swing_pct, last_updated
                 FROM player_stats
+                WHERE year = ? AND player_type = ?
                 ORDER BY last_updated DESC
-            """, conn)
+            """, conn, params=(year, player_type))
         
         if stats_df.empty:
             return pd.DataFrame()
@@ -205,13 +267,6 @@ def load_mlb_stats(player_filter=None):
               .dt.strftime("%Y-%m-%d")
         )
         
-        # Filter by player name only 
-        if player_filter:
-            mask = (
-                stats_df["player_name"].str.contains(player_filter, case=False, na=False)
-            )
-            stats_df = stats_df[mask]
-        
         return stats_df
         
     except sqlite3.Error as e:
@@ -221,6 +276,12 @@ def load_mlb_stats(player_filter=None):
         st.error(f"Error loading stats: {e}")
         return pd.DataFrame()
 
+def filter_players(stats_df, player_filter=None):
+    """Rows of a load_mlb_stats frame whose player name contains player_filter"""
+    if stats_df.empty or not player_filter:
+        return stats_df
+    return stats_df[stats_df["player_name"].str.contains(player_filter.strip(), case=False, regex=False, na=False)]
+
 # Main App
 def main():
     # Sidebar filters
@@ -290,13 +351,15 @@ def main():
                 except Exception as e:
                     st.error(f"Error running scrapers: {e}")
             
-            # Clear cache and reload
-            st.cache_data.clear()
+            # Caches are keyed on data_version; only databases the
+            # scrapers wrote to are reloaded
             st.rerun()
     
     # Load and display odds data
     with st.spinner("Loading odds data..."):
-        df = load_data(sport, team_filter, date_filter, date_option)
+        df = load_data(sport, data_version(ODDS_DATABASES[sport]))
+    # Filters only mask the cached frame
+    df = filter_games(df, team_filter, date_window(date_option, date_filter))
     
     if not df.empty:
         display_df = format_display_data(df, sport)
@@ -335,17 +398,28 @@ def main():
     if sport == "MLB":
         st.subheader("MLB Player Stats (Baseball Savant)")
         
-        player_filter = st.text_input(
-            "Filter by Player", 
-            placeholder="Enter player name"
-        )
+        stats_version = data_version(STATS_DATABASE)
+        seasons = load_stat_seasons(stats_version)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            # Newest stored season first, so the current one is the default
+            season = st.selectbox("Season", seasons) if seasons else None
+        with col2:
+            player_type = st.selectbox("Player Type", ["batter", "pitcher"], format_func=str.title)
+        with col3:
+            player_filter = st.text_input(
+                "Filter by Player", 
+                placeholder="Enter player name"
+            )
         
         with st.spinner("Loading player stats..."):
-            stats_df = load_mlb_stats(player_filter)
+            stats_df = pd.DataFrame()
+            if season is not None:
+                stats_df = filter_players(load_mlb_stats(season, player_type, stats_version), player_filter)
         
         if not stats_df.empty:
             st.dataframe(stats_df, use_container_width=True)
-            st.caption(f"Showing {len(stats_df)} players")
+            st.caption(f"Showing {len(stats_df)} {player_type}s for {season}")
         else:
             st.info("No player stats found")
     
@@ -1,51 +1,151 @@
 #!/usr/bin/env python3
 """
 Convenience script to run all scrapers from the root directory.
-This handles the new directory structure.
+
+Scrapers are imported and run in-process on a thread pool. Independent
+scrapers run concurrently; scrapers that write the same rows are chained
+through their dependencies so they never race each other. The
+browser-based scrapers share one Chromium through scrapers.browserPool.
+
+With --interval the refresh repeats forever and the browser pool is kept
+warm between runs. --scan compares the books after every refresh (see
+analysis/lineScanner.py); between refreshes only the games a run touched
+are re-evaluated.
 """
 
-import subprocess
+import argparse
+import importlib
+import json
 import sys
-import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from analysis.lineScanner import LineBook, scan
+from scrapers.browserPool import get_pool, close_pool
+from scrapers.httpCache import UNCHANGED
+from scrapers.oddsArchive import DATABASES
+from scrapers.pageLoad import PAGE_TIMINGS
+
+# Config
+MAX_WORKERS = 5
+
+# (name, module path, dependencies)
+# mlbScheduleAPI and mlbOddsDK both upsert `games` in data/mlb_odds.db, so the
+# odds scrape waits for the schedule import to finish first. A scraper must
+# come after its dependencies.
+SCRAPERS = [
+    ("mlbScheduleAPI", "scrapers.mlb.mlbScheduleAPI", ()),
+    ("mlbOddsDK",      "scrapers.mlb.mlbOddsDK",      ("mlbScheduleAPI",)),
+    ("mlbStatScraper", "scrapers.mlb.mlbStatScraper", ()),
+    ("fetchOddsDK",    "scrapers.nfl.fetchOddsDK",    ()),
+    ("fetchOddsESPN",  "scrapers.nfl.fetchOddsESPN",  ()),
+]
 
-def run_scraper(script_path):
-    """Run a scraper script and handle any errors"""
+
+def run_scraper(name, module_path):
+    """
+    Import a scraper module and call its main(). Returns a result dict with
+    the scraper name, status, wall time and the count main() reported, plus
+    the navigation/extraction split for browser-based scrapers.
+
+    Status is "failed" if main() raised, "unchanged" if its feeds had
+    nothing new (main() returned UNCHANGED), "empty" if it found nothing
+    to store and "ok" otherwise.
+    """
+    started = time.perf_counter()
+    result = {"name": name, "status": "ok", "count": None, "error": None}
     try:
-        print(f"\n{'='*50}")
-        print(f"Running: {script_path}")
-        print(f"{'='*50}")
-        
-        result = subprocess.run([sys.executable, script_path], 
-                              capture_output=True, text=True, cwd=os.getcwd())
-        
-        if result.returncode == 0:
-            print("Success!")
-            if result.stdout:
-                print(result.stdout)
+        module = importlib.import_module(module_path)
+        count = module.main()
+        if count == UNCHANGED:
+            result["status"] = "unchanged"
         else:
-            print("Failed!")
-            if result.stderr:
-                print(result.stderr)
-            if result.stdout:
-                print(result.stdout)
-                
+            result["count"] = count
+            if not count:
+                result["status"] = "empty"
     except Exception as e:
-        print(f"Error running {script_path}: {e}")
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["wall_time"] = round(time.perf_counter() - started, 3)
+    result.update(PAGE_TIMINGS.pop(name, {}))
+    return result
+
+
+def run_all(scrapers=SCRAPERS, max_workers=MAX_WORKERS):
+    """
+    Run every scraper, starting each one as soon as its dependencies have
+    finished. Returns the list of result dicts in `scrapers` order.
+    """
+    futures = {}
+
+    def run_after(name, module_path, deps):
+        # Dependencies only order the writes; a failed dependency does not
+        # stop the dependent scraper from running.
+        for dep in deps:
+            futures[dep].result()
+        return run_scraper(name, module_path)
+
+    # Dependencies wait inside the worker. The pool starts work in submission
+    # order and dependencies are listed first, so a waiting scraper's
+    # dependencies already hold a worker and any pool size finishes.
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for name, module_path, deps in scrapers:
+            futures[name] = pool.submit(run_after, name, module_path, deps)
+        return [futures[name].result() for name, _, _ in scrapers]
+
+
+def print_summary(results):
+    """Print a one-line status per scraper."""
+    print(f"\n{'='*70}")
+    print(f"{'Scraper':<16} {'Status':<9} {'Time (s)':>9} {'Count':>6} {'Nav (s)':>9} {'Extract (s)':>12}")
+    print(f"{'='*70}")
+    for r in results:
+        count = "-" if r["count"] is None else r["count"]
+        nav = f"{r['navigation']:.2f}" if "navigation" in r else "-"
+        extract = f"{r['extraction']:.2f}" if "extraction" in r else "-"
+        print(f"{r['name']:<16} {r['status']:<9} {r['wall_time']:>9.2f} {count:>6} {nav:>9} {extract:>12}")
+        if r["error"]:
+            print(f"  {r['error']}")
+
 
 def main():
     """Run all scrapers"""
+    parser = argparse.ArgumentParser(description="Run all LineShift scrapers")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="scrapers to run at once")
+    parser.add_argument("--interval", type=float, default=None,
+                        help="daemon mode: seconds to wait between refreshes")
+    parser.add_argument("--scan", action="store_true",
+                        help="scan for best lines, arbitrage and middles after each refresh")
+    args = parser.parse_args()
+
     print("Starting LineShift scrapers...")
-    
-    # MLB scrapers
-    run_scraper("scrapers/mlb/mlbScheduleAPI.py")
-    run_scraper("scrapers/mlb/mlbOddsDK.py")
-    run_scraper("scrapers/mlb/mlbStatScraper.py")
-    
-    # NFL scrapers
-    run_scraper("scrapers/nfl/fetchOddsDK.py")
-    run_scraper("scrapers/nfl/fetchOddsESPN.py")
-    
-    print("\n All scrapers completed!")
+    results = []
+    books = {sport: LineBook() for sport in DATABASES}
+    try:
+        while True:
+            started = time.perf_counter()
+            results = run_all(max_workers=args.workers)
+
+            if args.json:
+                print(json.dumps(results, indent=2))
+            else:
+                print_summary(results)
+            print(f"\n All scrapers completed in {time.perf_counter() - started:.2f}s!")
+            if args.scan:
+                scan(books)
+
+            if args.interval is None:
+                break
+            pool = get_pool()
+            print(f"Browser launches: {pool.launches}, jobs served: {pool.jobs}")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\nStopped by user")
+    finally:
+        close_pool()
+
+    return 1 if any(r["status"] == "failed" for r in results) else 0
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
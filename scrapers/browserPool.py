@@ -0,0 +1,178 @@
+"""
+Shared Playwright browser pool.
+
+Chromium is launched once on a background event loop and shared by every
+scraper in the process. Each job gets its own isolated browser context and
+page, the number of pages open at once is capped, and the browser is
+relaunched after a fixed number of jobs so its memory stays bounded.
+
+Scrapers hand the pool an async handler and get its result back
+synchronously, so they can be called from plain threads:
+
+    async def extract(page):
+        await page.goto(URL)
+        return await page.title()
+
+    title = get_pool().run(extract)
+"""
+
+import asyncio
+import threading
+from playwright.async_api import async_playwright
+
+# Config
+MAX_PAGES = 3       # pages open at once across all scrapers
+MAX_USES  = 50      # jobs served before the browser is relaunched
+HEADLESS  = True
+
+
+class BrowserPool:
+    """One Chromium instance shared by many scrapers."""
+
+    def __init__(self, max_pages=MAX_PAGES, max_uses=MAX_USES, headless=HEADLESS):
+        self.max_pages = max_pages
+        self.max_uses  = max_uses
+        self.headless  = headless
+
+        self.launches = 0   # how many times Chromium has been started
+        self.jobs     = 0   # jobs served over the pool's lifetime
+
+        self._loop       = None
+        self._thread     = None
+        self._start_lock = threading.Lock()
+        self._cond       = None
+        self._playwright = None
+        self._browser    = None
+        self._uses       = 0    # jobs served by the current browser
+        self._active     = 0    # pages currently open
+
+    # Event loop thread
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="browser-pool", daemon=True
+            )
+            self._thread.start()
+            asyncio.run_coroutine_threadsafe(self._init_cond(), self._loop).result()
+
+    async def _init_cond(self):
+        self._cond = asyncio.Condition()
+
+    # Browser lifecycle (runs on the pool's loop)
+
+    async def _launch(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._uses = 0
+        self.launches += 1
+
+    async def _close_browser(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+            self._browser = None
+
+    def _due_for_recycle(self):
+        return self._browser is not None and (
+            self._uses >= self.max_uses or not self._browser.is_connected()
+        )
+
+    async def _checkout(self):
+        """Wait for a free page slot and return a live browser."""
+        async with self._cond:
+            # Once the browser is due for recycling, let the pages still open
+            # on it finish before closing it.
+            while self._active >= self.max_pages or (self._due_for_recycle() and self._active > 0):
+                await self._cond.wait()
+            if self._due_for_recycle():
+                await self._close_browser()
+            if self._browser is None:
+                await self._launch()
+            self._active += 1
+            self._uses += 1
+            self.jobs += 1
+            return self._browser
+
+    async def _checkin(self):
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    async def _run(self, handler, args):
+        browser = await self._checkout()
+        context = None
+        try:
+            context = await browser.new_context()
+            page = await context.new_page()
+            return await handler(page, *args)
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception as e:
+                    print(f"Error closing browser context: {e}")
+            await self._checkin()
+
+    async def _shutdown(self):
+        await self._close_browser()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    # Public API
+
+    def run(self, handler, *args, timeout=None):
+        """
+        Run `await handler(page, *args)` on a fresh page in its own browser
+        context and return the result. Blocks the calling thread.
+        """
+        self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._run(handler, args), self._loop)
+        return future.result(timeout)
+
+    def close(self):
+        """Close the browser and stop the pool's event loop."""
+        with self._start_lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Process-wide pool shared by the scrapers
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide browser pool, creating it on first use."""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = BrowserPool()
+        return _shared_pool
+
+def close_pool():
+    """Close the process-wide browser pool if one was started."""
+    global _shared_pool
+    with _shared_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.close()
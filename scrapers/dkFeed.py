@@ -0,0 +1,231 @@
+"""
+Parse the JSON feed the DraftKings sportsbook page loads over XHR/fetch.
+
+The league pages fetch their events, markets and selections as JSON before
+rendering any table rows:
+
+    {"events":     [{"id", "name", "startEventDate", "participants": [...]}],
+     "markets":    [{"id", "eventId", "name", "marketType": {"name"}}],
+     "selections": [{"id", "marketId", "label", "outcomeType", "points",
+                     "mainPoint", "displayOdds": {"american", "decimal"}}]}
+
+parse_feed turns one or more captured payloads into one dict per event with
+numeric odds, so no display text has to be parsed. The format_* helpers
+turn them back into the text the rendered tables show, so a scraper stores
+the same line whichever path read it. This module has no
+browser dependency and can be exercised offline against saved responses.
+"""
+
+from datetime import datetime, timezone
+
+from scrapers.oddsNormalize import parse_american
+
+# Market type names per line kind, across sports
+MONEYLINE_MARKETS = {"moneyline"}
+SPREAD_MARKETS    = {"spread", "point spread", "run line", "puck line"}
+TOTAL_MARKETS     = {"total", "total points", "total runs", "total goals"}
+# DK's main-line flags, on a market or on the selections of a main line
+MAIN_FLAGS = ("isMainLine", "mainLine", "isMain", "mainPoint")
+
+
+def is_feed_payload(body):
+    """True if a JSON response body looks like a DraftKings event feed."""
+    return (
+        isinstance(body, dict)
+        and isinstance(body.get("events"), list)
+        and isinstance(body.get("selections"), list)
+    )
+
+
+def parse_decimal(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_start(value):
+    """Parse DK's startEventDate (ISO, up to 7 fractional digits) to UTC."""
+    if not value:
+        return None
+    text = value.replace("Z", "+00:00")
+    # DK sends 7 fractional digits; fromisoformat only accepts up to 6.
+    if "." in text:
+        head, rest = text.split(".", 1)
+        digits = "".join(c for c in rest if c.isdigit())
+        offset = rest[len(digits):]
+        text = f"{head}.{digits[:6]}{offset}"
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def format_american(value):
+    """American odds as the DK tables show them: '+320', '−410' (Unicode minus)."""
+    if value is None:
+        return None
+    return f"+{value}" if value > 0 else f"−{-value}"
+
+
+def format_line(value):
+    """A spread as the DK tables show it: '+8.5', '−8.5'."""
+    return None if value is None else f"{value:+g}".replace("-", "−")
+
+
+def format_total(value):
+    """A total as the DK tables show it on the away row: 'O 47.5'."""
+    return None if value is None else f"O {value:g}"
+
+
+def _kind(name):
+    name = (name or "").strip().lower()
+    if name in MONEYLINE_MARKETS:
+        return "moneyline"
+    if name in SPREAD_MARKETS:
+        return "spread"
+    if name in TOTAL_MARKETS:
+        return "total"
+    return None
+
+
+def _is_main(item):
+    return any(item.get(flag) is True for flag in MAIN_FLAGS)
+
+
+def _market_kind(market, selections=()):
+    """
+    (kind, rank) for a market, rank 0 being the surest main line: flagged
+    main by DK, then named exactly like the line ("Spread"), then only
+    typed like it (alternate lines share the main marketType). None if the
+    market is not a moneyline, spread or total.
+    """
+    by_name = _kind(market.get("name"))
+    kind = by_name or _kind((market.get("marketType") or {}).get("name"))
+    if kind is None:
+        return None
+    if _is_main(market) or any(_is_main(s) for s in selections):
+        return kind, 0
+    return kind, 1 if by_name else 2
+
+
+def _side(selection):
+    """Return 'home', 'away', 'over' or 'under' for a selection."""
+    outcome = (selection.get("outcomeType") or "").strip().lower()
+    if outcome in ("home", "away", "over", "under"):
+        return outcome
+    for participant in selection.get("participants") or []:
+        role = (participant.get("venueRole") or "").strip().lower()
+        if role in ("home", "away"):
+            return role
+    return None
+
+
+def parse_feed(payloads):
+    """
+    Merge captured feed payloads and return one dict per event:
+
+        {"event_id", "start" (UTC datetime), "home_team", "away_team",
+         "moneyline_home", "moneyline_away",
+         "spread_home", "spread_away", "spread_home_price", "spread_away_price",
+         "total", "over_price", "under_price",
+         "markets": {market name: [{"label", "side", "points", "american", "decimal"}]}}
+
+    The main moneyline, spread and total come from the best-ranked market
+    of each kind per event (see _market_kind), the first one on a tie;
+    every market is also kept under "markets".
+    """
+    events, markets, selections = {}, {}, {}
+    for body in payloads:
+        if not is_feed_payload(body):
+            continue
+        for e in body.get("events", []):
+            events[str(e.get("id"))] = e
+        for m in body.get("markets", []):
+            markets[str(m.get("id"))] = m
+        for s in body.get("selections", []):
+            selections[str(s.get("id"))] = s
+
+    by_market = {}
+    for s in selections.values():
+        by_market.setdefault(str(s.get("marketId")), []).append(s)
+
+    parsed = {}
+    for event_id, e in events.items():
+        teams = {}
+        for participant in e.get("participants") or []:
+            role = (participant.get("venueRole") or "").strip().lower()
+            if role in ("home", "away"):
+                teams[role] = participant.get("name")
+        if "home" not in teams or "away" not in teams:
+            # Fall back to the "AWAY @ HOME" event name
+            name = e.get("name") or ""
+            if " @ " not in name:
+                continue
+            teams["away"], teams["home"] = [t.strip() for t in name.split(" @ ", 1)]
+
+        parsed[event_id] = {
+            "event_id":          event_id,
+            "start":             parse_start(e.get("startEventDate")),
+            "home_team":         teams["home"],
+            "away_team":         teams["away"],
+            "moneyline_home":    None,
+            "moneyline_away":    None,
+            "spread_home":       None,
+            "spread_away":       None,
+            "spread_home_price": None,
+            "spread_away_price": None,
+            "total":             None,
+            "over_price":        None,
+            "under_price":       None,
+            "markets":           {},
+        }
+
+    main = {}   # (event_id, kind) -> (rank, outcomes)
+    for market_id, m in markets.items():
+        event = parsed.get(str(m.get("eventId")))
+        if event is None:
+            continue
+
+        market_selections = by_market.get(market_id, [])
+        outcomes = []
+        for s in market_selections:
+            odds = s.get("displayOdds") or {}
+            outcomes.append({
+                "label":    s.get("label"),
+                "side":     _side(s),
+                "points":   parse_decimal(s.get("points")),
+                "american": parse_american(odds.get("american")),
+                "decimal":  parse_decimal(odds.get("decimal") or s.get("trueOdds")),
+            })
+        name = m.get("name") or (m.get("marketType") or {}).get("name") or market_id
+        event["markets"].setdefault(name, []).extend(outcomes)
+
+        ranked = _market_kind(m, market_selections)
+        if ranked is None:
+            continue
+        kind, rank = ranked
+        # A market holding alternates too marks its main selections
+        if any(_is_main(s) for s in market_selections):
+            outcomes = [o for o, s in zip(outcomes, market_selections) if _is_main(s)]
+        key = (event["event_id"], kind)
+        if key not in main or rank < main[key][0]:
+            main[key] = (rank, outcomes)
+
+    for (event_id, kind), (_, outcomes) in main.items():
+        event = parsed[event_id]
+        for o in outcomes:
+            side = o["side"]
+            if kind == "moneyline" and side in ("home", "away"):
+                event[f"moneyline_{side}"] = o["american"]
+            elif kind == "spread" and side in ("home", "away"):
+                event[f"spread_{side}"] = o["points"]
+                event[f"spread_{side}_price"] = o["american"]
+            elif kind == "total" and side in ("over", "under"):
+                event["total"] = o["points"]
+                event[f"{side}_price"] = o["american"]
+
+    return list(parsed.values())
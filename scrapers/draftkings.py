@@ -0,0 +1,182 @@
+"""
+Shared DraftKings page extraction for the NFL and MLB odds scrapers.
+
+Both sportsbook pages render one `table.sportsbook-table` per game date with
+two rows per game (away, then home). The tables are read into a compact
+structure that the scrapers pair into games:
+
+    [{"date": "THU SEP 4TH",
+      "rows": [{"team": ..., "start_time": ..., "pitcher": ...,
+                "lines": [...], "total": ..., "odds": [...]}, ...]}, ...]
+
+`read_tables` pulls everything in a single page.evaluate call.
+`read_tables_per_element` builds the same structure with one browser round
+trip per field; it is kept as a fallback and as the benchmark baseline.
+
+`capture_feed` skips the rendered tables altogether: it listens for the
+JSON event feed the page fetches and returns the raw payloads for
+scrapers.dkFeed to parse. Scrapers fall back to the tables when no feed
+payload is seen.
+"""
+
+import asyncio
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from scrapers.dkFeed import is_feed_payload
+from scrapers.pageLoad import load_page
+
+TABLE_SELECTOR = "table.sportsbook-table"
+ROW_SELECTOR   = "table.sportsbook-table tbody tr"
+DATE_SELECTOR  = ".sportsbook-table-header__title span span"
+TEAM_SELECTOR  = ".event-cell__name-text"
+TIME_SELECTOR  = ".event-cell__start-time"
+PITCHER_SELECTOR = ".event-cell__pitcher"
+LINE_SELECTOR  = '[data-testid="sportsbook-outcome-cell-line"]'
+ODDS_SELECTOR  = '[data-testid="sportsbook-odds"]'
+
+EXTRACT_TABLES_JS = """
+(sel) => {
+    const text = (root, s) => {
+        const el = root.querySelector(s);
+        return el ? el.innerText.trim() : null;
+    };
+    const texts = (root, s) =>
+        Array.from(root.querySelectorAll(s), el => el.innerText.trim());
+
+    return Array.from(document.querySelectorAll(sel.table), table => ({
+        date: text(table, sel.date),
+        rows: Array.from(table.querySelectorAll("tbody tr"), row => {
+            const cells = row.querySelectorAll("td");
+            return {
+                team:       text(row, sel.team),
+                start_time: text(row, sel.time),
+                pitcher:    text(row, sel.pitcher),
+                lines:      texts(row, sel.line),
+                total:      cells.length > 1 ? text(cells[1], sel.line) : null,
+                odds:       texts(row, sel.odds),
+            };
+        }),
+    }));
+}
+"""
+
+FEED_TIMEOUT = 15  # seconds to wait for the event feed after navigation
+
+SELECTORS = {
+    "table":   TABLE_SELECTOR,
+    "date":    DATE_SELECTOR,
+    "team":    TEAM_SELECTOR,
+    "time":    TIME_SELECTOR,
+    "pitcher": PITCHER_SELECTOR,
+    "line":    LINE_SELECTOR,
+    "odds":    ODDS_SELECTOR,
+}
+
+
+async def read_tables(page):
+    """Read every odds table on the page in one in-page evaluation."""
+    return await page.evaluate(EXTRACT_TABLES_JS, SELECTORS)
+
+
+async def _text(root, selector):
+    elem = await root.query_selector(selector)
+    return (await elem.inner_text()).strip() if elem else None
+
+
+async def _texts(root, selector):
+    return [(await e.inner_text()).strip() for e in await root.query_selector_all(selector)]
+
+
+async def read_tables_per_element(page):
+    """Read the odds tables with one browser round trip per field."""
+    tables = []
+    for table in await page.query_selector_all(TABLE_SELECTOR):
+        rows = []
+        for row in await table.query_selector_all("tbody tr"):
+            cells = await row.query_selector_all("td")
+            rows.append({
+                "team":       await _text(row, TEAM_SELECTOR),
+                "start_time": await _text(row, TIME_SELECTOR),
+                "pitcher":    await _text(row, PITCHER_SELECTOR),
+                "lines":      await _texts(row, LINE_SELECTOR),
+                "total":      await _text(cells[1], LINE_SELECTOR) if len(cells) > 1 else None,
+                "odds":       await _texts(row, ODDS_SELECTOR),
+            })
+        tables.append({"date": await _text(table, DATE_SELECTOR), "rows": rows})
+    return tables
+
+
+async def capture_feed(page, url, timeout=FEED_TIMEOUT):
+    """
+    Open a DraftKings league page and return the JSON event feed payloads
+    it fetched, or an empty list if none arrived within `timeout` seconds.
+    """
+    payloads = []
+    feed_seen = asyncio.Event()
+
+    async def on_response(response):
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return
+        if "json" not in response.headers.get("content-type", ""):
+            return
+        try:
+            body = await response.json()
+        except Exception:
+            return
+        if is_feed_payload(body):
+            payloads.append(body)
+            feed_seen.set()
+
+    page.on("response", on_response)
+    try:
+        await load_page(page, url)
+        await asyncio.wait_for(feed_seen.wait(), timeout)
+        # Give the markets request that usually follows the events a moment
+        await page.wait_for_load_state("networkidle", timeout=3000)
+    except (asyncio.TimeoutError, PlaywrightTimeoutError):
+        pass
+    except Exception as e:
+        print(f"Feed capture failed: {e}")
+    finally:
+        page.remove_listener("response", on_response)
+
+    print(f"Captured {len(payloads)} DraftKings feed payloads")
+    return payloads
+
+
+async def wait_for_tables(page, url, navigate=True):
+    """
+    Open a DraftKings league page and wait for its odds rows to render.
+    With navigate=False the page already open is waited on as-is. Returns
+    False if no rows showed up.
+    """
+    try:
+        if navigate or page.url == "about:blank":
+            ready = await load_page(page, url, [ROW_SELECTOR])
+        else:
+            ready = await page.wait_for_selector(ROW_SELECTOR, timeout=30000) is not None
+    except PlaywrightTimeoutError as e:
+        print(f"Failed to load page: {e}")
+        return False
+    if not ready:
+        print("Failed to load page: no odds rows rendered")
+    return ready
+
+
+async def extract_tables(page):
+    """Read the odds tables, per element if the bulk evaluation fails."""
+    try:
+        return await read_tables(page)
+    except Exception as e:
+        print(f"Bulk extraction failed, reading tables per element: {e}")
+        return await read_tables_per_element(page)
+
+
+async def load_tables(page, url, navigate=True):
+    """
+    Open a DraftKings league page and return its odds tables, or an empty
+    list if the page never rendered any rows.
+    """
+    if not await wait_for_tables(page, url, navigate):
+        return []
+    return await extract_tables(page)
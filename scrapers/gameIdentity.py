@@ -0,0 +1,282 @@
+"""
+Canonical game identity across DraftKings, ESPN and the MLB Stats API.
+
+Every source names teams and start times its own way ("PHI Eagles",
+"Philadelphia Eagles", local vs UTC times), so game_ids built from display
+strings never line up. GameResolver maps each source record to one
+canonical game:
+
+    nfl:DAL@PHI:20250905T0020Z
+
+built from team codes (via the `team_aliases` table) and the UTC start.
+A record whose teams match an existing game starting within MATCH_WINDOW
+reuses that game, so a slightly different start time from another source
+does not create a duplicate. A game already keyed to a different id from
+the same source is never matched that way, so the two halves of a
+doubleheader stay apart; game 2 and later also carry the game number
+(`-G2`) in their id. Source ids (MLB gamePk, ESPN and DK event ids) are
+kept in `game_keys`, so a source record seen before resolves with one
+dict lookup.
+
+Starts from AUTHORITATIVE_SOURCES replace the stored one, so a
+rescheduled game moves; other sources keep the stored start.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+# Config
+MATCH_WINDOW = timedelta(hours=3)
+AUTHORITATIVE_SOURCES = {"mlb-api", "espn"}     # official schedules own start_utc
+
+# (code, location, nickname, other aliases)
+TEAMS = {
+    "nfl": [
+        ("ARI", "Arizona", "Cardinals", ("AZ",)),
+        ("ATL", "Atlanta", "Falcons", ()),
+        ("BAL", "Baltimore", "Ravens", ()),
+        ("BUF", "Buffalo", "Bills", ()),
+        ("CAR", "Carolina", "Panthers", ()),
+        ("CHI", "Chicago", "Bears", ()),
+        ("CIN", "Cincinnati", "Bengals", ()),
+        ("CLE", "Cleveland", "Browns", ()),
+        ("DAL", "Dallas", "Cowboys", ()),
+        ("DEN", "Denver", "Broncos", ()),
+        ("DET", "Detroit", "Lions", ()),
+        ("GB", "Green Bay", "Packers", ("GNB",)),
+        ("HOU", "Houston", "Texans", ()),
+        ("IND", "Indianapolis", "Colts", ()),
+        ("JAX", "Jacksonville", "Jaguars", ("JAC",)),
+        ("KC", "Kansas City", "Chiefs", ("KAN",)),
+        ("LV", "Las Vegas", "Raiders", ("LVR",)),
+        ("LAC", "Los Angeles", "Chargers", ("LA Chargers",)),
+        ("LAR", "Los Angeles", "Rams", ("LA Rams", "LA")),
+        ("MIA", "Miami", "Dolphins", ()),
+        ("MIN", "Minnesota", "Vikings", ()),
+        ("NE", "New England", "Patriots", ("NWE",)),
+        ("NO", "New Orleans", "Saints", ("NOR",)),
+        ("NYG", "New York", "Giants", ("NY Giants",)),
+        ("NYJ", "New York", "Jets", ("NY Jets",)),
+        ("PHI", "Philadelphia", "Eagles", ()),
+        ("PIT", "Pittsburgh", "Steelers", ()),
+        ("SF", "San Francisco", "49ers", ("SFO",)),
+        ("SEA", "Seattle", "Seahawks", ()),
+        ("TB", "Tampa Bay", "Buccaneers", ("TAM",)),
+        ("TEN", "Tennessee", "Titans", ()),
+        ("WSH", "Washington", "Commanders", ("WAS",)),
+    ],
+    "mlb": [
+        ("ARI", "Arizona", "Diamondbacks", ("AZ", "D-backs")),
+        ("ATL", "Atlanta", "Braves", ()),
+        ("BAL", "Baltimore", "Orioles", ()),
+        ("BOS", "Boston", "Red Sox", ()),
+        ("CHC", "Chicago", "Cubs", ("CHI Cubs",)),
+        ("CWS", "Chicago", "White Sox", ("CHW", "CHI White Sox")),
+        ("CIN", "Cincinnati", "Reds", ()),
+        ("CLE", "Cleveland", "Guardians", ()),
+        ("COL", "Colorado", "Rockies", ()),
+        ("DET", "Detroit", "Tigers", ()),
+        ("HOU", "Houston", "Astros", ()),
+        ("KC", "Kansas City", "Royals", ("KCR",)),
+        ("LAA", "Los Angeles", "Angels", ("LA Angels",)),
+        ("LAD", "Los Angeles", "Dodgers", ("LA Dodgers",)),
+        ("MIA", "Miami", "Marlins", ()),
+        ("MIL", "Milwaukee", "Brewers", ()),
+        ("MIN", "Minnesota", "Twins", ()),
+        ("NYM", "New York", "Mets", ("NY Mets",)),
+        ("NYY", "New York", "Yankees", ("NY Yankees",)),
+        ("ATH", "Oakland", "Athletics", ("OAK", "A's", "Sacramento Athletics")),
+        ("PHI", "Philadelphia", "Phillies", ()),
+        ("PIT", "Pittsburgh", "Pirates", ()),
+        ("SD", "San Diego", "Padres", ("SDP",)),
+        ("SF", "San Francisco", "Giants", ("SFG",)),
+        ("SEA", "Seattle", "Mariners", ()),
+        ("STL", "St. Louis", "Cardinals", ()),
+        ("TB", "Tampa Bay", "Rays", ("TBR",)),
+        ("TEX", "Texas", "Rangers", ()),
+        ("TOR", "Toronto", "Blue Jays", ()),
+        ("WSH", "Washington", "Nationals", ("WSN", "WAS")),
+    ],
+}
+
+MONTHS = {m: i for i, m in enumerate(
+    ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"], 1
+)}
+
+
+def normalize_name(name):
+    """Lowercase, drop punctuation and collapse spaces: 'St. Louis' -> 'st louis'."""
+    return " ".join(re.sub(r"[^\w\s-]", "", name or "").lower().split())
+
+
+def alias_rows(sport):
+    """(sport, alias, code) rows seeding `team_aliases`."""
+    rows = {}
+    for code, location, nickname, others in TEAMS[sport]:
+        codes = [code] + [o for o in others if o.isupper() and " " not in o]
+        names = [f"{location} {nickname}", nickname, *others]
+        names += [f"{c} {nickname}" for c in codes]  # DraftKings style: "PHI Eagles"
+        for alias in codes + names:
+            rows[normalize_name(alias)] = code
+    return [(sport, alias, code) for alias, code in rows.items()]
+
+
+def to_utc(value):
+    """Aware UTC datetime from an ISO string ('...Z' ok) or datetime."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.astimezone()  # naive means this machine's local time
+    return value.astimezone(timezone.utc)
+
+
+def parse_display_start(date_text, time_text, now=None, tz=None):
+    """
+    UTC start from DraftKings table text such as ('THU SEP 4TH', '8:20PM'),
+    read in `tz` (default: this machine's time zone). The year is the one
+    that puts the date nearest to `now` (naive, in the same zone), so a
+    January game seen in December rolls over.
+    """
+    now = now or datetime.now()
+    if not date_text or not time_text:
+        return None
+    parts = str(date_text).upper().split()
+    if parts and parts[0] in ("TODAY", "TOMORROW"):
+        day = now.date() + timedelta(days=parts[0] == "TOMORROW")
+        month, day_num = day.month, day.day
+    else:
+        month = next((MONTHS[p[:3]] for p in parts if p[:3] in MONTHS), None)
+        digits = [int(re.sub(r"\D", "", p)) for p in parts if re.sub(r"\D", "", p)]
+        if month is None or not digits:
+            return None
+        day_num = digits[0]
+    try:
+        clock = datetime.strptime(time_text.replace(" ", "").upper(), "%I:%M%p").time()
+        candidates = [
+            datetime(year, month, day_num, clock.hour, clock.minute)
+            for year in (now.year - 1, now.year, now.year + 1)
+        ]
+    except ValueError:
+        return None
+    start = min(candidates, key=lambda d: abs(d - now))
+    return to_utc(start.replace(tzinfo=tz) if tz else start)
+
+
+def canonical_id(sport, away, home, start, game_number=None):
+    stamp = start.strftime("%Y%m%dT%H%MZ") if start else "TBD"
+    suffix = f"-G{game_number}" if game_number and int(game_number) > 1 else ""
+    return f"{sport}:{away}@{home}:{stamp}{suffix}"
+
+
+class GameResolver:
+    """Resolve source records to canonical game ids for one odds database."""
+
+    def __init__(self, conn, sport):
+        self.conn = conn
+        self.sport = sport
+        self.aliases = dict(conn.execute(
+            "SELECT alias, team FROM team_aliases WHERE sport = ?", (sport,)
+        ))
+        # Longest first so 'white sox' wins over 'sox'
+        self.nicknames = sorted(
+            {normalize_name(nick): code for code, _, nick, _ in TEAMS.get(sport, [])}.items(),
+            key=lambda item: -len(item[0]),
+        )
+        self.keys = {}
+        self.sources = {}       # game_id -> {source: source_key}
+        for source, key, game_id in conn.execute("SELECT source, source_key, game_id FROM game_keys"):
+            self._key(source, key, game_id)
+        self.games = {}
+        self.starts = {}
+        for game_id, away, home, start in conn.execute(
+            "SELECT game_id, away_code, home_code, start_utc FROM games WHERE start_utc IS NOT NULL"
+        ):
+            self._remember(game_id, away, home, datetime.fromtimestamp(start, timezone.utc))
+        self.pending_keys = []
+        self.pending_starts = []
+
+    def _key(self, source, key, game_id):
+        self.keys[(source, key)] = game_id
+        self.sources.setdefault(game_id, {})[source] = key
+
+    def _remember(self, game_id, away, home, start):
+        self.games.setdefault((away, home), []).append((start, game_id))
+        self.starts[game_id] = start
+
+    def _move(self, game_id, away, home, start):
+        """Point a known game at a new start."""
+        self.games[(away, home)] = [
+            (start if gid == game_id else known, gid) for known, gid in self.games.get((away, home), [])
+        ]
+        self.starts[game_id] = start
+        self.pending_starts.append((int(start.timestamp()), game_id))
+
+    def _taken(self, game_id, source, key):
+        """True if game_id is already keyed to a different record from source."""
+        return key is not None and self.sources.get(game_id, {}).get(source, key) != key
+
+    def team(self, name):
+        """Team code for any alias or name ending in a known nickname."""
+        text = normalize_name(name)
+        code = self.aliases.get(text)
+        if code is None:
+            code = next((c for nick, c in self.nicknames if text.endswith(nick)), None)
+            if code is not None:
+                self.aliases[text] = code
+        return code
+
+    def resolve(self, source, source_key, home_team, away_team, start, game_number=None):
+        """
+        Canonical game id for one source record, plus the team codes and
+        UTC start stored with it: (game_id, home_code, away_code, start).
+        A matched game keeps its stored start unless source is one of
+        AUTHORITATIVE_SOURCES.
+        """
+        start = to_utc(start)
+        home = self.team(home_team) or normalize_name(home_team).replace(" ", "-")
+        away = self.team(away_team) or normalize_name(away_team).replace(" ", "-")
+        key = str(source_key) if source_key is not None else None
+
+        game_id = self.keys.get((source, key)) if key is not None else None
+        if game_id is None and start is not None:
+            nearby = [
+                (abs(known - start), gid)
+                for known, gid in self.games.get((away, home), [])
+                if abs(known - start) <= MATCH_WINDOW and not self._taken(gid, source, key)
+            ]
+            if nearby:
+                game_id = min(nearby)[1]
+        if game_id is None:
+            game_id = canonical_id(self.sport, away, home, start, game_number)
+            if self._taken(game_id, source, key):
+                game_id = f"{game_id}-{key}"
+            if start is not None and game_id not in self.starts:
+                self._remember(game_id, away, home, start)
+
+        known = self.starts.get(game_id)
+        if source in AUTHORITATIVE_SOURCES and start is not None and known not in (None, start):
+            self._move(game_id, away, home, start)
+        else:
+            start = known or start
+
+        if key is not None and (source, key) not in self.keys:
+            self._key(source, key, game_id)
+            self.pending_keys.append((source, key, game_id))
+        return game_id, home, away, start
+
+    def flush(self):
+        """Store new source-id mappings and moved starts; the caller commits."""
+        if self.pending_keys:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO game_keys (source, source_key, game_id) VALUES (?, ?, ?)",
+                self.pending_keys,
+            )
+        if self.pending_starts:
+            self.conn.executemany("UPDATE games SET start_utc = ? WHERE game_id = ?", self.pending_starts)
+        self.pending_keys = []
+        self.pending_starts = []
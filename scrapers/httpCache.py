@@ -0,0 +1,135 @@
+"""
+Persistent conditional-request cache for the JSON API scrapers.
+
+For every URL the cache keeps the ETag and Last-Modified validators from the
+last processed response plus a SHA-256 of its body. Repeat polls send
+If-None-Match / If-Modified-Since; a 304, or a 200 whose body hashes the
+same as last time, counts as a hit and the caller skips parsing and DB
+writes. Validators are only saved once the caller has processed a response
+(`commit`), so a failed import is retried on the next poll.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+import requests
+
+from scrapers import httpClient
+
+# Config
+CACHE_DB = "data/http_cache.db"
+
+# What a scraper's main() returns when every feed it polled was unchanged,
+# so run_scrapers can tell a quiet feed from a broken one
+UNCHANGED = "unchanged"
+
+
+class CachedResponse:
+    """A fetched response and the validators to store once it is processed."""
+
+    def __init__(self, url, changed, body=None, etag=None, last_modified=None, body_hash=None):
+        self.url           = url
+        self.changed       = changed
+        self.body          = body
+        self.etag          = etag
+        self.last_modified = last_modified
+        self.body_hash     = body_hash
+
+    def json(self):
+        return json.loads(self.body) if self.body is not None else None
+
+
+class HttpCache:
+    """ETag / Last-Modified / body-hash cache backed by SQLite."""
+
+    def __init__(self, db_name=CACHE_DB):
+        self.db_name = db_name
+        self.hits = 0
+        self.misses = 0
+        self._count_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url            TEXT PRIMARY KEY,
+                etag           TEXT,
+                last_modified  TEXT,
+                body_hash      TEXT,
+                fetched_at     TEXT
+            );
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_name)
+
+    def _lookup(self, url):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT etag, last_modified, body_hash FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+
+    def fetch(self, url, params=None, timeout=10):
+        """
+        GET `url` through the shared HTTP client with conditional headers and
+        return a CachedResponse whose `changed` is False when the payload is
+        the same as last processed.
+        """
+        full_url = requests.Request("GET", url, params=params).prepare().url
+        cached = self._lookup(full_url)
+
+        headers = {}
+        if cached and cached[0]:
+            headers["If-None-Match"] = cached[0]
+        if cached and cached[1]:
+            headers["If-Modified-Since"] = cached[1]
+
+        resp = httpClient.get(full_url, headers=headers, timeout=timeout)
+        if resp.status_code == 304:
+            self._count(hit=True)
+            return CachedResponse(full_url, changed=False)
+        resp.raise_for_status()
+
+        body_hash = hashlib.sha256(resp.content).hexdigest()
+        result = CachedResponse(
+            full_url,
+            changed=not (cached and cached[2] == body_hash),
+            body=resp.content,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+            body_hash=body_hash,
+        )
+        self._count(hit=not result.changed)
+        if not result.changed:
+            # Same body; refresh the validators so the next poll can get a 304
+            self.commit(result)
+        return result
+
+    def _count(self, hit):
+        with self._count_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def commit(self, response):
+        """Store a processed response's validators and body hash."""
+        if response.body_hash is None:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO http_cache (url, etag, last_modified, body_hash, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag          = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    body_hash     = excluded.body_hash,
+                    fetched_at    = excluded.fetched_at
+                """,
+                (response.url, response.etag, response.last_modified, response.body_hash,
+                 datetime.now(timezone.utc).replace(microsecond=0).isoformat()),
+            )
+
+    def summary(self):
+        return f"cache hits: {self.hits}, misses: {self.misses}"
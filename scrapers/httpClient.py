@@ -0,0 +1,101 @@
+"""
+Shared HTTP client for the API-based scrapers.
+
+One requests.Session per process with keep-alive connection pooling and a
+retry/backoff policy, plus a per-host concurrency limit so fan-out cannot
+flood a single API. The asyncio interface runs the pooled blocking calls
+on worker threads, so many requests can be in flight at once:
+
+    responses = fetch_many(get_json, [(url, {"week": w}) for w in weeks])
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Config
+POOL_SIZE      = 20     # keep-alive connections kept per host
+PER_HOST_LIMIT = 8      # requests in flight per host
+MAX_IN_FLIGHT  = 32     # worker threads for gather()
+TIMEOUT        = 10
+RETRIES = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET", "HEAD"],
+)
+USER_AGENT = "LineShift/1.0"
+
+_session = None
+_session_lock = threading.Lock()
+_host_limits = {}
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=RETRIES
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+        return _session
+
+
+def _host_limit(url):
+    host = urlparse(url).netloc
+    with _session_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return _host_limits[host]
+
+
+def get(url, params=None, headers=None, timeout=TIMEOUT, **kwargs):
+    """GET through the shared pool, waiting for a free per-host slot."""
+    with _host_limit(url):
+        return get_session().get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+
+
+def get_json(url, params=None, timeout=TIMEOUT):
+    """GET and decode JSON, raising for HTTP errors."""
+    resp = get(url, params=params, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
+
+
+# asyncio interface
+
+async def aget(url, params=None, headers=None, timeout=TIMEOUT):
+    return await asyncio.to_thread(get, url, params, headers, timeout)
+
+
+async def aget_json(url, params=None, timeout=TIMEOUT):
+    return await asyncio.to_thread(get_json, url, params, timeout)
+
+
+async def gather(func, arg_list):
+    """
+    Run `func(*args)` for every args tuple concurrently on worker threads.
+    Results come back in order; a failed call returns its exception.
+    """
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT) as executor:
+        return await asyncio.gather(
+            *(loop.run_in_executor(executor, partial(func, *args)) for args in arg_list),
+            return_exceptions=True,
+        )
+
+
+def fetch_many(func, arg_list):
+    """Synchronous wrapper around gather() for callers without a loop."""
+    return asyncio.run(gather(func, arg_list))
@@ -1,202 +1,192 @@
-import sqlite3
-from datetime import datetime, timezone, timedelta
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scrapers.browserPool import get_pool, close_pool
+from scrapers.draftkings import capture_feed, wait_for_tables, extract_tables
+from scrapers.dkFeed import format_american, format_total, parse_feed
+from scrapers.gameIdentity import parse_display_start
+from scrapers.pageLoad import PageTimer
+from scrapers.storage import Storage
 
 # Config
 DB_NAME = "data/mlb_odds.db"
 MLB_URL = "https://sportsbook.draftkings.com/leagues/baseball/mlb"
 PROVIDER = "DraftKings-MLB-Web"
+GAME_COLUMNS = (
+    "game_id", "start_time", "game_date", "home_team", "away_team", "home_pitcher", "away_pitcher",
+    "home_code", "away_code", "start_utc",
+)
 
-# Database helpers
-def insert_game(cursor, game_id, start_time, game_date, home_team, away_team, home_pitcher, away_pitcher):
-    """
-    Upsert the game entry. We REPLACE if it already exists.
-    """
-    cursor.execute(
-        """
-        INSERT OR REPLACE INTO games
-            (game_id, start_time, game_date, home_team, away_team, home_pitcher, away_pitcher)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-        (game_id, start_time, game_date, home_team, away_team, home_pitcher, away_pitcher),
-    )
-
-def insert_odds(cursor, game_id, total, moneyline_home, moneyline_away):
+# Scraping logic
+def parse_tables(tables):
     """
-    Insert a new odds row. We timestamp with UTC (no microseconds).
+    Pair the away/home rows of the extracted DraftKings tables into a list
+    of dicts with all the fields we need.
     """
-    timestamp = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
-    cursor.execute(
-        """
-        INSERT INTO odds
-            (game_id, provider, spread_details, over_under, moneyline_home, moneyline_away, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-        (game_id, PROVIDER, None, total, moneyline_home, moneyline_away, timestamp),
-    )
+    results = []
+    print(f"Found {len(tables)} tables")
+
+    for table_idx, table in enumerate(tables):
+        # Date from this specific table's header
+        raw_date = table["date"]
+        if raw_date:
+            print(f"Raw date for table {table_idx + 1}: {raw_date}")
+
+            # Convert relative dates to actual dates
+            if raw_date == "TODAY":
+                game_date = datetime.now().strftime("%a %b %d").upper()
+            elif raw_date == "TOMORROW":
+                tomorrow = datetime.now() + timedelta(days=1)
+                game_date = tomorrow.strftime("%a %b %d").upper()
+            else:
+                game_date = raw_date
+
+            print(f"Game date for table {table_idx + 1}: {game_date}")
+        else:
+            game_date = "TBD"
+            print(f"Could not find game date in table {table_idx + 1} header")
+
+        rows = table["rows"]
+        print(f"Found {len(rows)} rows in table {table_idx + 1} (2 per game)")
+
+        # Iterate in pairs: away_row, home_row
+        for i in range(0, len(rows), 2):
+            try:
+                # Check if we have both away and home rows
+                if i + 1 >= len(rows):
+                    print(f"Skipping incomplete game pair at row {i}")
+                    continue
 
-# Scraping logic
-def scrape_mlb_odds():
+                away = rows[i]
+                home = rows[i + 1]
+
+                if not away["team"] or not home["team"]:
+                    print(f"Skipping row {i}: Missing team names")
+                    continue
+
+                away_team = away["team"]
+                home_team = home["team"]
+
+                # Over/Under (total)
+                total = away["total"]
+
+                # Moneylines
+                moneyline_away = away["odds"][-1] if away["odds"] else None
+                moneyline_home = home["odds"][-1] if home["odds"] else None
+
+                # Start time
+                start_time = away["start_time"] or "TBD"
+
+                # Pitchers
+                away_pitcher = away["pitcher"]
+                home_pitcher = home["pitcher"]
+
+                results.append({
+                    "start_utc":    parse_display_start(game_date, start_time),
+                    "start_time":   start_time,
+                    "game_date":    game_date,
+                    "home_team":    home_team,
+                    "away_team":    away_team,
+                    "home_pitcher": home_pitcher,
+                    "away_pitcher": away_pitcher,
+                    "total":        total,
+                    "moneyline_home": moneyline_home,
+                    "moneyline_away": moneyline_away,
+                })
+
+                print(f"Parsed: {away_team} @ {home_team} ({start_time}) on {game_date}")
+
+            except Exception as e:
+                print(f"Skipping row {i}: {e}")
+                continue
+
+    return results
+
+def parse_feed_games(payloads):
     """
-    Launch a headless browser, scrape the DraftKings MLB odds table,
-    and return a list of dicts with all the fields we need.
+    Build game dicts from captured DraftKings feed payloads. Odds come back
+    numeric and are written out as the tables display them, so switching
+    between the feed and the tables never looks like a line move. The feed
+    carries no probable pitchers; those come from mlbScheduleAPI.
     """
     results = []
+    for event in parse_feed(payloads):
+        if event["start"] is None:
+            continue
+        start_local = event["start"].astimezone()
+        start_time = start_local.strftime("%I:%M %p").lstrip("0")
+        game_date = start_local.strftime("%a %b %d").upper()
+
+        home_team = event["home_team"]
+        away_team = event["away_team"]
+
+        results.append({
+            "source_key":   event["event_id"],
+            "start_utc":    event["start"],
+            "start_time":   start_time,
+            "game_date":    game_date,
+            "home_team":    home_team,
+            "away_team":    away_team,
+            "home_pitcher": None,
+            "away_pitcher": None,
+            "total":        format_total(event["total"]),
+            "moneyline_home": format_american(event["moneyline_home"]),
+            "moneyline_away": format_american(event["moneyline_away"]),
+        })
+        print(f"Parsed: {away_team} @ {home_team} ({start_time}) on {game_date} [feed]")
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-
-        try:
-            page.goto(MLB_URL, timeout=60000)
-            page.wait_for_selector("table.sportsbook-table tbody tr", timeout=30000)
-        except PlaywrightTimeoutError as e:
-            print(f"Page load failed: {e}")
-            browser.close()
-            return results
-
-        # Find all tables and process each one
-        tables = page.query_selector_all("table.sportsbook-table")
-        print(f"Found {len(tables)} tables")
-        
-        for table_idx, table in enumerate(tables):
-            # Extract date from this specific table's header
-            try:
-                date_elem = table.query_selector(".sportsbook-table-header__title span span")
-                if date_elem:
-                    raw_date = date_elem.inner_text().strip()
-                    print(f"Raw date for table {table_idx + 1}: {raw_date}")
-                    
-                    # Convert relative dates to actual dates
-                    if raw_date == "TODAY":
-                        game_date = datetime.now().strftime("%a %b %d").upper()
-                    elif raw_date == "TOMORROW":
-                        tomorrow = datetime.now() + timedelta(days=1)
-                        game_date = tomorrow.strftime("%a %b %d").upper()
-                    else:
-                        game_date = raw_date
-                    
-                    print(f"Game date for table {table_idx + 1}: {game_date}")
-                else:
-                    game_date = "TBD"
-                    print(f"Could not find game date in table {table_idx + 1} header")
-            except Exception as e:
-                game_date = "TBD"
-                print(f"Error extracting game date from table {table_idx + 1}: {e}")
-            
-            # Get rows from this specific table
-            rows = table.query_selector_all("tbody tr")
-            print(f"Found {len(rows)} rows in table {table_idx + 1} (2 per game)")
-
-            # Iterate in pairs: away_row, home_row
-            for i in range(0, len(rows), 2):
-                try:
-                    # Check if we have both away and home rows
-                    if i + 1 >= len(rows):
-                        print(f"Skipping incomplete game pair at row {i}")
-                        continue
-                        
-                    away = rows[i]
-                    home = rows[i + 1]
-
-                    # Teams with null checks
-                    away_team_elem = away.query_selector(".event-cell__name-text")
-                    home_team_elem = home.query_selector(".event-cell__name-text")
-                    
-                    if not away_team_elem or not home_team_elem:
-                        print(f"Skipping row {i}: Missing team names")
-                        continue
-                        
-                    away_team = away_team_elem.inner_text().strip()
-                    home_team = home_team_elem.inner_text().strip()
-
-                    # Over/Under (total)
-                    total_cell = away.query_selector_all("td")[1] if len(away.query_selector_all("td")) > 1 else None
-                    total = None
-                    if total_cell:
-                        total_elem = total_cell.query_selector('[data-testid="sportsbook-outcome-cell-line"]')
-                        total = total_elem.inner_text().strip() if total_elem else None
-
-                    # Moneylines
-                    away_ml = away.query_selector_all('[data-testid="sportsbook-odds"]')
-                    home_ml = home.query_selector_all('[data-testid="sportsbook-odds"]')
-                    moneyline_away = away_ml[-1].inner_text().strip() if away_ml else None
-                    moneyline_home = home_ml[-1].inner_text().strip() if home_ml else None
-
-                    # Start time
-                    start_elem = away.query_selector(".event-cell__start-time")
-                    start_time = start_elem.inner_text().strip() if start_elem else "TBD"
-
-                    # Pitchers
-                    away_pitcher_elem = away.query_selector(".event-cell__pitcher")
-                    home_pitcher_elem = home.query_selector(".event-cell__pitcher")
-                    away_pitcher = away_pitcher_elem.inner_text().strip() if away_pitcher_elem else None
-                    home_pitcher = home_pitcher_elem.inner_text().strip() if home_pitcher_elem else None
-
-                    game_id = f"{away_team}@{home_team} {start_time}"
-
-                    results.append({
-                        "game_id":      game_id,
-                        "start_time":   start_time,
-                        "game_date":    game_date,
-                        "home_team":    home_team,
-                        "away_team":    away_team,
-                        "home_pitcher": home_pitcher,
-                        "away_pitcher": away_pitcher,
-                        "total":        total,
-                        "moneyline_home": moneyline_home,
-                        "moneyline_away": moneyline_away,
-                    })
-
-                    print(f"Parsed: {away_team} @ {home_team} ({start_time}) on {game_date}")
-
-                except Exception as e:
-                    print(f"Skipping row {i}: {e}")
-                    continue
+    return results
 
-        browser.close()
+async def extract_mlb_odds(page):
+    """
+    Scrape the DraftKings MLB odds from a browser page and return a list of
+    dicts with all the fields we need. Reads the page's JSON feed when it is
+    seen, else the rendered tables.
+    """
+    timer = PageTimer("mlbOddsDK")
+    payloads = await capture_feed(page, MLB_URL)
+    timer.navigated()
+    results = parse_feed_games(payloads) if payloads else []
+    if not results:
+        print("No usable DraftKings feed; reading the rendered tables")
+        ready = await wait_for_tables(page, MLB_URL, navigate=False)
+        timer.navigated()
+        results = parse_tables(await extract_tables(page)) if ready else []
+    timer.done()
     return results
 
+def scrape_mlb_odds(pool=None):
+    """
+    Scrape DraftKings MLB odds on a page from the shared browser pool.
+    """
+    pool = pool or get_pool()
+    return pool.run(extract_mlb_odds)
+
 
 # Main
 def main():
     odds_data = scrape_mlb_odds()
     if not odds_data:
         print("No games scraped; exiting.")
-        return
-
-    # Persist into SQLite
-    try:
-        with sqlite3.connect(DB_NAME) as conn:
-            cur = conn.cursor()
-            for g in odds_data:
-                try:
-                    insert_game(
-                        cur,
-                        g["game_id"],
-                        g["start_time"],
-                        g["game_date"],
-                        g["home_team"],
-                        g["away_team"],
-                        g["home_pitcher"],
-                        g["away_pitcher"],
-                    )
-                    insert_odds(
-                        cur,
-                        g["game_id"],
-                        g["total"],
-                        g["moneyline_home"],
-                        g["moneyline_away"],
-                    )
-                except Exception as e:
-                    print(f"Error inserting game {g.get('game_id', 'unknown')}: {e}")
-                    continue
-            conn.commit()
-        print(f"Stored odds for {len(odds_data)} games into `{DB_NAME}`")
-    except sqlite3.Error as e:
-        print(f"Database error: {e}")
-    except Exception as e:
-        print(f"Unexpected error: {e}")
+        return 0
+
+    # Persist into SQLite; known pitchers are kept when the feed has none
+    with Storage(DB_NAME) as db:
+        db.identify_games("mlb", "dk", odds_data)
+        games = [{c: g[c] for c in GAME_COLUMNS} for g in odds_data]
+        lines = [
+            (g["game_id"], PROVIDER, None, g["total"], g["moneyline_home"], g["moneyline_away"])
+            for g in odds_data
+        ]
+        db.upsert_games(games)
+        db.append_odds(lines, source="dk")
+        print(f"Stored odds for {len(odds_data)} games into `{DB_NAME}` ({db.odds.summary()})")
+    return len(odds_data)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        close_pool()
@@ -1,18 +1,26 @@
 #!/usr/bin/env python3
-import sqlite3
+import os
+import sys
 import requests
 from datetime import datetime, timezone, timedelta
 import json
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scrapers.httpCache import HttpCache, UNCHANGED
+from scrapers.storage import Storage
+
 # Config
 DB_NAME = "data/mlb_odds.db"
 MLB_API_BASE = "https://statsapi.mlb.com/api/v1"
 PROVIDER = "MLB-API"
+KEY_FIELDS = ("source_key", "game_number")   # used to resolve the game, not stored in `games`
 
-def fetch_mlb_schedule(start_date=None, end_date=None):
+def fetch_mlb_schedule(start_date=None, end_date=None, cache=None):
     """
-    Fetch MLB schedule from the official API
+    Fetch MLB schedule from the official API. Returns a CachedResponse
+    (`changed` is False if the schedule is unchanged) or None on error.
     """
+    cache = cache or HttpCache()
     if not start_date:
         start_date = datetime.now().date()
     if not end_date:
@@ -27,16 +35,14 @@ def fetch_mlb_schedule(start_date=None, end_date=None):
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return cache.fetch(url, params=params, timeout=10)
     except requests.RequestException as e:
         print(f"Error fetching MLB schedule: {e}")
         return None
 
-def insert_game_schedule(cursor, game_data):
+def schedule_row(game_data):
     """
-    Insert or update game schedule data from MLB API
+    Build the `games` row for one game from the MLB API schedule
     """
     game_pk = game_data["gamePk"]
     game_date = game_data["officialDate"]
@@ -68,22 +74,20 @@ def insert_game_schedule(cursor, game_data):
     except:
         start_time = "TBD"
     
-    # Create game ID that matches your existing format
-    game_id = f"{away_team}@{home_team} {start_time}"
-    
     # Format date for display
     display_date = datetime.strptime(game_date, "%Y-%m-%d").strftime("%a %b %d").upper()
     
-    cursor.execute(
-        """
-        INSERT OR REPLACE INTO games
-            (game_id, start_time, game_date, home_team, away_team, home_pitcher, away_pitcher)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-        (game_id, start_time, display_date, home_team, away_team, home_pitcher, away_pitcher),
-    )
-    
-    return game_id
+    return {
+        "source_key":   game_pk,
+        "game_number":  game_data.get("gameNumber") if game_data.get("doubleHeader", "N") != "N" else None,
+        "start_utc":    game_time,
+        "start_time":   start_time,
+        "game_date":    display_date,
+        "home_team":    home_team,
+        "away_team":    away_team,
+        "home_pitcher": home_pitcher,
+        "away_pitcher": away_pitcher,
+    }
 
 def main():
     print("Fetching MLB schedule from official API...")
@@ -93,50 +97,43 @@ def main():
     start_date = datetime.now().date()
     end_date = start_date + timedelta(days=7)
     
-    schedule_data = fetch_mlb_schedule(start_date, end_date)
-    if not schedule_data:
-        print("Failed to fetch schedule data")
-        return
+    cache = HttpCache()
+    response = fetch_mlb_schedule(start_date, end_date, cache)
+    if response is None:
+        raise RuntimeError("Failed to fetch MLB schedule")
+    if not response.changed:
+        print(f"MLB schedule unchanged; skipping import ({cache.summary()})")
+        return UNCHANGED
+    schedule_data = response.json()
     
-    games_processed = 0
+    rows = []
     
-    try:
-        with sqlite3.connect(DB_NAME) as conn:
-            cur = conn.cursor()
-            
-            # Process each date in the schedule
-            for date_data in schedule_data.get("dates", []):
-                date = date_data["date"]
-                games = date_data.get("games", [])
-                
-                print(f"Processing {len(games)} games for {date}")
+    # Process each date in the schedule
+    for date_data in schedule_data.get("dates", []):
+        date = date_data["date"]
+        games = date_data.get("games", [])
+        
+        print(f"Processing {len(games)} games for {date}")
+        
+        for game in games:
+            try:
+                row = schedule_row(game)
+                rows.append(row)
                 
-                for game in games:
-                    try:
-                        game_id = insert_game_schedule(cur, game)
-                        games_processed += 1
-                        
-                        # Debug: Show pitcher info
-                        away_team = game["teams"]["away"]["team"]["name"]
-                        home_team = game["teams"]["home"]["team"]["name"]
-                        away_pitcher = game["teams"]["away"].get("probablePitcher", {}).get("fullName", "None")
-                        home_pitcher = game["teams"]["home"].get("probablePitcher", {}).get("fullName", "None")
-                        
-                        # Show game status
-                        game_status = game.get("status", {}).get("detailedState", "Unknown")
-                        print(f"Added: {game_id} ({game_status})")
-                        print(f"  Away: {away_pitcher} | Home: {home_pitcher}")
-                    except Exception as e:
-                        print(f"Error processing game: {e}")
-                        continue
-            
-            conn.commit()
-            print(f"Successfully processed {games_processed} games from MLB API")
-            
-    except sqlite3.Error as e:
-        print(f"Database error: {e}")
-    except Exception as e:
-        print(f"Unexpected error: {e}")
+                # Show game status and pitcher info
+                game_status = game.get("status", {}).get("detailedState", "Unknown")
+                print(f"Added: {row['away_team']} @ {row['home_team']} {row['start_time']} ({game_status})")
+                print(f"  Away: {row['away_pitcher'] or 'None'} | Home: {row['home_pitcher'] or 'None'}")
+            except Exception as e:
+                print(f"Error processing game: {e}")
+                continue
+    
+    with Storage(DB_NAME) as db:
+        db.identify_games("mlb", "mlb-api", rows)
+        games_processed = db.upsert_games([{k: v for k, v in r.items() if k not in KEY_FIELDS} for r in rows])
+    cache.commit(response)
+    print(f"Successfully processed {games_processed} games from MLB API ({cache.summary()})")
+    return games_processed
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,14 +1,56 @@
-import sqlite3
+import os
+import sys
+import csv
+import requests
+from lxml import etree
 from datetime import datetime, timezone
-from playwright.sync_api import sync_playwright
+from urllib.parse import urlencode
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scrapers.browserPool import get_pool, close_pool
+from scrapers.pageLoad import load_page, PageTimer
+from scrapers.storage import Storage
+
 #Changed to baseball savant source
 
 DB_NAME = "data/mlb_stats.db"
-SAVANT_URL = (
-    "https://baseballsavant.mlb.com/leaderboard/custom?year=2025&type=batter&filter=&min=q&selections=ab%2Cpa%2Chit%2Csingle%2Cdouble%2Chome_run%2Cstrikeout%2Cwalk%2Ck_percent%2Cbb_percent%2Cbatting_avg%2Cslg_percent%2Con_base_percent%2Cisolated_power%2Cb_rbi%2Cr_total_stolen_base%2Cb_game%2Cwoba%2Cxwoba%2Csweet_spot_percent%2Cbarrel_batted_rate%2Chard_hit_percent%2Cavg_best_speed%2Cavg_hyper_speed%2Cwhiff_percent%2Cswing_percent&chart=false&x=ab&y=ab&r=no&chartType=beeswarm&sort=xwoba&sortDir=desc"
+SAVANT_BASE_URL = "https://baseballsavant.mlb.com/leaderboard/custom"
+SAVANT_SELECTIONS = (
+    "ab,pa,hit,single,double,home_run,strikeout,walk,k_percent,bb_percent,batting_avg,"
+    "slg_percent,on_base_percent,isolated_power,b_rbi,r_total_stolen_base,b_game,woba,xwoba,"
+    "sweet_spot_percent,barrel_batted_rate,hard_hit_percent,avg_best_speed,avg_hyper_speed,"
+    "whiff_percent,swing_percent"
+)
+# Pitcher leaderboards report the same stats against; RBI and steals are
+# batter-only and games come from p_game
+PITCHER_SELECTIONS = (
+    "ab,pa,hit,single,double,home_run,strikeout,walk,k_percent,bb_percent,batting_avg,"
+    "slg_percent,on_base_percent,isolated_power,p_game,woba,xwoba,"
+    "sweet_spot_percent,barrel_batted_rate,hard_hit_percent,avg_best_speed,avg_hyper_speed,"
+    "whiff_percent,swing_percent"
 )
+SELECTIONS = {"batter": SAVANT_SELECTIONS, "pitcher": PITCHER_SELECTIONS}
+PLAYER_TYPES = tuple(SELECTIONS)
+def current_season():
+    """The season to scrape, read per call so a long-running daemon rolls over on Jan 1."""
+    return datetime.now().year
+
+def build_savant_url(year=None, player_type="batter", csv=False):
+    """
+    Custom leaderboard URL for one season (default: current_season()) and
+    player type (batter/pitcher). The same leaderboard is served as CSV
+    with csv=True.
+    """
+    year = year or current_season()
+    params = {
+        "year": year, "type": player_type, "filter": "", "min": "q",
+        "selections": SELECTIONS[player_type], "chart": "false", "x": "ab", "y": "ab",
+        "r": "no", "chartType": "beeswarm", "sort": "xwoba", "sortDir": "desc",
+    }
+    if csv:
+        params["csv"] = "true"
+    return f"{SAVANT_BASE_URL}?{urlencode(params)}"
 
 COLUMNS = [
     "player_name", "year", "at_bats", "plate_appearances", "hits", "singles", "doubles",
@@ -19,7 +61,204 @@ COLUMNS = [
 ]
 #Init DB in migrations now
 
-def parse_savant_table(html):
+def parse_percent(text):
+    try:
+        return float(text.strip().replace('%', '')) / 100
+    except:
+        return None
+
+def parse_float(text):
+    try:
+        return float(text.strip())
+    except:
+        return None
+
+def parse_int(text):
+    try:
+        return int(text.strip())
+    except:
+        return None
+
+# Savant column -> (CSV header, HTML table header labels, parser), in COLUMNS
+# order after player_name. HTML labels are compared after normalize_label().
+SAVANT_FIELDS = [
+    ("year",                ("year",),                       parse_int),      # year
+    ("ab",                  ("ab",),                         parse_int),      # at_bats
+    ("pa",                  ("pa",),                         parse_int),      # plate_appearances
+    ("hit",                 ("h", "hits"),                   parse_int),      # hits
+    ("single",              ("1b",),                         parse_int),      # singles
+    ("double",              ("2b",),                         parse_int),      # doubles
+    ("home_run",            ("hr",),                         parse_int),      # home_runs
+    ("strikeout",           ("so", "k"),                     parse_int),      # strikeouts
+    ("walk",                ("bb",),                         parse_int),      # walks
+    ("k_percent",           ("k%",),                         parse_percent),  # strikeout_rate
+    ("bb_percent",          ("bb%",),                        parse_percent),  # walk_rate
+    ("batting_avg",         ("avg", "ba"),                   parse_float),    # batting_avg
+    ("slg_percent",         ("slg",),                        parse_float),    # slg
+    ("on_base_percent",     ("obp",),                        parse_float),    # obp
+    ("isolated_power",      ("iso",),                        parse_float),    # iso
+    ("b_rbi",               ("rbi",),                        parse_int),      # rbi
+    ("r_total_stolen_base", ("sb",),                         parse_int),      # stolen_bases
+    ("b_game",              ("g",),                          parse_int),      # games_played
+    ("woba",                ("woba",),                       parse_float),    # woba
+    ("xwoba",               ("xwoba",),                      parse_float),    # xwoba
+    ("sweet_spot_percent",  ("lasweetspot%", "sweetspot%"),  parse_percent),  # la_sweet_spot_pct
+    ("barrel_batted_rate",  ("barrel%",),                    parse_percent),  # barrel_pct
+    ("hard_hit_percent",    ("hardhit%",),                   parse_percent),  # hard_hit_pct
+    ("avg_best_speed",      ("ev50",),                       parse_float),    # ev50
+    ("avg_hyper_speed",     ("adjustedev",),                 parse_float),    # adjusted_ev
+    ("whiff_percent",       ("whiff%",),                     parse_percent),  # whiff_pct
+    ("swing_percent",       ("swing%",),                     parse_percent),  # swing_pct
+]
+# Batter field keys as named on pitcher leaderboards; None if pitchers have none
+PITCHER_KEYS = {"b_rbi": None, "r_total_stolen_base": None, "b_game": "p_game"}
+PLAYER_LABELS = ("player", "playername", "name")
+CSV_NAME_FIELD = "last_name, first_name"
+
+def savant_fields(player_type="batter"):
+    """SAVANT_FIELDS keyed for a player type's leaderboard (key None: no such stat)."""
+    if player_type == "batter":
+        return SAVANT_FIELDS
+    return [(PITCHER_KEYS.get(key, key), labels, parse) for key, labels, parse in SAVANT_FIELDS]
+
+def parse_savant_csv(lines, player_type="batter"):
+    """
+    Parse Savant leaderboard CSV lines into COLUMNS tuples. Returns None if
+    the header has no player name or year; other missing columns are stored
+    as NULL.
+    """
+    reader = csv.reader(lines)
+    header = [h.strip().strip('"') for h in next(reader, [])]
+    index = {name: i for i, name in enumerate(header)}
+    if CSV_NAME_FIELD not in index or "year" not in index:
+        print(f"Savant CSV has no player/year columns: {header[:5]}")
+        return None
+    savant = savant_fields(player_type)
+    missing = [f for f, _, _ in savant if f is not None and f not in index]
+    if missing:
+        print(f"Savant CSV is missing columns (stored as NULL): {missing}")
+
+    name_idx = index[CSV_NAME_FIELD]
+    fields = [(index.get(f), parse) for f, _, parse in savant]
+    last_updated = datetime.now(timezone.utc).isoformat()
+
+    data = []
+    for row in reader:
+        if len(row) < len(header) or not row[name_idx].strip():
+            continue
+        data.append(
+            (row[name_idx].strip(),)
+            + tuple(parse(row[i]) if i is not None else None for i, parse in fields)
+            + (last_updated,)
+        )
+    return data
+
+def fetch_savant_csv(url=None, player_type="batter"):
+    """
+    Stream the Savant leaderboard CSV (default: this season's batters) and
+    parse it into COLUMNS tuples. Returns None if the export could not be
+    fetched or read.
+    """
+    url = url or build_savant_url(csv=True)
+    print("Fetching Baseball Savant CSV export...")
+    try:
+        with requests.get(url, stream=True, timeout=30) as resp:
+            resp.raise_for_status()
+            if "html" in resp.headers.get("content-type", ""):
+                print("Savant returned HTML instead of CSV")
+                return None
+            resp.encoding = "utf-8-sig"  # drop the byte-order mark
+            return parse_savant_csv(resp.iter_lines(decode_unicode=True), player_type)
+    except requests.RequestException as e:
+        print(f"Error fetching Savant CSV: {e}")
+        return None
+
+def normalize_label(label):
+    """Lowercase a header label and keep only letters, digits and '%'."""
+    return "".join(c for c in label.lower() if c.isalnum() or c == "%")
+
+def build_column_map(headers, player_type="batter"):
+    """
+    Map header labels (or selection keys) to cell indexes. Returns
+    (player index, [(cell index or None, parser), ...] in SAVANT_FIELDS order).
+    """
+    index = {}
+    for i, label in enumerate(headers):
+        index.setdefault(normalize_label(label), i)
+
+    player_idx = next((index[l] for l in PLAYER_LABELS if l in index), None)
+    fields = []
+    for key, labels, parse in savant_fields(player_type):
+        if key is None:
+            fields.append((None, parse))
+            continue
+        candidates = (normalize_label(key),) + labels
+        fields.append((next((index[l] for l in candidates if l in index), None), parse))
+    return player_idx, fields
+
+def cell_text(cell):
+    """Text of a table cell; plain-text cells skip the subtree walk."""
+    if len(cell) == 0:
+        return (cell.text or "").strip()
+    return "".join(cell.itertext()).strip()
+
+def parse_savant_table(html, player_type="batter"):
+    """
+    Parse the Savant leaderboard table with lxml, mapping columns from the
+    header row so a change in selections cannot silently shift fields.
+    Falls back to the positional parser if no header row is found.
+    """
+    root = etree.fromstring(html, etree.HTMLParser()) if html and html.strip() else None
+    if root is None:
+        print("Stats table not found.")
+        return []
+    tables = root.xpath("//*[@id='sortable_stats']//table") or root.xpath("//table")
+    table = next((t for t in tables if t.xpath(".//tbody/tr")), None)
+    if table is None:
+        print("Stats table not found.")
+        return []
+
+    header_row = table.xpath("./thead/tr[last()]")
+    headers = [
+        th.get("data-stat") or th.get("data-sort") or cell_text(th)
+        for th in (header_row[0].xpath("./th|./td") if header_row else [])
+    ]
+    player_idx, fields = build_column_map(headers, player_type)
+    if player_idx is None:
+        print("No Player column in the table header; parsing by position.")
+        return parse_savant_table_positional(html)
+
+    missing = [key for (key, _, _), (i, _) in zip(savant_fields(player_type), fields)
+               if key is not None and i is None]
+    if missing:
+        print(f"Savant table is missing columns (stored as NULL): {missing}")
+
+    last_updated = datetime.now(timezone.utc).isoformat()
+    data = []
+    for row in table.xpath("./tbody/tr"):
+        cells = [c for c in row if c.tag in ("td", "th")]
+        if len(cells) <= player_idx:
+            continue
+        texts = [cell_text(c) for c in cells]
+
+        link = cells[player_idx].find(".//a")
+        player_name = cell_text(link) if link is not None else texts[player_idx]
+        if not player_name:
+            continue
+
+        data.append(
+            (player_name,)
+            + tuple(parse(texts[i]) if i is not None and i < len(texts) else None
+                    for i, parse in fields)
+            + (last_updated,)
+        )
+    return data
+
+def parse_savant_table_positional(html):
+    """
+    Parse the Savant table with BeautifulSoup by fixed cell positions.
+    Kept as a fallback for tables without a usable header row.
+    """
     soup = BeautifulSoup(html, 'html.parser')
     
     # Try multiple table selectors for Baseball Savant
@@ -54,24 +293,6 @@ def parse_savant_table(html):
         if len(cells) < 28:
             continue
 
-        def parse_percent(text):
-            try:
-                return float(text.strip().replace('%', '')) / 100
-            except:
-                return None
-
-        def parse_float(text):
-            try:
-                return float(text.strip())
-            except:
-                return None
-
-        def parse_int(text):
-            try:
-                return int(text.strip())
-            except:
-                return None
-
         try:
             # Extract player name from the anchor tag
             player_cell = cells[1]
@@ -114,115 +335,90 @@ def parse_savant_table(html):
 
     return data
 
-def fetch_and_parse_table():
-    print("Fetching Baseball Savant table...")
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        
-        try:
-            page.goto(SAVANT_URL, timeout=90000)
-            print("Page loaded successfully")
-            
-            # Try multiple selectors with longer waits
-            selectors_to_try = [
-                "#sortable_stats table",
-                "div.table-savant table",
-                "table.table-savant",
-                "table",
-                "tbody"
-            ]
-            
-            table_found = False
-            for selector in selectors_to_try:
-                try:
-                    print(f"Trying selector: {selector}")
-                    page.wait_for_selector(selector, timeout=10000)
-                    print(f"Found table with selector: {selector}")
-                    table_found = True
-                    break
-                except Exception as e:
-                    print(f"Selector '{selector}' failed: {e}")
-                    continue
-            
-            if not table_found:
-                print("No table found with any selector. Taking screenshot for debugging...")
-                page.screenshot(path="savant_debug.png")
-                print("Screenshot saved as savant_debug.png")
-                
-                # Try to get the page content anyway
-                html = page.content()
-                print("Got page content, attempting to parse...")
-            else:
-                # Try to get the table HTML
+SAVANT_TABLE_SELECTORS = [
+    "#sortable_stats table",
+    "div.table-savant table",
+    "table.table-savant",
+    "table",
+    "tbody"
+]
+
+async def load_savant_html(page, url=None):
+    """Render the Savant leaderboard on a browser page and return the table HTML."""
+    url = url or build_savant_url()
+    timer = PageTimer("mlbStatScraper")
+    try:
+        # One combined wait for whichever table selector appears first
+        table_found = await load_page(page, url, SAVANT_TABLE_SELECTORS, timeout=90000)
+        timer.navigated()
+        print("Page loaded successfully")
+
+        if not table_found:
+            print("No table found with any selector. Taking screenshot for debugging...")
+            await page.screenshot(path="savant_debug.png")
+            print("Screenshot saved as savant_debug.png")
+
+            # Try to get the page content anyway
+            html = await page.content()
+            print("Got page content, attempting to parse...")
+        else:
+            # Try to get the table HTML
+            try:
+                html = await page.inner_html("#sortable_stats", timeout=1000)
+            except:
                 try:
-                    html = page.inner_html("#sortable_stats")
+                    html = await page.inner_html("div.table-savant", timeout=1000)
                 except:
                     try:
-                        html = page.inner_html("div.table-savant")
+                        html = await page.inner_html("table", timeout=1000)
                     except:
-                        try:
-                            html = page.inner_html("table")
-                        except:
-                            html = page.content()
-                            print("Falling back to full page content")
-            
-        except Exception as e:
-            print(f"Error during page load: {e}")
-            return []
-        finally:
-            browser.close()
+                        html = await page.content()
+                        print("Falling back to full page content")
 
-    return parse_savant_table(html)
+    except Exception as e:
+        print(f"Error during page load: {e}")
+        return None
 
-def store_stats(stats):
+    timer.done()
+    return html
+
+def fetch_and_parse_table(pool=None, url=None, player_type="batter"):
+    print("Fetching Baseball Savant table...")
+    pool = pool or get_pool()
+    html = pool.run(load_savant_html, url)
+    if html is None:
+        return []
+
+    return parse_savant_table(html, player_type)
+
+def fetch_stats(year=None, player_type="batter"):
+    """Fetch the leaderboard as CSV, rendering it in a browser only as a fallback."""
+    stats = fetch_savant_csv(build_savant_url(year, player_type, csv=True), player_type)
+    if stats:
+        return stats
+    print("CSV export unavailable; falling back to the browser scrape")
+    return fetch_and_parse_table(url=build_savant_url(year, player_type), player_type=player_type)
+
+def stat_rows(stats, player_type="batter"):
+    """COLUMNS tuples as player_stats rows for Storage."""
+    return [dict(zip(COLUMNS, row), player_type=player_type) for row in stats]
+
+def store_stats(stats, player_type="batter"):
     if not stats:
         print("No data to store.")
-        return
-
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    for row in stats:
-        c.execute(f"""
-            INSERT INTO player_stats ({', '.join(COLUMNS)})
-            VALUES ({', '.join(['?'] * len(COLUMNS))})
-            ON CONFLICT(player_name, year) DO UPDATE SET
-                at_bats             = excluded.at_bats,
-                plate_appearances   = excluded.plate_appearances,
-                hits                = excluded.hits,
-                singles             = excluded.singles,
-                doubles             = excluded.doubles,
-                home_runs           = excluded.home_runs,
-                strikeouts          = excluded.strikeouts,
-                walks               = excluded.walks,
-                strikeout_rate      = excluded.strikeout_rate,
-                walk_rate           = excluded.walk_rate,
-                batting_avg         = excluded.batting_avg,
-                slg                 = excluded.slg,
-                obp                 = excluded.obp,
-                iso                 = excluded.iso,
-                rbi                 = excluded.rbi,
-                stolen_bases        = excluded.stolen_bases,
-                games_played        = excluded.games_played,
-                woba                = excluded.woba,
-                xwoba               = excluded.xwoba,
-                la_sweet_spot_pct   = excluded.la_sweet_spot_pct,
-                barrel_pct          = excluded.barrel_pct,
-                hard_hit_pct        = excluded.hard_hit_pct,
-                ev50                = excluded.ev50,
-                adjusted_ev         = excluded.adjusted_ev,
-                whiff_pct           = excluded.whiff_pct,
-                swing_pct           = excluded.swing_pct,
-                last_updated        = excluded.last_updated;
-        """, row)
-
-    conn.commit()
-    conn.close()
-    print(f"Stored {len(stats)} player records.")
+        return 0
+
+    with Storage(DB_NAME) as db:
+        db.upsert_player_stats(stat_rows(stats, player_type))
+    print(f"Stored {len(stats)} {player_type} records.")
+    return len(stats)
 
 def main():
-    stats = fetch_and_parse_table()
-    store_stats(stats)
+    stats = fetch_stats()
+    return store_stats(stats)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        close_pool()
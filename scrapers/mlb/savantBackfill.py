@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Backfill Baseball Savant leaderboards for many seasons and both player types.
+
+Each (year, player_type) leaderboard is fetched as CSV on a bounded worker
+pool. Rows are upserted in one batch per leaderboard, in the same
+transaction as its row in `backfill_checkpoints`, so an interrupted run
+resumes where it stopped.
+Past seasons are marked complete and are never fetched again; the current
+season is always refetched, because its numbers still change.
+
+Usage: python scrapers/mlb/savantBackfill.py --start 2015 --end 2025 --workers 4
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scrapers.mlb.mlbStatScraper import (
+    DB_NAME, PLAYER_TYPES, build_savant_url, current_season, fetch_savant_csv, stat_rows,
+)
+from scrapers.storage import Storage
+
+# Config
+FIRST_STATCAST_SEASON = 2015
+MAX_WORKERS = 4
+
+
+def completed_jobs(conn):
+    """(year, player_type) pairs already stored as complete."""
+    rows = conn.execute(
+        "SELECT year, player_type FROM backfill_checkpoints WHERE status = 'complete'"
+    )
+    return set(rows)
+
+
+def plan_jobs(years, player_types, done):
+    """Leaderboards still to fetch; complete past seasons are skipped."""
+    season = current_season()
+    return [
+        (year, player_type)
+        for year in years
+        for player_type in player_types
+        if year >= season or (year, player_type) not in done
+    ]
+
+
+def fetch_job(year, player_type):
+    return fetch_savant_csv(build_savant_url(year, player_type, csv=True), player_type)
+
+
+def record_job(db, year, player_type, stats):
+    """Upsert one leaderboard and checkpoint it in the same transaction."""
+    status = "complete" if year < current_season() else "partial"
+    with db.conn:
+        db.upsert_player_stats(stat_rows(stats, player_type), commit=False)
+        db.conn.execute(
+            """
+            INSERT INTO backfill_checkpoints (year, player_type, status, rows, completed_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(year, player_type) DO UPDATE SET
+                status       = excluded.status,
+                rows         = excluded.rows,
+                completed_at = excluded.completed_at
+            """,
+            (year, player_type, status, len(stats), datetime.now(timezone.utc).isoformat()),
+        )
+
+
+def run_backfill(years, player_types=PLAYER_TYPES, workers=MAX_WORKERS, force=False):
+    """Fetch and store every pending leaderboard. Returns rows stored."""
+    with Storage(DB_NAME) as db:
+        done = set() if force else completed_jobs(db.conn)
+        jobs = plan_jobs(years, player_types, done)
+        print(f"{len(jobs)} leaderboards to fetch ({len(done)} already complete)")
+
+        total = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(fetch_job, *job): job for job in jobs}
+            # Fetches run in parallel; writes stay on this thread's connection
+            for future in as_completed(futures):
+                year, player_type = futures[future]
+                try:
+                    stats = future.result()
+                except Exception as e:
+                    print(f"{year} {player_type}: fetch failed: {e}")
+                    continue
+                if not stats:
+                    print(f"{year} {player_type}: no rows")
+                    continue
+                record_job(db, year, player_type, stats)
+                total += len(stats)
+                print(f"{year} {player_type}: stored {len(stats)} rows")
+        return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill Baseball Savant leaderboards")
+    parser.add_argument("--start", type=int, default=FIRST_STATCAST_SEASON)
+    parser.add_argument("--end", type=int, default=current_season())
+    parser.add_argument("--types", nargs="+", choices=PLAYER_TYPES, default=list(PLAYER_TYPES))
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--force", action="store_true", help="refetch complete seasons too")
+    args = parser.parse_args()
+
+    total = run_backfill(range(args.start, args.end + 1), args.types, args.workers, args.force)
+    print(f"Backfill stored {total} player records")
+    return total
+
+
+if __name__ == "__main__":
+    main()
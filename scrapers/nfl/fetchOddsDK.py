@@ -1,186 +1,187 @@
 #!/usr/bin/env python3
-import sqlite3
-from datetime import datetime, timezone
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scrapers.browserPool import get_pool, close_pool
+from scrapers.draftkings import capture_feed, wait_for_tables, extract_tables
+from scrapers.dkFeed import format_american, format_line, format_total, parse_feed
+from scrapers.gameIdentity import parse_display_start
+from scrapers.pageLoad import PageTimer
+from scrapers.storage import Storage
 
 # Config
 
 DB_NAME    = "data/nfl_odds.db"
 NFL_URL    = "https://sportsbook.draftkings.com/leagues/football/nfl"
 PROVIDER   = "DraftKings-Web"
+GAME_COLUMNS = (
+    "game_id", "start_time", "game_date", "home_team", "away_team", "home_code", "away_code", "start_utc",
+)
 
 
-# Database helpers
+# Scraping logic
 
-def nickname(full_name: str) -> str:
-    """Return the team's nickname (last word of the full name)."""
-    return full_name.strip().split()[-1]
+def parse_tables(tables):
+    """
+    Pair the away/home rows of the extracted DraftKings tables into a list
+    of game dicts.
+    """
+    games = []
+    print(f"Found {len(tables)} tables")
+
+    for table_idx, table in enumerate(tables):
+        # Date from this specific table's header
+        game_date = table["date"]
+        if game_date:
+            print(f"Game date for table {table_idx + 1}: {game_date}")
+        else:
+            game_date = "TBD"
+            print(f"Could not find game date in table {table_idx + 1} header")
+
+        rows = table["rows"]
+        print(f"Found {len(rows)} rows in table {table_idx + 1} (2 per game)")
+
+        # Process pairs: away_row, home_row
+        for i in range(0, len(rows), 2):
+            try:
+                # Check if we have both away and home rows
+                if i + 1 >= len(rows):
+                    print(f"Skipping incomplete game pair at row {i}")
+                    continue
 
+                away = rows[i]
+                home = rows[i + 1]
 
+                if not away["team"] or not home["team"]:
+                    print(f"Skipping row {i}: Missing team names")
+                    continue
 
-def insert_game(cursor, game_id, start_time, game_date, home_team, away_team):
-    """
-    Insert the game row if it doesn't already exist.
-    """
-    cursor.execute(
-        """
-        INSERT OR IGNORE INTO games
-            (game_id, start_time, game_date, home_team, away_team)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (game_id, start_time, game_date, home_team, away_team),
-    )
-
-def insert_odds(cursor, game_id, spread, total, ml_home, ml_away):
-    """
-    Insert a new odds row with UTC timestamp (no microseconds).
-    """
-    ts = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
-    cursor.execute(
-        """
-        INSERT INTO odds
-            (game_id, provider, spread_details, over_under, moneyline_home, moneyline_away, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-        (game_id, PROVIDER, spread, total, ml_home, ml_away, ts),
-    )
+                away_team = away["team"]
+                home_team = home["team"]
 
-# Scraping logic
+                # Spread
+                spread = " | ".join(away["lines"]) if away["lines"] else None
+
+                # Total (O/U)
+                total = away["total"]
+
+                # Moneylines
+                ml_away = away["odds"][-1] if away["odds"] else None
+                ml_home = home["odds"][-1] if home["odds"] else None
+
+                # Home spread price, first of the spread/total/moneyline prices
+                home_spread_price = home["odds"][0] if len(home["odds"]) == 3 else None
+
+                # Start time
+                raw_time = away["start_time"] or "TBD"
+                time_str = raw_time.replace(" ", "").upper()
+
+                games.append({
+                    "start_utc":   parse_display_start(game_date, time_str),
+                    "start_time":  time_str,
+                    "game_date":   game_date,
+                    "home_team":   home_team,
+                    "away_team":   away_team,
+                    "spread":      spread,
+                    "total":       total,
+                    "ml_home":     ml_home,
+                    "ml_away":     ml_away,
+                    "home_spread_price": home_spread_price,
+                })
+
+                print(f"Parsed: {away_team} @ {home_team} ({time_str}) on {game_date}")
 
-def scrape_nfl_odds():
+            except Exception as e:
+                print(f"Skipped row {i}: {e}")
+                continue
+
+    return games
+
+def parse_feed_games(payloads):
     """
-    Headlessly scrape DraftKings NFL odds and return a list of dicts.
+    Build game dicts from captured DraftKings feed payloads. Odds come back
+    numeric and are written out as the tables display them, so switching
+    between the feed and the tables never looks like a line move.
     """
     games = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page    = browser.new_page()
-
-        try:
-            page.goto(NFL_URL, timeout=60000)
-            page.wait_for_selector("table.sportsbook-table tbody tr", timeout=30000)
-        except PlaywrightTimeoutError as e:
-            print(f"Failed to load page: {e}")
-            browser.close()
-            return games
-
-        # Find all tables and process each one
-        tables = page.query_selector_all("table.sportsbook-table")
-        print(f"Found {len(tables)} tables")
-        
-        for table_idx, table in enumerate(tables):
-            # Extract date from this specific table's header
-            try:
-                date_elem = table.query_selector(".sportsbook-table-header__title span span")
-                if date_elem:
-                    game_date = date_elem.inner_text().strip()
-                    print(f"Game date for table {table_idx + 1}: {game_date}")
-                else:
-                    game_date = "TBD"
-                    print(f"Could not find game date in table {table_idx + 1} header")
-            except Exception as e:
-                game_date = "TBD"
-                print(f"Error extracting game date from table {table_idx + 1}: {e}")
-            
-            # Get rows from this specific table
-            rows = table.query_selector_all("tbody tr")
-            print(f"Found {len(rows)} rows in table {table_idx + 1} (2 per game)")
-
-            # Process pairs: away_row, home_row
-            for i in range(0, len(rows), 2):
-                try:
-                    # Check if we have both away and home rows
-                    if i + 1 >= len(rows):
-                        print(f"Skipping incomplete game pair at row {i}")
-                        continue
-                        
-                    away = rows[i]
-                    home = rows[i + 1]
-
-                    # Teams with null checks
-                    away_team_elem = away.query_selector(".event-cell__name-text")
-                    home_team_elem = home.query_selector(".event-cell__name-text")
-                    
-                    if not away_team_elem or not home_team_elem:
-                        print(f"Skipping row {i}: Missing team names")
-                        continue
-                        
-                    away_team = away_team_elem.inner_text().strip()
-                    home_team = home_team_elem.inner_text().strip()
-
-                    # Spread
-                    spreads = [e.inner_text().strip()
-                               for e in away.query_selector_all('[data-testid="sportsbook-outcome-cell-line"]')]
-                    spread = " | ".join(spreads) if spreads else None
-
-                    # Total (O/U)
-                    total_cell = away.query_selector_all("td")[1] if len(away.query_selector_all("td")) > 1 else None
-                    total = None
-                    if total_cell:
-                        total_elem = total_cell.query_selector('[data-testid="sportsbook-outcome-cell-line"]')
-                        total = total_elem.inner_text().strip() if total_elem else None
-
-                    # Moneylines
-                    away_ml = away.query_selector_all('[data-testid="sportsbook-odds"]')
-                    home_ml = home.query_selector_all('[data-testid="sportsbook-odds"]')
-                    ml_away = away_ml[-1].inner_text().strip() if away_ml else None
-                    ml_home = home_ml[-1].inner_text().strip() if home_ml else None
-
-                    # Start time
-                    raw_time_elem = away.query_selector(".event-cell__start-time")
-                    raw_time = raw_time_elem.inner_text().strip() if raw_time_elem else "TBD"
-                    time_str = raw_time.replace(" ", "").upper()    
-         
-
-                    home_nick = nickname(home_team)
-                    away_nick = nickname(away_team)        
-
-                    game_id = f"{away_nick}@{home_nick} {time_str}"
-
-                    games.append({
-                        "game_id":     game_id,
-                        "start_time":  time_str,
-                        "game_date":   game_date,
-                        "home_team":   home_team,
-                        "away_team":   away_team,
-                        "spread":      spread,
-                        "total":       total,
-                        "ml_home":     ml_home,
-                        "ml_away":     ml_away,
-                    })
-
-                    print(f"Parsed: {away_team} @ {home_team} ({time_str}) on {game_date}")
-
-                except Exception as e:
-                    print(f"Skipped row {i}: {e}")
-                    continue
+    for event in parse_feed(payloads):
+        if event["start"] is None:
+            continue
+        start_local = event["start"].astimezone()
+        time_str = start_local.strftime("%I:%M%p").lstrip("0")
+        game_date = start_local.strftime("%a %b %d").upper()
+
+        home_team = event["home_team"]
+        away_team = event["away_team"]
+
+        # The away row's line cells: its spread, then the over
+        lines = [format_line(event["spread_away"]), format_total(event["total"])]
+        spread = " | ".join(s for s in lines if s) or None
+
+        games.append({
+            "source_key":  event["event_id"],
+            "start_utc":   event["start"],
+            "start_time":  time_str,
+            "game_date":   game_date,
+            "home_team":   home_team,
+            "away_team":   away_team,
+            "spread":      spread,
+            "total":       format_total(event["total"]),
+            "ml_home":     format_american(event["moneyline_home"]),
+            "ml_away":     format_american(event["moneyline_away"]),
+            "home_spread_price": format_american(event["spread_home_price"]),
+        })
+        print(f"Parsed: {away_team} @ {home_team} ({time_str}) on {game_date} [feed]")
+
+    return games
 
-        browser.close()
+async def extract_nfl_odds(page):
+    """
+    Scrape DraftKings NFL odds from a browser page and return a list of dicts.
+    Reads the page's JSON feed when it is seen, else the rendered tables.
+    """
+    timer = PageTimer("fetchOddsDK")
+    payloads = await capture_feed(page, NFL_URL)
+    timer.navigated()
+    games = parse_feed_games(payloads) if payloads else []
+    if not games:
+        print("No usable DraftKings feed; reading the rendered tables")
+        ready = await wait_for_tables(page, NFL_URL, navigate=False)
+        timer.navigated()
+        games = parse_tables(await extract_tables(page)) if ready else []
+    timer.done()
     return games
 
+def scrape_nfl_odds(pool=None):
+    """
+    Scrape DraftKings NFL odds on a page from the shared browser pool.
+    """
+    pool = pool or get_pool()
+    return pool.run(extract_nfl_odds)
+
 # main
 def main():
     data = scrape_nfl_odds()
     if not data:
         print("No games scraped; exiting.")
-        return
-
-    try:
-        with sqlite3.connect(DB_NAME) as conn:
-            cur = conn.cursor()
-            for g in data:
-                try:
-                    insert_game(cur, g["game_id"], g["start_time"], g["game_date"], g["home_team"], g["away_team"])
-                    insert_odds(cur, g["game_id"], g["spread"], g["total"], g["ml_home"], g["ml_away"])
-                except Exception as e:
-                    print(f"Error inserting game {g.get('game_id', 'unknown')}: {e}")
-                    continue
-            conn.commit()
-        print(f"Stored odds for {len(data)} games into `{DB_NAME}`")
-    except sqlite3.Error as e:
-        print(f"Database error: {e}")
-    except Exception as e:
-        print(f"Unexpected error: {e}")
+        return 0
+
+    with Storage(DB_NAME) as db:
+        db.identify_games("nfl", "dk", data)
+        games = [{c: g[c] for c in GAME_COLUMNS} for g in data]
+        lines = [
+            (g["game_id"], PROVIDER, g["spread"], g["total"], g["ml_home"], g["ml_away"],
+             None, g["home_spread_price"])
+            for g in data
+        ]
+        db.upsert_games(games, update=False)  # first source to see a game keeps it
+        db.append_odds(lines, source="dk")
+        print(f"Stored odds for {len(data)} games into `{DB_NAME}` ({db.odds.summary()})")
+    return len(data)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        close_pool()
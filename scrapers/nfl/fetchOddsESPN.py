@@ -1,135 +1,137 @@
 #!/usr/bin/env python3
-import sqlite3
-import requests
-from datetime import datetime, timezone
+import os
+import sys
+from datetime import datetime
 from zoneinfo import ZoneInfo           
 
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scrapers.httpCache import HttpCache, UNCHANGED
+from scrapers.httpClient import fetch_many
+from scrapers.oddsNormalize import parse_home_spread
+from scrapers.storage import Storage
 
 # Config
 DB_NAME   = "data/nfl_odds.db"
 ESPN_URL  = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
 PROVIDER  = "ESPN"
+SOURCE    = "espn"          # game_keys and odds_heartbeat source name
+GAME_COLUMNS = (
+    "game_id", "start_time", "game_date", "home_team", "away_team", "home_code", "away_code", "start_utc",
+)
 
 
-# Data Fetch with retries
-def fetch_scoreboard_json():
-    """Fetch ESPN NFL scoreboard JSON with a simple retry policy."""
-    session = requests.Session()
-    retries = Retry(
-        total=3,
-        backoff_factor=0.5,
-        status_forcelist=[500, 502, 503, 504]
-    )
-    session.mount("https://", HTTPAdapter(max_retries=retries))
-
-    resp = session.get(ESPN_URL, timeout=10)
-    resp.raise_for_status()
-    return resp.json()
-
-
-# Database helper functions
-def nickname(full_name: str) -> str:
-    return full_name.strip().split()[-1]
-
-
-
-def insert_game(cursor, game_id, start_time, game_date, home_team, away_team):
+# Data Fetch (pooled client with retries)
+def fetch_scoreboard_json(cache, params=None):
     """
-    Insert a game if it doesn't already exist.
+    Fetch ESPN NFL scoreboard JSON. Returns a CachedResponse whose `changed`
+    is False if the scoreboard is unchanged.
     """
-    cursor.execute(
-        """
-        INSERT OR IGNORE INTO games
-            (game_id, start_time, game_date, home_team, away_team)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (game_id, start_time, game_date, home_team, away_team),
-    )
+    return cache.fetch(ESPN_URL, params=params, timeout=10)
 
-def insert_odds(cursor, game_id, provider, spread_details, over_under, ml_home, ml_away):
-    """
-    Insert a new odds row with a UTC timestamp.
-    """
-    ts = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
-    cursor.execute(
-        """
-        INSERT INTO odds
-            (game_id, provider, spread_details, over_under, moneyline_home, moneyline_away, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-        (game_id, provider, spread_details, over_under, ml_home, ml_away, ts),
+def fetch_scoreboards(cache, weeks, season_type=2):
+    """Fetch several weeks' scoreboards concurrently (2 = regular season)."""
+    return fetch_many(
+        fetch_scoreboard_json,
+        [(cache, {"week": week, "seasontype": season_type}) for week in weeks],
     )
 
-# Main orchestration
-def main():
-    data = fetch_scoreboard_json().get("events", [])
-    if not data:
-        print(" No events found in ESPN response.")
-        return
-
-    with sqlite3.connect(DB_NAME) as conn:
-        cur = conn.cursor()
 
-        for event in data:
-            # Basic game info
-            game_id    = event["id"]
-            iso_ts = event["date"]  # ISO string
-            dt_utc = datetime.fromisoformat(iso_ts.replace("Z","+00:00"))
-            dt_local = dt_utc.astimezone(ZoneInfo("America/Denver"))#SET TO USERS TIME ZONE
-
-            time_str = dt_local.strftime("%I:%M%p").lstrip("0") #match to DK to pair games easier across
-            #LStrip Above stops windows error for 06:00 --> 6:00
-            game_date= dt_local.date().isoformat()
-
-            comp  = event.get("competitions", [])[0]
-            teams = comp.get("competitors", [])
-            home  = next(t for t in teams if t["homeAway"] == "home")
-            away  = next(t for t in teams if t["homeAway"] == "away")
-
-
-            home_nick=nickname(home["team"]["name"])
-            away_nick= nickname(away["team"]["name"])
-
-
-            game_id = f"{away_nick}@{home_nick} {time_str}"
+# Parsing
+def parse_events(events):
+    """
+    Turn ESPN scoreboard events into game dicts for Storage. Each carries
+    its ESPN event id as source_key and its odds line (without game_id),
+    or None if ESPN lists no odds.
+    """
+    games = []
+
+    for event in events:
+        # Basic game info
+        iso_ts = event["date"]  # ISO string
+        dt_utc = datetime.fromisoformat(iso_ts.replace("Z","+00:00"))
+        dt_local = dt_utc.astimezone(ZoneInfo("America/Denver"))#SET TO USERS TIME ZONE
+        game_date= dt_local.date().isoformat()
+
+        comp  = event.get("competitions", [])[0]
+        teams = comp.get("competitors", [])
+        home  = next(t for t in teams if t["homeAway"] == "home")
+        away  = next(t for t in teams if t["homeAway"] == "away")
+
+        game = {
+            "source_key": event["id"],
+            "start_utc":  dt_utc,
+            "start_time": iso_ts,
+            "game_date":  game_date,
+            "home_team":  home["team"]["name"],
+            "away_team":  away["team"]["name"],
+            "line":       None,
+        }
+        games.append(game)
+
+        # Odds 
+        odds_list = comp.get("odds", [])
+        if odds_list:
+            oList = odds_list[0]
+            provider       = oList.get("provider", {}).get("name", PROVIDER)
+            spread_details = oList.get("details")
+            over_under     = oList.get("overUnder")
+            ml_home        = oList.get("moneylineHome")
+            ml_away        = oList.get("moneylineAway")
+            # "PHI -7.5" names the favourite; place it by abbreviation
+            home_spread    = parse_home_spread(
+                spread_details, home["team"].get("abbreviation"), away["team"].get("abbreviation")
+            )
+            home_price     = (oList.get("homeTeamOdds") or {}).get("spreadOdds")
 
+            game["line"] = (provider, spread_details, over_under, ml_home, ml_away,
+                            home_spread, home_price)
+            print(f"Odds for {away['team']['name']} @ {home['team']['name']} via {provider}")
 
-            insert_game(
-                cur,
-                game_id,
-                iso_ts,
-                game_date,
-                home["team"]["name"],
-                away["team"]["name"]
-            )
+    return games
 
-            # Odds 
-            odds_list = comp.get("odds", [])
-            if odds_list:
-                oList = odds_list[0]
-                provider       = oList.get("provider", {}).get("name", PROVIDER)
-                spread_details = oList.get("details")
-                over_under     = oList.get("overUnder")
-                ml_home        = oList.get("moneylineHome")
-                ml_away        = oList.get("moneylineAway")
-
-                insert_odds(
-                    cur,
-                    game_id,
-                    provider,
-                    spread_details,
-                    over_under,
-                    ml_home,
-                    ml_away
-                )
-                print(f"Odds for {away['team']['name']} @ {home['team']['name']} via {provider}")
-
-        # commit happens automatically on with-block exit
-
-    print("ESPN odds import complete.")
+# Main orchestration
+def main(weeks=None):
+    """Import the current scoreboard, or the given regular-season weeks."""
+    cache = HttpCache()
+    if weeks:
+        responses = fetch_scoreboards(cache, weeks)
+    else:
+        responses = [fetch_scoreboard_json(cache)]
+
+    for r in responses:
+        if isinstance(r, Exception):
+            print(f"Error fetching ESPN scoreboard: {r}")
+    errors = [r for r in responses if isinstance(r, Exception)]
+    if errors and len(errors) == len(responses):
+        raise errors[0]
+    changed = [r for r in responses if not isinstance(r, Exception) and r.changed]
+    if not changed:
+        # The lines are still up; only their heartbeat moves
+        with Storage(DB_NAME) as db:
+            touched = db.touch_lines(SOURCE)
+        print(f"ESPN scoreboard unchanged; skipping import, {touched} lines still seen ({cache.summary()})")
+        return UNCHANGED
+
+    games = []
+    for response in changed:
+        events = response.json().get("events", [])
+        if not events:
+            print(" No events found in ESPN response.")
+        games += parse_events(events)
+
+    with Storage(DB_NAME) as db:
+        db.identify_games("nfl", SOURCE, games)
+        lines = [(g["game_id"],) + g["line"] for g in games if g["line"]]
+        db.upsert_games([{c: g[c] for c in GAME_COLUMNS} for g in games], update=False)
+        db.append_odds(lines, source=SOURCE)
+        summary = db.odds.summary()
+
+    for response in changed:
+        cache.commit(response)
+    print(f"ESPN odds import complete: {summary} ({cache.summary()}).")
+    return len(lines)
 
 if __name__ == "__main__":
-    main()
+    # Optional week numbers, e.g. `fetchOddsESPN.py 1 2 3`
+    main([int(w) for w in sys.argv[1:]] or None)
 
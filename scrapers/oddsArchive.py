@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Columnar archive for old odds snapshots.
+
+The `odds` tables keep every line move forever. compact() moves snapshots
+older than HOT_DAYS out of SQLite into Parquet files under ARCHIVE_DIR,
+partitioned by sport and the UTC day of the snapshot:
+
+    data/archive/odds/sport=nfl/date=2025-09-04/odds-<last id>-0.parquet
+
+game_id and provider are dictionary-encoded, so a season of history is a
+few small files that scan quickly. Only snapshots analysis/trackLines.py
+has already compared are archived, and the newest of those for each
+(game, provider) stays in SQLite even when it is old: the next run
+compares new snapshots against it, and odds_latest may point at it.
+Archived snapshots can optionally be downsampled to the last line in each
+N-minute bucket.
+
+read_odds() queries the hot SQLite tail and the Parquet archive together
+and returns one DataFrame ordered by updated_at.
+
+pyarrow is only needed here; it is imported when the archive is used.
+
+Usage: python scrapers/oddsArchive.py --days 30 [--downsample 60] [--vacuum]
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scrapers.oddsNormalize import TYPED_COLUMNS
+from scrapers.storage import connect
+
+# Config
+ARCHIVE_DIR = "data/archive/odds"
+DATABASES = {"nfl": "data/nfl_odds.db", "mlb": "data/mlb_odds.db"}
+HOT_DAYS = 30           # snapshots newer than this stay in SQLite
+
+# Display columns hold whatever the book showed, so they are archived as text
+TEXT_COLUMNS = ("game_id", "provider", "spread_details", "over_under", "moneyline_home", "moneyline_away")
+ARCHIVE_COLUMNS = ("id",) + TEXT_COLUMNS + ("updated_at",) + TYPED_COLUMNS
+INT_COLUMNS = ("home_spread_price", "home_ml", "away_ml")
+
+# Old snapshots at or below the line_moves high-water mark, minus the row
+# odds_latest points at and the last row at or below the mark for each line
+ARCHIVABLE_SQL = """
+    FROM odds
+    WHERE updated_at < ?
+      AND id <= (SELECT COALESCE(MIN(last_odds_id), 0) FROM analysis_checkpoints)
+      AND id NOT IN (SELECT odds_id FROM odds_latest WHERE odds_id IS NOT NULL)
+      AND EXISTS (
+          SELECT 1 FROM odds n
+          WHERE n.game_id = odds.game_id AND n.provider = odds.provider
+            AND n.id <= (SELECT COALESCE(MIN(last_odds_id), 0) FROM analysis_checkpoints)
+            AND (n.updated_at, n.id) > (odds.updated_at, odds.id)
+      )
+"""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("the odds archive needs pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def archive_schema():
+    pa = _pyarrow()
+    types = {"id": pa.int64(), "updated_at": pa.timestamp("s", tz="UTC")}
+    types.update({col: pa.int64() for col in INT_COLUMNS})
+    return pa.schema([
+        (col, pa.dictionary(pa.int32(), pa.string()) if col in ("game_id", "provider")
+         else pa.string() if col in TEXT_COLUMNS
+         else types.get(col, pa.float64()))
+        for col in ARCHIVE_COLUMNS
+    ])
+
+
+def _typed_frame(df):
+    """Cast a frame of odds rows to the archive's column types."""
+    df = df.copy()
+    for col in TEXT_COLUMNS:
+        df[col] = df[col].map(lambda v: None if v is None or pd.isna(v) else str(v))
+    df["updated_at"] = pd.to_datetime(df["updated_at"], utc=True, format="ISO8601").dt.floor("s")
+    for col in INT_COLUMNS:
+        df[col] = df[col].astype("Int64")
+    return df
+
+
+def downsample(df, minutes):
+    """Last snapshot per game, provider and `minutes`-wide bucket."""
+    bucket = df["updated_at"].dt.floor(f"{minutes}min")
+    last = df.assign(_bucket=bucket).groupby(["game_id", "provider", "_bucket"])["id"].idxmax()
+    return df.loc[last.sort_values()]
+
+
+def compact(sport, days=HOT_DAYS, downsample_minutes=None, vacuum=False, archive_dir=ARCHIVE_DIR):
+    """
+    Move odds snapshots older than `days` into the Parquet archive.
+    Files are written before the rows are deleted, so an interrupted run
+    only leaves rows archived twice; read_odds() drops the duplicates.
+    Returns (rows archived, rows deleted from SQLite).
+    """
+    pa = _pyarrow()
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).replace(microsecond=0).isoformat()
+    conn = connect(DATABASES[sport])
+    try:
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(ARCHIVE_COLUMNS)} {ARCHIVABLE_SQL} ORDER BY id", conn, params=(cutoff,)
+        )
+        if df.empty:
+            return 0, 0
+        last_id = int(df["id"].max())
+        df = _typed_frame(df)
+        if downsample_minutes:
+            df = downsample(df, downsample_minutes)
+
+        root = os.path.join(archive_dir, f"sport={sport}")
+        for day, part in df.groupby(df["updated_at"].dt.strftime("%Y-%m-%d")):
+            table = pa.Table.from_pandas(part, schema=archive_schema(), preserve_index=False)
+            path = os.path.join(root, f"date={day}")
+            os.makedirs(path, exist_ok=True)
+            pa.parquet.write_table(
+                table, os.path.join(path, f"odds-{last_id}-0.parquet"),
+                use_dictionary=["game_id", "provider"], compression="zstd",
+            )
+
+        with conn:
+            deleted = conn.execute(f"DELETE {ARCHIVABLE_SQL} AND id <= ?", (cutoff, last_id)).rowcount
+        if vacuum:
+            conn.execute("VACUUM")
+        return len(df), deleted
+    finally:
+        conn.close()
+
+
+def read_archive(sport, start=None, end=None, game_ids=None, archive_dir=ARCHIVE_DIR):
+    """Archived snapshots as a DataFrame; only matching date partitions are read."""
+    root = os.path.join(archive_dir, f"sport={sport}")
+    if not os.path.isdir(root):
+        return pd.DataFrame(columns=ARCHIVE_COLUMNS)
+    pa = _pyarrow()
+    ds, field = pa.dataset, pa.dataset.field
+    date_field = pa.field("date", pa.string())
+    dataset = ds.dataset(
+        root, format="parquet", schema=archive_schema().append(date_field),
+        partitioning=ds.partitioning(pa.schema([date_field]), flavor="hive"),
+    )
+    filters = []
+    if start is not None:
+        filters += [field("date") >= start.strftime("%Y-%m-%d"), field("updated_at") >= start]
+    if end is not None:
+        filters += [field("date") <= end.strftime("%Y-%m-%d"), field("updated_at") < end]
+    if game_ids is not None:
+        filters.append(field("game_id").cast(pa.string()).isin(list(game_ids)))
+    expr = None
+    for f in filters:
+        expr = f if expr is None else expr & f
+    df = dataset.to_table(columns=list(ARCHIVE_COLUMNS), filter=expr).to_pandas()
+    for col in ("game_id", "provider"):
+        df[col] = df[col].astype(object)
+    df["updated_at"] = df["updated_at"].astype("datetime64[ns, UTC]")
+    for col in INT_COLUMNS:
+        df[col] = df[col].astype("Int64")
+    return df
+
+
+def read_hot(sport, start=None, end=None, game_ids=None):
+    """Snapshots still in SQLite, typed like the archive."""
+    where, params = [], []
+    if start is not None:
+        where.append("updated_at >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        where.append("updated_at < ?")
+        params.append(end.isoformat())
+    if game_ids is not None:
+        game_ids = list(game_ids)
+        where.append(f"game_id IN ({', '.join(['?'] * len(game_ids))})")
+        params += game_ids
+    sql = f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM odds"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    conn = connect(DATABASES[sport])
+    try:
+        return _typed_frame(pd.read_sql_query(sql, conn, params=params))
+    finally:
+        conn.close()
+
+
+def _as_utc(value):
+    if value is None:
+        return None
+    value = pd.Timestamp(value)
+    return value.tz_localize("UTC") if value.tzinfo is None else value.tz_convert("UTC")
+
+
+def read_odds(sport, start=None, end=None, game_ids=None, archive_dir=ARCHIVE_DIR):
+    """
+    Odds snapshots for one sport from SQLite and the archive together,
+    optionally limited to [start, end) and to some game_ids. updated_at
+    comes back as a UTC timestamp.
+    """
+    start, end = _as_utc(start), _as_utc(end)
+    hot = read_hot(sport, start, end, game_ids)
+    cold = read_archive(sport, start, end, game_ids, archive_dir)
+    frames = [df for df in (cold, hot) if not df.empty]
+    if not frames:
+        return hot
+    df = pd.concat(frames, ignore_index=True)
+    return df.drop_duplicates("id", keep="last").sort_values(["updated_at", "id"], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old odds snapshots into the Parquet archive")
+    parser.add_argument("--sport", choices=["all"] + list(DATABASES), default="all")
+    parser.add_argument("--days", type=int, default=HOT_DAYS, help="keep this many days in SQLite")
+    parser.add_argument("--downsample", type=int, metavar="MINUTES",
+                        help="keep only the last line per MINUTES bucket when archiving")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the database afterwards")
+    args = parser.parse_args()
+
+    sports = list(DATABASES) if args.sport == "all" else [args.sport]
+    for sport in sports:
+        archived, deleted = compact(sport, args.days, args.downsample, args.vacuum)
+        print(f"{sport}: archived {archived} snapshots, removed {deleted} rows from SQLite")
+
+
+if __name__ == "__main__":
+    main()
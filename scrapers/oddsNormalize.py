@@ -0,0 +1,117 @@
+"""
+Turn odds as the books display them into typed values at ingest time.
+
+Scrapers hand over whatever the source shows: "+120", "−110" (Unicode
+minus), "EVEN", "O 47.5", DraftKings' joined "+3.5 | O 47.5" line cells or
+ESPN's "PHI -7.5". normalize_line() converts one line into the typed odds
+columns:
+
+    home_spread        REAL     home team's spread (-7.5 = home gives 7.5)
+    home_spread_price  INTEGER  American price on the home spread
+    total_points       REAL
+    home_ml, away_ml   INTEGER  American moneylines
+    home_ml_decimal, away_ml_decimal  REAL
+
+Anything that cannot be read comes back as None rather than raising.
+"""
+
+import re
+
+NUMBER_RE = re.compile(r"[-+]?\d+(?:\.\d+)?")
+PICK_WORDS = {"PK", "PICK", "EVEN", "EV"}
+
+TYPED_COLUMNS = (
+    "home_spread", "home_spread_price", "total_points",
+    "home_ml", "away_ml", "home_ml_decimal", "away_ml_decimal",
+)
+
+
+def _clean(value):
+    return str(value).strip().replace("−", "-").replace("–", "-")
+
+
+def parse_american(value):
+    """Parse American odds such as '+120', '-110' or '−110' into an int."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = _clean(value).replace("+", "")
+    if text.upper() in PICK_WORDS:
+        return 100
+    try:
+        return int(float(text))
+    except ValueError:
+        return None
+
+
+def american_to_decimal(odds):
+    """Decimal odds for an American price (+150 -> 2.5, -200 -> 1.5)."""
+    if not odds:
+        return None
+    if odds > 0:
+        return round(1 + odds / 100, 4)
+    return round(1 + 100 / -odds, 4)
+
+
+def parse_points(value):
+    """First number in a line such as '47.5', 'O 47.5' or '-3.5'; 'PK' is 0."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = _clean(value)
+    if text.upper() in PICK_WORDS:
+        return 0.0
+    match = NUMBER_RE.search(text)
+    return float(match.group()) if match else None
+
+
+def parse_home_spread(spread, home_abbr=None, away_abbr=None):
+    """
+    Home team's spread from a display string. ESPN-style "PHI -7.5" is
+    resolved against the team abbreviations; DraftKings' "away | home"
+    strings are read from the away side, since that is always present.
+    """
+    if spread is None:
+        return None
+    if isinstance(spread, (int, float)):
+        return float(spread)
+    text = _clean(spread)
+    if text.upper() in PICK_WORDS:
+        return 0.0
+
+    head = text.split()[0].upper() if text.split() else ""
+    if head and head.isalpha():
+        line = parse_points(text[len(head):])
+        if line is None:
+            return None
+        if home_abbr and head == home_abbr.upper():
+            return line
+        if away_abbr and head == away_abbr.upper():
+            return -line
+        return None  # a team we cannot place
+
+    away_line = parse_points(text.split("|")[0])
+    return None if away_line is None else 0.0 - away_line
+
+
+def normalize_line(spread, total, ml_home, ml_away,
+                   home_spread=None, home_spread_price=None, home_abbr=None, away_abbr=None):
+    """
+    Typed columns for one line. Sources that already have a numeric home
+    spread or price (the DK feed, ESPN) pass them in directly.
+    """
+    home_ml = parse_american(ml_home)
+    away_ml = parse_american(ml_away)
+    if home_spread is None:
+        home_spread = parse_home_spread(spread, home_abbr, away_abbr)
+    return {
+        "home_spread":       home_spread,
+        "home_spread_price": parse_american(home_spread_price),
+        "total_points":      parse_points(total),
+        "home_ml":           home_ml,
+        "away_ml":           away_ml,
+        "home_ml_decimal":   american_to_decimal(home_ml),
+        "away_ml_decimal":   american_to_decimal(away_ml),
+    }
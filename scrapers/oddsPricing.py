@@ -0,0 +1,150 @@
+"""
+Implied probabilities and no-vig fair prices for whole columns of odds.
+
+Every function takes scalars or arrays of American odds (typed columns
+such as odds.home_ml / odds.away_ml) and works on NumPy arrays, so
+pricing thousands of snapshots is a handful of array operations:
+
+    implied   1 / decimal odds for each side (-110 -> 0.524)
+    overround sum of both sides' implied probabilities minus 1 (the vig)
+    hold      the book's expected margin, 1 - 1 / (sum of implied)
+    fair      each side's implied probability scaled so the two add to 1
+    fair_ml   the fair probability as American odds
+
+Odds that cannot be priced (missing, or between -100 and +100) give NaN.
+
+PriceCache keeps priced rows keyed by (game_id, provider, odds_id), so
+a line that has not moved is never priced twice by the dashboard or the
+analysis scripts. The odds row id changes with every move, even two in
+the same second, where updated_at would not.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Config
+MAX_CACHE_ROWS = 200_000
+
+CACHE_KEY = ["game_id", "provider", "odds_id"]
+PRICE_COLUMNS = [
+    "home_implied", "away_implied", "overround", "hold",
+    "home_fair", "away_fair", "home_fair_ml", "away_fair_ml", "home_spread_implied",
+]
+
+
+def implied_probability(american):
+    """Implied probability of American odds (+150 -> 0.4, -200 -> 0.667)."""
+    ml = np.asarray(american, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prob = np.where(ml > 0, 100 / (ml + 100), -ml / (100 - ml))
+    return np.where(np.abs(ml) >= 100, prob, np.nan)
+
+
+def probability_to_american(prob):
+    """American odds for a probability (0.4 -> +150, 0.6667 -> -200)."""
+    p = np.asarray(prob, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ml = np.where(p < 0.5, 100 * (1 - p) / p, -100 * p / (1 - p))
+    return np.where((p > 0) & (p < 1), np.round(ml), np.nan)
+
+
+def price_two_way(side_a, side_b):
+    """
+    Price a two-way market from each side's American odds. Returns a dict
+    of arrays: a/b implied, overround, hold, a/b fair probability and a/b
+    fair American odds.
+    """
+    a, b = implied_probability(side_a), implied_probability(side_b)
+    total = a + b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fair_a, fair_b = a / total, b / total
+        hold = 1 - 1 / total
+    return {
+        "a_implied": a, "b_implied": b,
+        "overround": total - 1, "hold": hold,
+        "a_fair": fair_a, "b_fair": fair_b,
+        "a_fair_ml": probability_to_american(fair_a),
+        "b_fair_ml": probability_to_american(fair_b),
+    }
+
+
+def price_moneylines(home_ml, away_ml):
+    """price_two_way for home/away moneylines, with home_/away_ names."""
+    prices = price_two_way(home_ml, away_ml)
+    return {
+        "home_implied": prices["a_implied"], "away_implied": prices["b_implied"],
+        "overround": prices["overround"], "hold": prices["hold"],
+        "home_fair": prices["a_fair"], "away_fair": prices["b_fair"],
+        "home_fair_ml": prices["a_fair_ml"], "away_fair_ml": prices["b_fair_ml"],
+    }
+
+
+def _column(df, name):
+    return df[name].to_numpy(dtype=float, na_value=np.nan)
+
+
+def price_frame(df):
+    """
+    PRICE_COLUMNS for a DataFrame with home_ml and away_ml columns. The odds
+    tables only keep the home side of the spread, so home_spread_price is
+    priced on its own (NaN without that column) and cannot be de-vigged.
+    """
+    prices = pd.DataFrame(price_moneylines(_column(df, "home_ml"), _column(df, "away_ml")), index=df.index)
+    spread_price = _column(df, "home_spread_price") if "home_spread_price" in df else np.nan
+    prices["home_spread_implied"] = implied_probability(spread_price) * np.ones(len(df))
+    return prices
+
+
+class PriceCache:
+    """
+    Priced odds rows keyed by (game_id, provider, odds_id). price() looks
+    the keys up with one reindex and only prices the rows it has not seen;
+    once the cache passes max_rows the half priced first is dropped.
+    One cache can be shared between threads.
+    """
+
+    def __init__(self, max_rows=MAX_CACHE_ROWS):
+        self.max_rows = max_rows
+        self.prices = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def price(self, df):
+        """df with the price columns joined on; df needs CACHE_KEY columns."""
+        keys = pd.MultiIndex.from_frame(df[CACHE_KEY].astype(str))
+        with self._lock:
+            known = self._lookup(df, keys)
+        priced = df.copy()
+        for col in known.columns:
+            priced[col] = known[col].to_numpy(dtype=float)
+        return priced
+
+    def _lookup(self, df, keys):
+        if self.prices is None:
+            known = pd.DataFrame(index=keys, columns=PRICE_COLUMNS, dtype=float)
+            missing = np.ones(len(df), dtype=bool)
+        else:
+            known = self.prices.reindex(keys)
+            missing = ~keys.isin(self.prices.index)
+
+        self.hits += int((~missing).sum())
+        self.misses += int(missing.sum())
+        if missing.any():
+            fresh = price_frame(df.loc[missing])
+            fresh.index = keys[missing]
+            known.loc[missing] = fresh.to_numpy()
+            self._store(fresh)
+        return known
+
+    def _store(self, fresh):
+        fresh = fresh[~fresh.index.duplicated(keep="last")]
+        if self.prices is None:
+            self.prices = fresh
+        else:
+            self.prices = pd.concat([self.prices, fresh[~fresh.index.isin(self.prices.index)]])
+        # New rows are appended, so the front of the frame was priced first
+        if len(self.prices) > self.max_rows:
+            self.prices = self.prices.iloc[len(self.prices) // 2:]
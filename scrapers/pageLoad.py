@@ -0,0 +1,96 @@
+"""
+Fast page loading for the Playwright scrapers.
+
+load_page aborts requests the scrapers never need (images, media, fonts and
+tracker hosts), navigates with wait_until="domcontentloaded" instead of the
+full `load` event, and then waits for the first of several ready selectors
+in a single combined wait rather than trying them one after another.
+
+PageTimer splits each scraper's page time into navigation and extraction so
+the gain can be tracked per scraper; finished timings are kept in
+PAGE_TIMINGS keyed by scraper name.
+"""
+
+import time
+from urllib.parse import urlparse
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+# Config
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_HOSTS = (
+    "doubleclick.net",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "optimizely.com",
+    "newrelic.com",
+    "nr-data.net",
+    "demdex.net",
+    "adsrvr.org",
+)
+NAV_TIMEOUT   = 60000
+READY_TIMEOUT = 30000
+
+# scraper name -> {"navigation": seconds, "extraction": seconds}
+PAGE_TIMINGS = {}
+
+
+async def block_heavy_resources(route):
+    """Route handler that aborts non-essential requests."""
+    request = route.request
+    host = urlparse(request.url).hostname or ""
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or host.endswith(BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def load_page(page, url, ready_selectors=(), timeout=NAV_TIMEOUT,
+                    ready_timeout=READY_TIMEOUT, block=True):
+    """
+    Navigate to `url` and wait until any of `ready_selectors` is attached.
+    Returns True once a ready selector matched (or none were given) and
+    False if none showed up within `ready_timeout` ms. Navigation errors
+    are raised to the caller.
+    """
+    if block:
+        await page.route("**/*", block_heavy_resources)
+    await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+
+    if not ready_selectors:
+        return True
+    try:
+        # A CSS selector list matches whichever selector appears first
+        await page.wait_for_selector(", ".join(ready_selectors), timeout=ready_timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+class PageTimer:
+    """Split a scraper's page time into navigation and extraction."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.navigation = None
+        self.extraction = None
+
+    def navigated(self):
+        """Mark the end of navigation; everything after is extraction."""
+        self.navigation = time.perf_counter() - self.started
+
+    def done(self):
+        """Record the timings under the scraper's name and print them."""
+        total = time.perf_counter() - self.started
+        if self.navigation is None:
+            self.navigation = total
+        self.extraction = total - self.navigation
+        PAGE_TIMINGS[self.name] = {
+            "navigation": round(self.navigation, 3),
+            "extraction": round(self.extraction, 3),
+        }
+        print(f"{self.name}: navigation {self.navigation:.2f}s, extraction {self.extraction:.2f}s")
@@ -0,0 +1,270 @@
+"""
+Shared write path for the odds and stats databases.
+
+Storage wraps one connection and exposes the bulk writes the scrapers use:
+
+    with Storage(DB_NAME) as db:
+        db.identify_games("nfl", "dk", scraped)     # canonical game_ids
+        db.upsert_games(game_rows)
+        db.append_odds(odds_rows, source="dk")
+
+Each call is a single executemany in one transaction. Statements are built
+once per column set, so sqlite3's statement cache reuses the prepared
+statement across calls.
+
+connect() opens every scraper connection with the same PRAGMAs. The
+databases run in WAL mode (set by scripts/migrations.py), so the dashboard
+can read while a scraper writes, and synchronous=NORMAL is durable enough
+there while skipping an fsync per commit.
+
+OddsWriter makes odds ingestion change-only: the last stored line for every
+(game_id, provider) is loaded once per run from `odds_latest` (kept on the
+newest row by a trigger on `odds`), and a new `odds` row is written only
+when one of the typed CHANGE_COLUMNS moved: the home spread or its price,
+the total or either moneyline. Every line seen, changed
+or not, refreshes `odds_heartbeat`, so we still know when a line was last
+confirmed. A scraper whose feed came back unchanged calls touch_lines()
+instead, which refreshes the lines it saw in its last import.
+"""
+
+import sqlite3
+from datetime import datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
+
+from scrapers.gameIdentity import GameResolver
+from scrapers.oddsNormalize import TYPED_COLUMNS, normalize_line
+
+# Config
+BUSY_TIMEOUT = 10       # seconds to wait on a locked database
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -32000",       # 32 MB page cache
+    "PRAGMA mmap_size = 268435456",     # 256 MB memory-mapped reads
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Typed columns that make a line a new one; the decimal odds follow the moneylines
+CHANGE_COLUMNS = ("home_spread", "home_spread_price", "total_points", "home_ml", "away_ml")
+
+LAST_ODDS_SQL = f"""
+    SELECT game_id, provider, {', '.join(CHANGE_COLUMNS)}
+    FROM odds_latest
+"""
+
+ODDS_COLUMNS = (
+    "game_id", "provider", "spread_details", "over_under", "moneyline_home", "moneyline_away",
+    "updated_at",
+) + TYPED_COLUMNS
+INSERT_ODDS_SQL = f"""
+    INSERT INTO odds ({', '.join(ODDS_COLUMNS)})
+    VALUES ({', '.join(['?'] * len(ODDS_COLUMNS))})
+"""
+
+HEARTBEAT_SQL = """
+    INSERT INTO odds_heartbeat (game_id, provider, last_seen, source)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(game_id, provider) DO UPDATE SET
+        last_seen = excluded.last_seen,
+        source    = excluded.source
+"""
+
+# A source's imports share one timestamp, so its newest last_seen marks the
+# lines it saw last time
+TOUCH_SQL = """
+    UPDATE odds_heartbeat SET last_seen = :ts
+    WHERE source = :source
+      AND last_seen = (SELECT MAX(last_seen) FROM odds_heartbeat WHERE source = :source)
+"""
+
+# Columns an upsert never overwrites with NULL (the DK feed has no pitchers)
+KEEP_IF_NULL = {"home_pitcher", "away_pitcher"}
+
+
+def connect(db_name, **kwargs):
+    """sqlite3.connect with the shared PRAGMAs applied."""
+    conn = sqlite3.connect(db_name, timeout=BUSY_TIMEOUT, **kwargs)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def utc_now():
+    """UTC timestamp without microseconds, as stored in odds.updated_at."""
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def odds_key(typed):
+    """Comparable form of a line: its CHANGE_COLUMNS from normalize_line."""
+    return tuple(typed[c] for c in CHANGE_COLUMNS)
+
+
+class OddsWriter:
+    """Change-only odds ingestion for one run against one database."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.last = {
+            (game_id, provider): tuple(line)
+            for game_id, provider, *line in conn.execute(LAST_ODDS_SQL)
+        }
+        self.pending_odds = []
+        self.pending_seen = []
+        self.written = 0
+        self.unchanged = 0
+
+    def record(self, game_id, provider, spread, total, ml_home, ml_away,
+               home_spread=None, home_spread_price=None, ts=None, source=None):
+        """
+        Queue a line. It is written to `odds`, with its typed columns, only
+        if it differs from the last stored line for (game_id, provider).
+        Returns True if it moved.
+        """
+        ts = ts or utc_now()
+        typed = normalize_line(spread, total, ml_home, ml_away, home_spread, home_spread_price)
+        key = odds_key(typed)
+        self.pending_seen.append((game_id, provider, ts, source))
+
+        if self.last.get((game_id, provider)) == key:
+            self.unchanged += 1
+            return False
+
+        self.last[(game_id, provider)] = key
+        self.pending_odds.append(
+            (game_id, provider, spread, total, ml_home, ml_away, ts)
+            + tuple(typed[c] for c in TYPED_COLUMNS)
+        )
+        self.written += 1
+        return True
+
+    def flush(self):
+        """Write queued odds rows and heartbeats; the caller commits."""
+        if self.pending_odds:
+            self.conn.executemany(INSERT_ODDS_SQL, self.pending_odds)
+        if self.pending_seen:
+            self.conn.executemany(HEARTBEAT_SQL, self.pending_seen)
+        self.pending_odds = []
+        self.pending_seen = []
+
+    def summary(self):
+        return f"{self.written} line moves written, {self.unchanged} unchanged"
+
+
+@lru_cache(maxsize=None)
+def upsert_sql(table, columns, key, update=True):
+    """
+    INSERT ... ON CONFLICT(key) DO UPDATE for a tuple of columns, or
+    DO NOTHING when existing rows should be left alone.
+    """
+    if update:
+        conflict = "DO UPDATE SET " + ", ".join(
+            f"{c} = COALESCE(excluded.{c}, {table}.{c})" if c in KEEP_IF_NULL else f"{c} = excluded.{c}"
+            for c in columns if c not in key
+        )
+    else:
+        conflict = "DO NOTHING"
+    return f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        VALUES ({', '.join(['?'] * len(columns))})
+        ON CONFLICT({', '.join(key)}) {conflict}
+    """
+
+
+class Storage:
+    """One database connection with batched, single-transaction writes."""
+
+    def __init__(self, db_name):
+        self.db_name = db_name
+        self.conn = connect(db_name)
+        self._odds = None
+        self._resolver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _upsert(self, table, key, rows, update=True, commit=True):
+        """
+        Upsert dict rows that share the same keys. Returns rows written.
+        With commit=False the rows join the caller's open transaction.
+        """
+        if not rows:
+            return 0
+        columns = tuple(rows[0])
+        values = itemgetter(*columns)
+        if not commit:
+            self.conn.executemany(upsert_sql(table, columns, key, update), map(values, rows))
+            return len(rows)
+        with self.conn:
+            self.conn.executemany(upsert_sql(table, columns, key, update), map(values, rows))
+        return len(rows)
+
+    def identify_games(self, sport, source, games):
+        """
+        Resolve scraped game dicts (home_team, away_team, start_utc and an
+        optional source_key and doubleheader game_number) to canonical
+        games. Sets game_id, home_code, away_code and start_utc (epoch
+        seconds) in place.
+        """
+        if self._resolver is None:
+            self._resolver = GameResolver(self.conn, sport)
+        for g in games:
+            g["game_id"], g["home_code"], g["away_code"], start = self._resolver.resolve(
+                source, g.get("source_key"), g["home_team"], g["away_team"], g.get("start_utc"),
+                g.get("game_number"),
+            )
+            g["start_utc"] = int(start.timestamp()) if start else None
+        with self.conn:
+            self._resolver.flush()
+        return games
+
+    def upsert_games(self, rows, update=True):
+        """
+        Insert or update `games` rows (dicts keyed by column). Known pitchers
+        are kept when a row has none; with update=False existing games are
+        left as they are.
+        """
+        return self._upsert("games", ("game_id",), rows, update)
+
+    def upsert_results(self, rows):
+        """Insert or update `game_results` rows (dicts keyed by column)."""
+        return self._upsert("game_results", ("game_id",), rows)
+
+    def upsert_player_stats(self, rows, commit=True):
+        """Insert or update `player_stats` rows (dicts keyed by column)."""
+        return self._upsert("player_stats", ("player_name", "year", "player_type"), rows, commit=commit)
+
+    @property
+    def odds(self):
+        """The change-only OddsWriter, loaded on first use."""
+        if self._odds is None:
+            self._odds = OddsWriter(self.conn)
+        return self._odds
+
+    def append_odds(self, rows, ts=None, source=None):
+        """
+        Append (game_id, provider, spread, total, ml_home, ml_away
+        [, home_spread, home_spread_price]) lines, skipping those unchanged
+        since the last stored line. The batch shares
+        one timestamp. Returns the number of line moves written.
+        """
+        ts = ts or utc_now()
+        before = self.odds.written
+        for row in rows:
+            self.odds.record(*row, ts=ts, source=source)
+        with self.conn:
+            self.odds.flush()
+        return self.odds.written - before
+
+    def touch_lines(self, source, ts=None):
+        """
+        Refresh last_seen for the lines `source` saw in its last import,
+        for a feed that came back unchanged. Returns the lines touched.
+        """
+        with self.conn:
+            return self.conn.execute(TOUCH_SQL, {"ts": ts or utc_now(), "source": source}).rowcount
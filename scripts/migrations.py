@@ -1,11 +1,130 @@
 #Table creations for SQLite
+#
+# Each database has an ordered list of migration steps. PRAGMA user_version
+# records how many have run, so `python scripts/migrations.py` only applies
+# the new ones, each in its own transaction. Steps must also be safe against
+# databases created before versioning (user_version 0): they create with
+# IF NOT EXISTS and rebuild tables in place rather than dropping data.
+import os
+import sys
 import sqlite3
+from datetime import timedelta, timezone
 
-def migrate_nfl_odds_db():
-    conn = sqlite3.connect("data/nfl_odds.db")
-    c = conn.cursor()
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scrapers.gameIdentity import TEAMS, GameResolver, alias_rows, normalize_name, parse_display_start, to_utc
+from scrapers.oddsNormalize import normalize_line
+from scrapers.storage import connect
+
+NFL_ODDS_DB  = "data/nfl_odds.db"
+MLB_ODDS_DB  = "data/mlb_odds.db"
+MLB_STATS_DB = "data/mlb_stats.db"
+
+ODDS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS odds (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_id        TEXT,
+    provider       TEXT,
+    spread_details TEXT,
+    over_under     REAL,
+    moneyline_home INTEGER,
+    moneyline_away INTEGER,
+    updated_at     TEXT,
+    FOREIGN KEY(game_id) REFERENCES games(game_id)
+);
+"""
+
+ODDS_HEARTBEAT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS odds_heartbeat (
+    game_id    TEXT,
+    provider   TEXT,
+    last_seen  TEXT,
+    PRIMARY KEY(game_id, provider)
+);
+"""
+
+ODDS_LATEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS odds_latest (
+    game_id        TEXT,
+    provider       TEXT,
+    odds_id        INTEGER,
+    spread_details TEXT,
+    over_under     REAL,
+    moneyline_home INTEGER,
+    moneyline_away INTEGER,
+    updated_at     TEXT,
+    PRIMARY KEY(game_id, provider)
+);
+"""
+
+ODDS_LINE_COLUMNS = (
+    "spread_details", "over_under", "moneyline_home", "moneyline_away", "updated_at",
+)
+
+# Typed columns filled at ingest by scrapers.oddsNormalize
+TYPED_ODDS_COLUMNS = {
+    "home_spread":       "REAL",
+    "home_spread_price": "INTEGER",
+    "total_points":      "REAL",
+    "home_ml":           "INTEGER",
+    "away_ml":           "INTEGER",
+    "home_ml_decimal":   "REAL",
+    "away_ml_decimal":   "REAL",
+}
+
+def odds_latest_trigger(columns):
+    """Trigger keeping odds_latest on the newest line whatever writes to odds."""
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS odds_latest_on_insert AFTER INSERT ON odds
+    BEGIN
+        INSERT INTO odds_latest (game_id, provider, odds_id, {', '.join(columns)})
+        VALUES (NEW.game_id, NEW.provider, NEW.id, {', '.join(f'NEW.{c}' for c in columns)})
+        ON CONFLICT(game_id, provider) DO UPDATE SET
+            odds_id = excluded.odds_id,
+            {', '.join(f'{c} = excluded.{c}' for c in columns)}
+        WHERE excluded.updated_at >= odds_latest.updated_at;
+    END;
+    """
+
+PLAYER_STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_stats (
+    player_name         TEXT,
+    year                INTEGER,
+    player_type         TEXT NOT NULL DEFAULT 'batter',
+    at_bats             INTEGER,
+    plate_appearances   INTEGER,
+    hits                INTEGER,
+    singles             INTEGER,
+    doubles             INTEGER,
+    home_runs           INTEGER,
+    strikeouts          INTEGER,
+    walks               INTEGER,
+    strikeout_rate      REAL,
+    walk_rate           REAL,
+    batting_avg         REAL,
+    slg                 REAL,
+    obp                 REAL,
+    iso                 REAL,
+    rbi                 INTEGER,
+    stolen_bases        INTEGER,
+    games_played        INTEGER,
+    woba                REAL,
+    xwoba               REAL,
+    la_sweet_spot_pct   REAL,
+    barrel_pct          REAL,
+    hard_hit_pct        REAL,
+    ev50                REAL,
+    adjusted_ev         REAL,
+    whiff_pct           REAL,
+    swing_pct           REAL,
+    last_updated        TEXT,
+    PRIMARY KEY(player_name, year, player_type)
+);
+"""
 
-    #  Create games table
+
+# Odds database steps
+
+def create_nfl_tables(c):
     c.execute("""
     CREATE TABLE IF NOT EXISTS games (
         game_id       TEXT PRIMARY KEY,
@@ -15,30 +134,10 @@ def migrate_nfl_odds_db():
         away_team     TEXT
     );
     """)
+    c.execute(ODDS_SCHEMA)
 
-    # Create odds table
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS odds (
-        id             INTEGER PRIMARY KEY AUTOINCREMENT,
-        game_id        TEXT,
-        provider       TEXT,
-        spread_details TEXT,
-        over_under     REAL,
-        moneyline_home INTEGER,
-        moneyline_away INTEGER,
-        updated_at     TEXT,
-        FOREIGN KEY(game_id) REFERENCES games(game_id)
-    );
-    """)
-
-    conn.commit()
-    conn.close()
-
-def migrate_mlb_odds_db():
-    conn = sqlite3.connect("data/mlb_odds.db")
-    c = conn.cursor()
-
-    # Create games table with pitcher columns
+def create_mlb_tables(c):
+    # Same as NFL plus probable pitchers
     c.execute("""
     CREATE TABLE IF NOT EXISTS games (
         game_id       TEXT PRIMARY KEY,
@@ -50,110 +149,355 @@ def migrate_mlb_odds_db():
         home_pitcher  TEXT
     );
     """)
+    c.execute(ODDS_SCHEMA)
+
+def create_odds_heartbeat(c):
+    # Last time each line was seen, whether or not it moved
+    c.execute(ODDS_HEARTBEAT_SCHEMA)
+
+def create_odds_indexes(c):
+    # Latest line per game (dashboard) and a game's history in order (trackLines)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_odds_game_updated ON odds(game_id, updated_at)")
+    # Last line per (game, provider), used by change-only ingestion
+    c.execute("CREATE INDEX IF NOT EXISTS idx_odds_game_provider_updated ON odds(game_id, provider, updated_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_games_game_date ON games(game_date)")
+
+def create_odds_latest(c):
+    # Newest line per (game, provider), so readers never aggregate the history
+    c.execute(ODDS_LATEST_SCHEMA)
+    c.execute(odds_latest_trigger(ODDS_LINE_COLUMNS))
+    c.execute("""
+    INSERT OR REPLACE INTO odds_latest
+        (game_id, provider, odds_id, spread_details, over_under, moneyline_home, moneyline_away, updated_at)
+    SELECT o.game_id, o.provider, o.id, o.spread_details, o.over_under,
+           o.moneyline_home, o.moneyline_away, o.updated_at
+    FROM odds o
+    JOIN (SELECT MAX(id) AS id FROM odds GROUP BY game_id, provider) latest ON latest.id = o.id
+    """)
+
+def add_typed_odds_columns(c):
+    """
+    Add the typed odds columns to odds and odds_latest and fill them for
+    existing rows. ESPN-style spreads ("PHI -7.5") cannot be placed without
+    team abbreviations, so their home_spread stays NULL in old rows.
+    """
+    for table in ("odds", "odds_latest"):
+        existing = {row[1] for row in c.execute(f"PRAGMA table_info({table})")}
+        for column, sql_type in TYPED_ODDS_COLUMNS.items():
+            if column not in existing:
+                c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}")
+
+    c.execute("DROP TRIGGER IF EXISTS odds_latest_on_insert")
+    c.execute(odds_latest_trigger(ODDS_LINE_COLUMNS + tuple(TYPED_ODDS_COLUMNS)))
+
+    rows = c.execute(
+        "SELECT id, spread_details, over_under, moneyline_home, moneyline_away FROM odds"
+    ).fetchall()
+    updates = []
+    for odds_id, spread, total, ml_home, ml_away in rows:
+        typed = normalize_line(spread, total, ml_home, ml_away)
+        updates.append(tuple(typed[col] for col in TYPED_ODDS_COLUMNS) + (odds_id,))
+    c.executemany(
+        f"UPDATE odds SET {', '.join(f'{col} = ?' for col in TYPED_ODDS_COLUMNS)} WHERE id = ?",
+        updates,
+    )
+    c.execute(f"""
+    UPDATE odds_latest SET ({', '.join(TYPED_ODDS_COLUMNS)}) = (
+        SELECT {', '.join(TYPED_ODDS_COLUMNS)} FROM odds WHERE odds.id = odds_latest.odds_id
+    )
+    """)
+
+def add_game_identity(c, sport):
+    """
+    Team aliases, source-id mappings and the columns canonical games are
+    matched on. Existing games get their team codes; their old game_ids
+    are left as they are.
+    """
+    existing = {row[1] for row in c.execute("PRAGMA table_info(games)")}
+    for column, sql_type in (("home_code", "TEXT"), ("away_code", "TEXT"), ("start_utc", "INTEGER")):
+        if column not in existing:
+            c.execute(f"ALTER TABLE games ADD COLUMN {column} {sql_type}")
+
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS team_aliases (
+        sport   TEXT,
+        alias   TEXT,
+        team    TEXT,
+        PRIMARY KEY(sport, alias)
+    );
+    """)
+    c.executemany("INSERT OR IGNORE INTO team_aliases (sport, alias, team) VALUES (?, ?, ?)",
+                  alias_rows(sport))
 
-    # Create odds table (same schema as NFL)
+    # Source record ids (MLB gamePk, ESPN/DK event ids) -> canonical game
     c.execute("""
-    CREATE TABLE IF NOT EXISTS odds (
-        id             INTEGER PRIMARY KEY AUTOINCREMENT,
-        game_id        TEXT,
-        provider       TEXT,
-        spread_details TEXT,
-        over_under     REAL,
-        moneyline_home INTEGER,
-        moneyline_away INTEGER,
-        updated_at     TEXT,
-        FOREIGN KEY(game_id) REFERENCES games(game_id)
+    CREATE TABLE IF NOT EXISTS game_keys (
+        source      TEXT,
+        source_key  TEXT,
+        game_id     TEXT,
+        PRIMARY KEY(source, source_key)
     );
     """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_game_keys_game ON game_keys(game_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_games_teams_start ON games(away_code, home_code, start_utc)")
+
+    resolver = GameResolver(c, sport)
+    rows = c.execute("SELECT game_id, home_team, away_team FROM games WHERE home_code IS NULL").fetchall()
+    c.executemany(
+        "UPDATE games SET home_code = ?, away_code = ? WHERE game_id = ?",
+        [(resolver.team(home), resolver.team(away), game_id) for game_id, home, away in rows],
+    )
 
-    conn.commit()
-    conn.close()
+def add_nfl_game_identity(c):
+    add_game_identity(c, "nfl")
 
-def migrate_mlb_stats_db_FG():
-    conn = sqlite3.connect("data/mlb_stats.db")
-    c = conn.cursor()
+def add_mlb_game_identity(c):
+    add_game_identity(c, "mlb")
 
-    # Player stats table with a composite primary key
+# mlbScheduleAPI wrote its display times at a fixed UTC-6, whatever the
+# machine's zone; its rows are the ones with the API's full team names
+MLB_API_DISPLAY_TZ = timezone(timedelta(hours=-6))
+MLB_API_TEAM_NAMES = {
+    normalize_name(f"{location} {nickname}") for _, location, nickname, _ in TEAMS["mlb"]
+} | {"athletics"}   # the API's name for the A's since 2025
+
+def index_game_start(c):
+    """
+    Range index on the UTC start, plus start_utc for games stored before the
+    writers filled it. ESPN rows carry an ISO start_time; DraftKings and MLB
+    rows only have display text ("THU SEP 4TH", "8:20PM"), whose year is taken
+    from when the game's first line was scraped rather than from today.
+    DraftKings text is local time; MLB Stats API text is MLB_API_DISPLAY_TZ.
+    """
+    c.execute("CREATE INDEX IF NOT EXISTS idx_games_start_utc ON games(start_utc)")
+    rows = c.execute("""
+    SELECT g.game_id, g.game_date, g.start_time, g.home_team, g.away_team, MIN(o.updated_at)
+    FROM games g LEFT JOIN odds o ON o.game_id = g.game_id
+    WHERE g.start_utc IS NULL
+    GROUP BY g.game_id
+    """).fetchall()
+    updates = []
+    for game_id, game_date, start_time, home, away, first_seen in rows:
+        start = to_utc(start_time)
+        if start is None:
+            mlb_api = {normalize_name(home), normalize_name(away)} <= MLB_API_TEAM_NAMES
+            tz = MLB_API_DISPLAY_TZ if mlb_api else None
+            seen = to_utc(first_seen)
+            start = parse_display_start(game_date, start_time, tz=tz,
+                                        now=seen.astimezone(tz).replace(tzinfo=None) if seen else None)
+        if start is not None:
+            updates.append((int(start.timestamp()), game_id))
+    c.executemany("UPDATE games SET start_utc = ? WHERE game_id = ?", updates)
+
+
+def create_line_moves(c):
+    # One row per snapshot where a line moved, written by analysis/trackLines.py
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS line_moves (
+        odds_id           INTEGER PRIMARY KEY,
+        prev_odds_id      INTEGER,
+        game_id           TEXT,
+        provider          TEXT,
+        updated_at        TEXT,
+        spread_from       TEXT,
+        spread_to         TEXT,
+        total_from        REAL,
+        total_to          REAL,
+        ml_home_from      INTEGER,
+        ml_home_to        INTEGER,
+        ml_away_from      INTEGER,
+        ml_away_to        INTEGER,
+        home_spread_move  REAL,
+        total_move        REAL,
+        home_ml_move      INTEGER,
+        away_ml_move      INTEGER
+    );
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_line_moves_game ON line_moves(game_id, updated_at)")
+    # High-water marks: the last odds.id each analysis job has processed
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS analysis_checkpoints (
+        job           TEXT PRIMARY KEY,
+        last_odds_id  INTEGER,
+        updated_at    TEXT
+    );
+    """)
+
+
+def index_odds_latest_changes(c):
+    # Lines changed since a given odds.id, read by analysis/lineScanner.py
+    c.execute("CREATE INDEX IF NOT EXISTS idx_odds_latest_odds_id ON odds_latest(odds_id)")
+
+
+def create_results_tables(c):
+    # Final scores and closing lines, written by analysis/closingLines.py.
+    # A game with a game_results row is done and is never fetched again.
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS game_results (
+        game_id      TEXT PRIMARY KEY,
+        status       TEXT,
+        home_score   INTEGER,
+        away_score   INTEGER,
+        recorded_at  TEXT
+    );
+    """)
+    # Last pre-game line per (game, provider) and how it settled
     c.execute("""
-    CREATE TABLE IF NOT EXISTS player_stats (
-        player_name       TEXT,
-        team              TEXT,
-        games_played      INTEGER,
-        plate_appearances INTEGER,
-        home_runs         INTEGER,
-        runs              INTEGER,
-        rbi               INTEGER,
-        stolen_bases      INTEGER,
-        walk_rate         REAL,
-        strikeout_rate    REAL,
-        iso               REAL,
-        babip             REAL,
-        batting_avg       REAL,
-        obp               REAL,
-        slg               REAL,
-        woba              REAL,
-        xwoba             REAL,
-        wrc_plus          INTEGER,
-        bsr               REAL,
-        off               REAL,
-        def               REAL,
-        war               REAL,
-        last_updated      TEXT,
-        PRIMARY KEY(player_name, team)
+    CREATE TABLE IF NOT EXISTS closing_lines (
+        game_id            TEXT,
+        provider           TEXT,
+        odds_id            INTEGER,
+        updated_at         TEXT,
+        spread_details     TEXT,
+        home_spread        REAL,
+        home_spread_price  INTEGER,
+        total_points       REAL,
+        home_ml            INTEGER,
+        away_ml            INTEGER,
+        home_fair          REAL,
+        home_won           INTEGER,
+        home_covered       INTEGER,
+        went_over          INTEGER,
+        PRIMARY KEY(game_id, provider)
     );
     """)
+    # Closing line value of every pre-game snapshot against its book's close
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS line_clv (
+        odds_id          INTEGER PRIMARY KEY,
+        game_id          TEXT,
+        provider         TEXT,
+        updated_at       TEXT,
+        home_ml_clv      REAL,
+        away_ml_clv      REAL,
+        home_spread_clv  REAL,
+        over_clv         REAL
+    );
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_line_clv_game ON line_clv(game_id)")
+
 
-    conn.commit()
-    conn.close()
+def add_heartbeat_source(c):
+    # Which scraper last saw each line, so an unchanged feed can refresh its own
+    existing = {row[1] for row in c.execute("PRAGMA table_info(odds_heartbeat)")}
+    if "source" not in existing:
+        c.execute("ALTER TABLE odds_heartbeat ADD COLUMN source TEXT")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_odds_heartbeat_source ON odds_heartbeat(source, last_seen)")
 
-def migrate_mlb_stats_db_SC():
-    conn = sqlite3.connect("data/mlb_stats.db")
-    c = conn.cursor()
 
-    # Drop the old table if it exists
-    c.execute("DROP TABLE IF EXISTS player_stats")
+# Stats database steps
 
-    # Create new player stats table with updated schema
+def create_player_stats(c):
+    c.execute(PLAYER_STATS_SCHEMA)
+
+def add_player_type(c):
+    """
+    Key player_stats on (player_name, year, player_type) so batter and pitcher
+    leaderboards can both be stored. Tables from before player_type are
+    rebuilt in place with existing rows kept as batters.
+    """
+    columns = [row[1] for row in c.execute("PRAGMA table_info(player_stats)")]
+    if "player_type" in columns:
+        return
+    c.execute("ALTER TABLE player_stats RENAME TO player_stats_old")
+    c.execute(PLAYER_STATS_SCHEMA)
+    c.execute(f"""
+        INSERT INTO player_stats ({', '.join(columns)}, player_type)
+        SELECT {', '.join(columns)}, 'batter' FROM player_stats_old
+    """)
+    c.execute("DROP TABLE player_stats_old")
+
+def create_backfill_checkpoints(c):
+    # One row per (season, leaderboard) the Savant backfill has stored
     c.execute("""
-    CREATE TABLE IF NOT EXISTS player_stats (
-        player_name         TEXT,
-        year                INTEGER,
-        at_bats             INTEGER,
-        plate_appearances   INTEGER,
-        hits                INTEGER,
-        singles             INTEGER,
-        doubles             INTEGER,
-        home_runs           INTEGER,
-        strikeouts          INTEGER,
-        walks               INTEGER,
-        strikeout_rate      REAL,
-        walk_rate           REAL,
-        batting_avg         REAL,
-        slg                 REAL,
-        obp                 REAL,
-        iso                 REAL,
-        rbi                 INTEGER,
-        stolen_bases        INTEGER,
-        games_played        INTEGER,
-        woba                REAL,
-        xwoba               REAL,
-        la_sweet_spot_pct   REAL,
-        barrel_pct          REAL,
-        hard_hit_pct        REAL,
-        ev50                REAL,
-        adjusted_ev         REAL,
-        whiff_pct           REAL,
-        swing_pct           REAL,
-        last_updated        TEXT,
-        PRIMARY KEY(player_name, year)
+    CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+        year          INTEGER,
+        player_type   TEXT,
+        status        TEXT,
+        rows          INTEGER,
+        completed_at  TEXT,
+        PRIMARY KEY(year, player_type)
     );
     """)
 
-    conn.commit()
-    conn.close()
+def create_player_stats_indexes(c):
+    c.execute("CREATE INDEX IF NOT EXISTS idx_player_stats_year_type ON player_stats(year, player_type)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_player_stats_last_updated ON player_stats(last_updated)")
+
+
+# Version history: step N sets user_version = N. Only ever append.
+NFL_ODDS_MIGRATIONS = [
+    create_nfl_tables,
+    create_odds_heartbeat,
+    create_odds_indexes,
+    create_odds_latest,
+    add_typed_odds_columns,
+    add_nfl_game_identity,
+    index_game_start,
+    create_line_moves,
+    index_odds_latest_changes,
+    create_results_tables,
+    add_heartbeat_source,
+]
+MLB_ODDS_MIGRATIONS = [
+    create_mlb_tables,
+    create_odds_heartbeat,
+    create_odds_indexes,
+    create_odds_latest,
+    add_typed_odds_columns,
+    add_mlb_game_identity,
+    index_game_start,
+    create_line_moves,
+    index_odds_latest_changes,
+    create_results_tables,
+    add_heartbeat_source,
+]
+MLB_STATS_MIGRATIONS = [
+    create_player_stats,
+    add_player_type,
+    create_backfill_checkpoints,
+    create_player_stats_indexes,
+]
+
+
+def migrate(db_name, steps):
+    """
+    Switch the database to WAL and apply the steps past its user_version,
+    each in its own transaction. Returns the resulting version.
+    """
+    os.makedirs(os.path.dirname(db_name) or ".", exist_ok=True)
+    conn = connect(db_name, isolation_level=None)  # explicit transactions below
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, step in enumerate(steps[version:], start=version + 1):
+            c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                step(c)
+                c.execute(f"PRAGMA user_version = {number}")
+                c.execute("COMMIT")
+            except sqlite3.Error:
+                c.execute("ROLLBACK")
+                raise
+            print(f"{db_name}: applied migration {number} ({step.__name__})")
+            version = number
+        conn.execute("PRAGMA optimize")
+        return version
+    finally:
+        conn.close()
+
+def migrate_nfl_odds_db():
+    return migrate(NFL_ODDS_DB, NFL_ODDS_MIGRATIONS)
+
+def migrate_mlb_odds_db():
+    return migrate(MLB_ODDS_DB, MLB_ODDS_MIGRATIONS)
+
+def migrate_mlb_stats_db():
+    return migrate(MLB_STATS_DB, MLB_STATS_MIGRATIONS)
 
 if __name__ == "__main__":
     migrate_nfl_odds_db()
     migrate_mlb_odds_db()
-    migrate_mlb_stats_db_SC()
-    print("All Migrations Complete")
\ No newline at end of file
+    migrate_mlb_stats_db()
+    print("All Migrations Complete")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark the DraftKings table extraction paths on a synthetic sportsbook
+page: one page.evaluate call versus one round trip per field.
+
+Usage: python scripts/testing/bench_dk_extract.py [tables] [games_per_table]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scrapers.browserPool import BrowserPool
+from scrapers.draftkings import read_tables, read_tables_per_element
+
+
+def team_row(team, start_time, line, total, odds):
+    return f"""
+    <tr>
+      <th><div class="event-cell__start-time">{start_time}</div>
+          <div class="event-cell__name-text">{team}</div>
+          <div class="event-cell__pitcher">P. {team.split()[-1]}</div></th>
+      <td><span data-testid="sportsbook-outcome-cell-line">{line}</span>
+          <span data-testid="sportsbook-odds">-110</span></td>
+      <td><span data-testid="sportsbook-outcome-cell-line">{total}</span>
+          <span data-testid="sportsbook-odds">-105</span></td>
+      <td><span data-testid="sportsbook-odds">{odds}</span></td>
+    </tr>"""
+
+
+def build_page(n_tables, games_per_table):
+    tables = []
+    for t in range(n_tables):
+        rows = []
+        for g in range(games_per_table):
+            rows.append(team_row(f"Away Team{t}x{g}", "7:10 PM", "+1.5", "O 8.5", "+120"))
+            rows.append(team_row(f"Home Team{t}x{g}", "7:10 PM", "-1.5", "U 8.5", "−140"))
+        tables.append(f"""
+        <table class="sportsbook-table">
+          <thead><tr><th class="sportsbook-table-header__title">
+            <span><span>SAT SEP {t + 1}TH</span></span></th></tr></thead>
+          <tbody>{''.join(rows)}</tbody>
+        </table>""")
+    return f"<html><body>{''.join(tables)}</body></html>"
+
+
+async def time_extraction(page, html):
+    await page.set_content(html)
+    timings = {}
+    results = {}
+    for name, reader in (("evaluate", read_tables), ("per_element", read_tables_per_element)):
+        started = time.perf_counter()
+        results[name] = await reader(page)
+        timings[name] = time.perf_counter() - started
+    assert results["evaluate"] == results["per_element"], "extraction paths disagree"
+    return timings
+
+
+def main():
+    n_tables = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    games = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    html = build_page(n_tables, games)
+
+    with BrowserPool(max_pages=1) as pool:
+        timings = pool.run(time_extraction, html)
+
+    print(f"{n_tables} tables x {games} games ({n_tables * games * 2} rows)")
+    for name, secs in timings.items():
+        print(f"  {name:<12} {secs * 1000:9.1f} ms")
+    print(f"  speedup      {timings['per_element'] / timings['evaluate']:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
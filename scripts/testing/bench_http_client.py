@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared HTTP client against the old serial requests.get path
+using a local stub server that answers each request after a fixed delay.
+
+Usage: python scripts/testing/bench_http_client.py [requests] [delay_ms]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scrapers import httpClient
+
+
+def start_stub_server(delay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = json.dumps({"path": self.path, "events": []}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    delay = (int(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    server = start_stub_server(delay)
+    url = f"http://127.0.0.1:{server.server_port}/scoreboard"
+    args = [(url, {"week": i}) for i in range(n)]
+
+    started = time.perf_counter()
+    serial = [requests.get(u, params=p, timeout=10).json() for u, p in args]
+    serial_secs = time.perf_counter() - started
+
+    started = time.perf_counter()
+    pooled = httpClient.fetch_many(httpClient.get_json, args)
+    pooled_secs = time.perf_counter() - started
+
+    assert serial == pooled, "responses differ"
+    server.shutdown()
+
+    print(f"{n} requests, {delay * 1000:.0f} ms server delay, "
+          f"{httpClient.PER_HOST_LIMIT} per host")
+    print(f"  serial requests.get    {serial_secs * 1000:9.1f} ms")
+    print(f"  pooled fan-out         {pooled_secs * 1000:9.1f} ms")
+    print(f"  speedup                {serial_secs / pooled_secs:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized reverse/steam detector on a synthetic season of
+minute-level snapshots, after checking it against a plain per-row loop on
+a small sample.
+
+Each game's market follows a random walk with occasional jumps that every
+book copies within a few minutes (steam); each book adds its own noise and
+now and then leans against the market (reverse moves).
+
+Usage: python scripts/testing/bench_reverse_lines.py [games] [books] [minutes]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(ROOT, "analysis"))
+sys.path.insert(0, ROOT)
+from reverseLineAnalysis import (
+    MIN_MOVE, MAX_DIVERGENCE, STEAM_WINDOW, STEAM_BOOKS, STALE_AFTER, detect,
+)
+
+
+def make_history(games, books, minutes, lean_rate=0.001, seed=7):
+    """Parallel arrays (game, provider, t, prob), one snapshot per book per minute."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 0.001, (games, minutes))
+    jumps = rng.random((games, minutes)) < 0.002
+    steps[jumps] += rng.choice([-0.03, 0.03], jumps.sum())
+    market = 0.5 + np.cumsum(steps, axis=1)
+
+    lag = rng.integers(0, 5, (games, books))          # minutes behind the market
+    cols = np.maximum(np.arange(minutes)[None, None, :] - lag[:, :, None], 0)
+    prob = np.take_along_axis(market[:, None, :].repeat(books, axis=1), cols, axis=2)
+    lean = rng.random((games, books, minutes)) < lean_rate
+    prob = prob + rng.normal(0, 0.002, prob.shape) + lean * rng.normal(0, 0.04, prob.shape)
+    prob = np.round(np.clip(prob, 0.02, 0.98), 3)    # books quote in steps
+
+    game = np.repeat(np.arange(games), books * minutes)
+    provider = np.tile(np.repeat(np.arange(books), minutes), games)
+    t = 1_700_000_000 + np.tile(np.arange(minutes) * 60, games * books)
+    shuffle = rng.permutation(len(game))
+    return game[shuffle], provider[shuffle], t[shuffle], prob.ravel()[shuffle]
+
+
+def reference(game, provider, t, prob):
+    """The same signals with one Python loop per snapshot."""
+    rows = sorted(zip(game, provider, t, prob))
+    by_book = {}
+    for g, p, ts, pr in rows:
+        by_book.setdefault((g, p), []).append((ts, pr))
+
+    def as_of(g, p, ts, max_age):
+        best = None
+        for qt, qp in by_book.get((g, p), []):
+            if qt <= ts:
+                best = (qt, qp)
+        return best[1] if best and ts - best[0] <= max_age else None
+
+    books = sorted({p for _, p, _, _ in rows})
+    reverse, outlier, steam = [], [], []
+    for i, (g, p, ts, pr) in enumerate(rows):
+        prev = rows[i - 1] if i else None
+        if not prev or prev[:2] != (g, p):
+            reverse.append(False), outlier.append(False), steam.append(False)
+            continue
+        move = pr - prev[3]
+        others_now = {q: as_of(g, q, ts, STALE_AFTER) for q in books if q != p}
+        others_then = {q: as_of(g, q, prev[2], STALE_AFTER) for q in books if q != p}
+        current = [v for v in others_now.values() if v is not None]
+        consensus = sum(current) / len(current) if current else None
+        changes = [others_now[q] - others_then[q] for q in others_now
+                   if others_now[q] is not None and others_then[q] is not None]
+        consensus_move = sum(changes) / len(changes) if changes else None
+        moved = abs(move) >= MIN_MOVE
+        reverse.append(moved and consensus_move is not None and abs(consensus_move) >= MIN_MOVE
+                       and np.sign(move) != np.sign(consensus_move))
+        outlier.append(moved and consensus is not None and np.sign(move) == np.sign(pr - consensus)
+                       and abs(pr - consensus) >= MAX_DIVERGENCE)
+
+        count = 0
+        for q in books:
+            hist = by_book.get((g, q), [])
+            for j in range(1, len(hist)):
+                qmove = hist[j][1] - hist[j - 1][1]
+                if (abs(qmove) >= MIN_MOVE and np.sign(qmove) == np.sign(move)
+                        and ts - STEAM_WINDOW <= hist[j][0] <= ts):
+                    count += 1
+                    break
+        steam.append(moved and count >= STEAM_BOOKS)
+    return np.array(reverse), np.array(outlier), np.array(steam)
+
+
+def check(n_games=8, books=4, minutes=600):
+    data = make_history(n_games, books, minutes, lean_rate=0.02)
+    out = detect(*data)
+    expected = reference(*data)
+    for name, values in zip(("reverse", "outlier", "steam"), expected):
+        assert np.array_equal(out[name], values), f"{name} differs from the per-row loop"
+    print(f"matches per-row loop on {len(data[0])} snapshots "
+          f"({int(expected[0].sum())} reverse, {int(expected[1].sum())} outlier, {int(expected[2].sum())} steam)")
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 272
+    books = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    minutes = int(sys.argv[3]) if len(sys.argv) > 3 else 3 * 24 * 60
+    check()
+
+    data = make_history(games, books, minutes)
+    started = time.perf_counter()
+    out = detect(*data)
+    secs = time.perf_counter() - started
+    n = len(data[0])
+    print(f"{games} games x {books} books x {minutes} minutes = {n:,} snapshots")
+    print(f"  detect: {secs:.2f}s ({n / secs:,.0f} snapshots/s)")
+    print(f"  flagged: {int(out['reverse'].sum())} reverse, {int(out['outlier'].sum())} outlier, "
+          f"{int(out['steam'].sum())} steam")
+
+
+if __name__ == "__main__":
+    main()
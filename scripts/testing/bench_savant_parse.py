@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark the header-driven lxml Savant parser against the positional
+BeautifulSoup parser on a saved (or synthetic) large leaderboard.
+
+Usage: python scripts/testing/bench_savant_parse.py [saved_leaderboard.html | rows]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scrapers.mlb.mlbStatScraper import parse_savant_table, parse_savant_table_positional
+
+HEADERS = [
+    "Rk.", "Player", "Year", "AB", "PA", "H", "1B", "2B", "HR", "SO", "BB", "K %", "BB %",
+    "AVG", "SLG", "OBP", "ISO", "RBI", "SB", "G", "wOBA", "xwOBA", "LA Sweet-Spot %",
+    "Barrel %", "Hard Hit %", "EV50", "Adjusted EV", "Whiff %", "Swing %",
+]
+
+
+def build_leaderboard(n_rows):
+    rows = []
+    for i in range(n_rows):
+        cells = [str(i + 1), f'<a href="/savant-player/{i}">Player{i}, Test</a>', "2025"]
+        cells += [str(100 + i % 400 + j) for j in range(8)]          # AB .. BB
+        cells += ["22.5", "9.1"]                                     # K %, BB %
+        cells += [".275", ".480", ".350", ".205"]                    # AVG .. ISO
+        cells += [str(40 + i % 80), str(i % 30), str(100 + i % 60)]  # RBI, SB, G
+        cells += [".360", ".372", "35.0", "12.4", "48.1", "101.2", "95.3", "24.6", "47.0"]
+        rows.append("<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+    head = "".join(f"<th>{h}</th>" for h in HEADERS)
+    return (
+        '<div id="sortable_stats"><table><thead><tr>' + head + "</tr></thead>"
+        "<tbody>" + "".join(rows) + "</tbody></table></div>"
+    )
+
+
+def timed(parse, html):
+    started = time.perf_counter()
+    rows = parse(html)
+    return rows, time.perf_counter() - started
+
+
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else "5000"
+    if os.path.exists(arg):
+        with open(arg, encoding="utf-8") as f:
+            html = f.read()
+    else:
+        html = build_leaderboard(int(arg))
+
+    fast_rows, fast_secs = timed(parse_savant_table, html)
+    slow_rows, slow_secs = timed(parse_savant_table_positional, html)
+
+    # Compare everything but the last_updated timestamp
+    assert [r[:-1] for r in fast_rows] == [r[:-1] for r in slow_rows], "parsers disagree"
+
+    print(f"{len(fast_rows)} rows")
+    print(f"  lxml (header map)      {fast_secs * 1000:9.1f} ms")
+    print(f"  bs4 (positional)       {slow_secs * 1000:9.1f} ms")
+    print(f"  speedup                {slow_secs / fast_secs:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark Storage's batched writes on synthetic games, odds and
+player_stats batches. Every variant writes the same rows with the same
+statements (typed odds columns, the odds_latest trigger and heartbeats),
+so the comparison is like for like:
+
+    per-row execute    one execute per row, one transaction per table
+    executemany        the same rows in one executemany per table
+    Storage            upsert_games / append_odds / upsert_player_stats,
+                       which also normalizes the lines inside the timing
+                       (the other two get them pre-normalized) and, on a
+                       repeat poll, skips unchanged lines (the change-only
+                       writes)
+
+The batch is written twice: a first load, then a repeat poll where no line
+has moved.
+
+Usage: python scripts/testing/bench_storage.py [rows]
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+from migrations import migrate, MLB_ODDS_MIGRATIONS, MLB_STATS_MIGRATIONS
+from scrapers.oddsNormalize import TYPED_COLUMNS, normalize_line
+from scrapers.storage import HEARTBEAT_SQL, INSERT_ODDS_SQL, Storage, connect, upsert_sql, utc_now
+
+RUNS = 5    # best of, each on fresh databases
+
+STAT_COLUMNS = [
+    "player_name", "year", "at_bats", "plate_appearances", "hits", "singles", "doubles",
+    "home_runs", "strikeouts", "walks", "strikeout_rate", "walk_rate", "batting_avg",
+    "slg", "obp", "iso", "rbi", "stolen_bases", "games_played", "woba", "xwoba",
+    "la_sweet_spot_pct", "barrel_pct", "hard_hit_pct", "ev50", "adjusted_ev",
+    "whiff_pct", "swing_pct", "last_updated", "player_type",
+]
+
+
+def make_rows(n):
+    games = [{
+        "game_id": f"Away{i}@Home{i} 7:05PM",
+        "start_time": "7:05PM",
+        "game_date": "SAT OCT 17",
+        "home_team": f"Home{i}",
+        "away_team": f"Away{i}",
+        "home_pitcher": f"Pitcher H{i}",
+        "away_pitcher": f"Pitcher A{i}",
+    } for i in range(n)]
+    lines = [(g["game_id"], "DraftKings-MLB-Web", None, 8.5, "-120", "+110") for g in games]
+    stats = [
+        {c: (f"Player {i}" if c == "player_name" else 2025 if c == "year"
+             else "batter" if c == "player_type" else "2025-10-17" if c == "last_updated" else i % 97)
+         for c in STAT_COLUMNS}
+        for i in range(n)
+    ]
+    return games, lines, stats
+
+
+def statements(games, lines, stats, ts):
+    """(odds db, stats db) lists of (sql, rows) as Storage writes them on a first load."""
+    odds = [
+        line + (ts,) + tuple(normalize_line(*line[2:])[c] for c in TYPED_COLUMNS)
+        for line in lines
+    ]
+    game_columns = tuple(games[0])
+    return (
+        [(upsert_sql("games", game_columns, ("game_id",)), [tuple(g.values()) for g in games]),
+         (INSERT_ODDS_SQL, odds),
+         (HEARTBEAT_SQL, [(line[0], line[1], ts) for line in lines])],
+        [(upsert_sql("player_stats", tuple(STAT_COLUMNS), ("player_name", "year", "player_type")),
+          [tuple(row[c] for c in STAT_COLUMNS) for row in stats])],
+    )
+
+
+def per_row_writes(odds_db, stats_db, prepared):
+    for db, batches in zip((odds_db, stats_db), prepared):
+        conn = connect(db)
+        for sql, rows in batches:
+            with conn:
+                for row in rows:
+                    conn.execute(sql, row)
+        conn.close()
+
+
+def executemany_writes(odds_db, stats_db, prepared):
+    for db, batches in zip((odds_db, stats_db), prepared):
+        conn = connect(db)
+        for sql, rows in batches:
+            with conn:
+                conn.executemany(sql, rows)
+        conn.close()
+
+
+def storage_writes(odds_db, stats_db, games, lines, stats):
+    with Storage(odds_db) as db:
+        db.upsert_games(games)
+        db.append_odds(lines)
+    with Storage(stats_db) as db:
+        db.upsert_player_stats(stats)
+
+
+def timed(func, tmp, name, *rows, runs=RUNS):
+    """
+    Best seconds over fresh databases for a first load and for a repeat of
+    the same batch, plus the odds rows stored.
+    """
+    best = [float("inf"), float("inf")]
+    for run in range(runs):
+        odds_db = os.path.join(tmp, f"{name}{run}_odds.db")
+        stats_db = os.path.join(tmp, f"{name}{run}_stats.db")
+        migrate(odds_db, MLB_ODDS_MIGRATIONS)
+        migrate(stats_db, MLB_STATS_MIGRATIONS)
+        for i in range(2):
+            started = time.perf_counter()
+            func(odds_db, stats_db, *rows)
+            best[i] = min(best[i], time.perf_counter() - started)
+    with sqlite3.connect(odds_db) as conn:
+        odds_rows = conn.execute("SELECT COUNT(*) FROM odds").fetchone()[0]
+    return best, odds_rows
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    games, lines, stats = make_rows(n)
+    prepared = statements(games, lines, stats, utc_now())
+    variants = [
+        ("per-row execute", per_row_writes, (prepared,)),
+        ("executemany", executemany_writes, (prepared,)),
+        ("Storage", storage_writes, (games, lines, stats)),
+    ]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (name, func, args) in enumerate(variants):
+            results[name] = timed(func, tmp, f"v{i}", *args)
+
+    print(f"{n} games + {n} odds lines + {n} player_stats rows, written twice (best of {RUNS})")
+    print("                       first load   repeat poll   odds rows")
+    for name, ((first, repeat), odds_rows) in results.items():
+        print(f"  {name:<19}  {first * 1000:7.1f} ms   {repeat * 1000:8.1f} ms   {odds_rows:9d}")
+    (row_first, row_repeat), _ = results["per-row execute"]
+    (many_first, many_repeat), _ = results["executemany"]
+    (store_first, store_repeat), _ = results["Storage"]
+    print(f"  executemany vs per-row        {row_first / many_first:5.1f}x        {row_repeat / many_repeat:5.1f}x")
+    print(f"  Storage vs executemany        {many_first / store_first:5.1f}x        {many_repeat / store_repeat:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
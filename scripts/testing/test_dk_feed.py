@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Offline check of the DraftKings feed parser against a saved response."""
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scrapers.dkFeed import parse_feed, parse_american
+from scrapers.mlb import mlbOddsDK
+from scrapers.nfl import fetchOddsDK
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "dk_nfl_feed.json")
+
+
+def test_dk_feed():
+    with open(FIXTURE) as f:
+        payloads = json.load(f)
+
+    events = {e["event_id"]: e for e in parse_feed(payloads)}
+    assert set(events) == {"32225651", "32225652"}
+
+    dal_phi = events["32225651"]
+    assert dal_phi["away_team"] == "DAL Cowboys"
+    assert dal_phi["home_team"] == "PHI Eagles"
+    assert dal_phi["start"] == datetime(2025, 9, 5, 0, 20, tzinfo=timezone.utc)
+    assert (dal_phi["moneyline_away"], dal_phi["moneyline_home"]) == (320, -410)
+    # The main spread wins over the alternate spread listed after it
+    assert (dal_phi["spread_away"], dal_phi["spread_home"]) == (8.5, -8.5)
+    assert dal_phi["spread_home_price"] == -110
+    assert (dal_phi["total"], dal_phi["over_price"], dal_phi["under_price"]) == (47.5, -112, -108)
+    assert "Alternate Spread" in dal_phi["markets"]
+
+    # Teams from the event name, markets from a later payload
+    kc_lac = events["32225652"]
+    assert (kc_lac["away_team"], kc_lac["home_team"]) == ("KC Chiefs", "LA Chargers")
+    assert (kc_lac["moneyline_away"], kc_lac["moneyline_home"]) == (-155, 130)
+    assert kc_lac["total"] is None
+
+    # Alternates listed before the main market, which shares their marketType
+    def market(mid, name, kind):
+        return {"id": mid, "eventId": "9", "name": name, "marketType": {"name": kind}}
+
+    def selection(sid, mid, side, points, american, **flags):
+        return {"id": sid, "marketId": mid, "outcomeType": side, "points": points,
+                "displayOdds": {"american": american}, **flags}
+
+    alternates_first = [{
+        "events": [{"id": "9", "name": "BUF Bills @ NYJ Jets", "startEventDate": "2025-09-08T00:20:00Z"}],
+        "markets": [
+            market("a1", "Alternate Spread", "Spread"), market("a2", "Alternate Total", "Total"),
+            market("a3", "Spread", "Spread"), market("a4", "Total", "Total"),
+        ],
+        "selections": [
+            selection("x1", "a1", "Home", 10.5, "-250"), selection("x2", "a1", "Away", -10.5, "+200"),
+            selection("x3", "a2", "Over", 40.5, "-300"), selection("x4", "a2", "Under", 40.5, "+230"),
+            selection("x5", "a3", "Home", 6.5, "-110"), selection("x6", "a3", "Away", -6.5, "-110"),
+            selection("x7", "a4", "Over", 45.5, "-105"), selection("x8", "a4", "Under", 45.5, "-115"),
+        ],
+    }]
+    [nyj] = parse_feed(alternates_first)
+    assert (nyj["spread_home"], nyj["spread_home_price"]) == (6.5, -110)
+    assert (nyj["total"], nyj["over_price"]) == (45.5, -105)
+
+    # DK's mainPoint flag picks the main line inside a market of alternates
+    alternates_first[0]["markets"] = [market("a1", "Point Spread", "Spread")]
+    alternates_first[0]["selections"] = [
+        selection("x1", "a1", "Home", 10.5, "-250"), selection("x2", "a1", "Away", -10.5, "+200"),
+        selection("x5", "a1", "Home", 6.5, "-110", mainPoint=True),
+        selection("x6", "a1", "Away", -6.5, "-110", mainPoint=True),
+    ]
+    [nyj] = parse_feed(alternates_first)
+    assert (nyj["spread_home"], nyj["spread_away"]) == (6.5, -6.5)
+
+    assert parse_american("EVEN") == 100
+    assert parse_american("−120") == -120
+
+    print(f"Parsed {len(events)} events from {os.path.basename(FIXTURE)}")
+
+
+def test_feed_matches_tables():
+    """The feed and the rendered tables give the same stored line for a game."""
+    with open(FIXTURE) as f:
+        payloads = json.load(f)
+    tables = [{"date": "THU SEP 4TH", "rows": [
+        {"team": "DAL Cowboys", "start_time": "8:20PM", "pitcher": None, "lines": ["+8.5", "O 47.5"],
+         "total": "O 47.5", "odds": ["−110", "−112", "+320"]},
+        {"team": "PHI Eagles", "start_time": None, "pitcher": None, "lines": ["−8.5", "U 47.5"],
+         "total": "U 47.5", "odds": ["−110", "−108", "−410"]},
+    ]}]
+
+    fields = ("spread", "total", "ml_home", "ml_away", "home_spread_price")
+    feed = next(g for g in fetchOddsDK.parse_feed_games(payloads) if g["source_key"] == "32225651")
+    [table] = fetchOddsDK.parse_tables(tables)
+    assert {f: feed[f] for f in fields} == {f: table[f] for f in fields}
+
+    fields = ("total", "moneyline_home", "moneyline_away")
+    feed = next(g for g in mlbOddsDK.parse_feed_games(payloads) if g["source_key"] == "32225651")
+    [table] = mlbOddsDK.parse_tables(tables)
+    assert {f: feed[f] for f in fields} == {f: table[f] for f in fields}
+
+
+if __name__ == "__main__":
+    test_dk_feed()
+    test_feed_matches_tables()
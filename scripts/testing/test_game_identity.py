@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Offline check of GameResolver on doubleheaders and rescheduled games."""
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from scrapers.gameIdentity import GameResolver, alias_rows
+
+
+def make_db():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE team_aliases (sport TEXT, alias TEXT, team TEXT, PRIMARY KEY(sport, alias));
+        CREATE TABLE game_keys (source TEXT, source_key TEXT, game_id TEXT, PRIMARY KEY(source, source_key));
+        CREATE TABLE games (game_id TEXT PRIMARY KEY, away_code TEXT, home_code TEXT, start_utc INTEGER);
+    """)
+    conn.executemany("INSERT INTO team_aliases VALUES (?, ?, ?)", alias_rows("mlb"))
+    return conn
+
+
+def test_doubleheader():
+    resolver = GameResolver(make_db(), "mlb")
+    game1 = resolver.resolve("mlb-api", 1001, "New York Yankees", "Boston Red Sox", "2025-07-04T17:05:00Z", 1)
+    game2 = resolver.resolve("mlb-api", 1002, "New York Yankees", "Boston Red Sox", "2025-07-04T19:45:00Z", 2)
+    assert game1[0] == "mlb:BOS@NYY:20250704T1705Z"
+    assert game2[0] == "mlb:BOS@NYY:20250704T1945Z-G2"
+
+    # DraftKings lines land on the nearest half; a keyed half is never reused
+    assert resolver.resolve("dk", "e2", "NYY Yankees", "BOS Red Sox", "2025-07-04T19:40:00Z")[0] == game2[0]
+    assert resolver.resolve("dk", "e1", "NYY Yankees", "BOS Red Sox", "2025-07-04T19:40:00Z")[0] == game1[0]
+
+    # A second game with the same listed start still gets its own id
+    game3 = resolver.resolve("mlb-api", 1003, "New York Yankees", "Boston Red Sox", "2025-07-04T17:05:00Z")
+    assert game3[0] == "mlb:BOS@NYY:20250704T1705Z-1003"
+
+
+def test_reschedule():
+    conn = make_db()
+    conn.execute("INSERT INTO games VALUES ('mlb:BOS@NYY:20250704T1705Z', 'BOS', 'NYY', ?)",
+                 (int(datetime(2025, 7, 4, 17, 5, tzinfo=timezone.utc).timestamp()),))
+    resolver = GameResolver(conn, "mlb")
+    moved = datetime(2025, 7, 5, 17, 5, tzinfo=timezone.utc)
+
+    # Sportsbooks keep the stored start
+    dk = resolver.resolve("dk", "e1", "NYY Yankees", "BOS Red Sox", "2025-07-04T17:00:00Z")
+    assert dk[3] == datetime(2025, 7, 4, 17, 5, tzinfo=timezone.utc)
+
+    # The official schedule moves it, in memory and in `games`
+    game_id, _, _, start = resolver.resolve("mlb-api", 1001, "New York Yankees", "Boston Red Sox",
+                                            "2025-07-04T17:05:00Z")
+    game_id, _, _, start = resolver.resolve("mlb-api", 1001, "New York Yankees", "Boston Red Sox", moved)
+    assert (game_id, start) == (dk[0], moved)
+    resolver.flush()
+    assert conn.execute("SELECT start_utc FROM games").fetchone()[0] == int(moved.timestamp())
+    assert resolver.resolve("dk", "e1", "NYY Yankees", "BOS Red Sox", "2025-07-04T17:00:00Z")[3] == moved
+
+
+if __name__ == "__main__":
+    test_doubleheader()
+    test_reschedule()
+    print("Game identity checks passed")